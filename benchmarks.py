@@ -0,0 +1,367 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════╗
+║                BENCHMARKS DEL MOTOR DE ENCRIPTACIÓN                  ║
+╚═══════════════════════════════════════════════════════════════════════╝
+
+Mide throughput (caracteres/segundo) y memoria pico de las etapas del
+motor, barriendo longitud de texto, tamaño de clave n y mezcla de
+caracteres (ASCII vs astrales, fuera del BMP):
+
+  - texto_a_matriz / matriz_a_texto
+  - Encriptador.encriptar / desencriptar
+  - ServicioEncriptacion._generar_clave (claves por segundo)
+  - Arranque en frío: `import core` (uso sin interfaz) e `import interfaz`
+    (ventana de login), cada uno en un intérprete nuevo
+
+Los resultados se pueden guardar como línea base (JSON) y comparar en
+ejecuciones posteriores: un caso es regresión si su throughput cae más
+que el umbral indicado respecto de la base.
+
+EJECUCIÓN:
+==========
+    python benchmarks.py                          # barrido completo
+    python benchmarks.py --rapido                 # barrido reducido
+    python benchmarks.py --arranque               # sólo tiempos de importación
+    python benchmarks.py --guardar-base base.json
+    python benchmarks.py --base base.json --umbral 0.2   # exit 1 si hay regresión
+
+La memoria pico se mide con tracemalloc en una ejecución aparte, para no
+contaminar los tiempos con su sobrecosto.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core import ServicioEncriptacion, construir_clave_invertible
+from encriptador import Encriptador
+
+# Barridos por defecto
+LONGITUDES = (1_000, 100_000, 1_000_000)
+TAMAÑOS_N = (4, 16, 64)
+MEZCLAS = ("ascii", "astral")
+
+LONGITUDES_RAPIDO = (1_000, 50_000)
+TAMAÑOS_N_RAPIDO = (4, 16)
+
+# Caída de throughput tolerada respecto de la línea base (0.25 = 25%)
+UMBRAL_REGRESION = 0.25
+
+# Repeticiones por caso (se reporta la mejor)
+REPETICIONES = 3
+
+# Claves generadas por medición de generar_clave
+CLAVES_POR_MEDICION = 50
+
+# Módulos cuyo arranque en frío se mide: sin interfaz y con interfaz
+MODULOS_ARRANQUE = ("core", "interfaz")
+
+# Ejecutado en un intérprete nuevo: tiempo y memoria de importar un módulo
+_SCRIPT_ARRANQUE = """
+import sys, time, tracemalloc
+modulo, con_memoria = sys.argv[1], sys.argv[2] == "1"
+if con_memoria:
+    tracemalloc.start()
+inicio = time.perf_counter()
+__import__(modulo)
+segundos = time.perf_counter() - inicio
+pico = tracemalloc.get_traced_memory()[1] if con_memoria else 0
+print(segundos, pico, int("numpy" in sys.modules))
+"""
+
+
+# ==================== DATOS DE PRUEBA ====================
+
+def generar_texto(longitud: int, mezcla: str) -> str:
+    """
+    Texto determinista de `longitud` caracteres.
+
+    'ascii': letras y signos ASCII. 'astral': la mitad de los caracteres
+    fuera del BMP (emoji y CJK extendido, 4 bytes en UTF-8).
+    """
+    if mezcla == "ascii":
+        base = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    elif mezcla == "astral":
+        base = "a😀b𝔘c🂡d𠀋e🚀f𝄞g🌍h𓀀"
+    else:
+        raise ValueError(f"Mezcla desconocida: {mezcla}")
+    return (base * (longitud // len(base) + 1))[:longitud]
+
+
+# ==================== MEDICIÓN ====================
+
+def _mejor_tiempo(funcion: Callable[[], Any], repeticiones: int) -> float:
+    """Mejor tiempo (s) de `repeticiones` ejecuciones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def _memoria_pico(funcion: Callable[[], Any]) -> int:
+    """Bytes pico asignados durante una ejecución (tracemalloc)."""
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def medir(
+    caso: str,
+    funcion: Callable[[], Any],
+    unidades: int,
+    repeticiones: int = REPETICIONES
+) -> Dict[str, Any]:
+    """
+    MEDIR UN CASO
+    =============
+
+    Args:
+        caso: Identificador ('operacion/mezcla/L=.../n=...')
+        funcion: Operación a medir (sin argumentos)
+        unidades: Caracteres (o claves) procesados por ejecución
+        repeticiones: Ejecuciones cronometradas
+
+    Returns:
+        Dict con 'caso', 'segundos', 'por_segundo' y 'memoria_pico'
+    """
+    segundos = _mejor_tiempo(funcion, repeticiones)
+    return {
+        "caso": caso,
+        "segundos": segundos,
+        "por_segundo": unidades / segundos if segundos else float("inf"),
+        "memoria_pico": _memoria_pico(funcion),
+    }
+
+
+def ejecutar_barrido(
+    longitudes: Sequence[int] = LONGITUDES,
+    tamaños_n: Sequence[int] = TAMAÑOS_N,
+    mezclas: Sequence[str] = MEZCLAS,
+    repeticiones: int = REPETICIONES
+) -> List[Dict[str, Any]]:
+    """
+    EJECUTAR BARRIDO COMPLETO
+    =========================
+
+    Returns:
+        Lista de resultados de medir(), uno por caso
+    """
+    resultados = []
+    servicio = ServicioEncriptacion()
+
+    for n in tamaños_n:
+        resultados.append(medir(
+            f"generar_clave/n={n}",
+            lambda: [servicio._generar_clave(n) for _ in range(CLAVES_POR_MEDICION)],
+            CLAVES_POR_MEDICION, repeticiones
+        ))
+
+    for n in tamaños_n:
+        clave, clave_inv = construir_clave_invertible(n)
+        enc = Encriptador(clave, clave_inv=clave_inv)
+        for mezcla in mezclas:
+            for longitud in longitudes:
+                texto = generar_texto(longitud, mezcla)
+                matriz = enc.texto_a_matriz(texto)
+                cifrado = enc.encriptar(texto)
+                sufijo = f"{mezcla}/L={longitud}/n={n}"
+
+                resultados.append(medir(f"texto_a_matriz/{sufijo}",
+                                        lambda: enc.texto_a_matriz(texto),
+                                        longitud, repeticiones))
+                resultados.append(medir(f"matriz_a_texto/{sufijo}",
+                                        lambda: enc.matriz_a_texto(matriz, longitud),
+                                        longitud, repeticiones))
+                resultados.append(medir(f"encriptar/{sufijo}",
+                                        lambda: enc.encriptar(texto),
+                                        longitud, repeticiones))
+                resultados.append(medir(f"desencriptar/{sufijo}",
+                                        lambda: enc.desencriptar(cifrado, longitud),
+                                        longitud, repeticiones))
+    return resultados
+
+
+def _importar_en_frio(modulo: str, con_memoria: bool) -> List[str]:
+    """Importar `modulo` en un intérprete nuevo; retorna la línea que imprime."""
+    resultado = subprocess.run(
+        [sys.executable, "-c", _SCRIPT_ARRANQUE, modulo, "1" if con_memoria else "0"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No se pudo importar '{modulo}': {resultado.stderr.strip()}")
+    return resultado.stdout.split()
+
+
+def medir_arranque(modulo: str, repeticiones: int = REPETICIONES) -> Dict[str, Any]:
+    """
+    MEDIR ARRANQUE EN FRÍO
+    ======================
+
+    Cada repetición importa `modulo` en un proceso nuevo (sin módulos ya
+    cargados), así que mide lo que paga el usuario al abrir la aplicación.
+
+    Args:
+        modulo: Módulo a importar ('core', 'interfaz', ...)
+        repeticiones: Procesos cronometrados (se reporta el mejor)
+
+    Returns:
+        Dict de medir() con caso 'arranque/<modulo>' (por_segundo =
+        importaciones por segundo) y 'numpy': si la importación cargó numpy
+
+    Raises:
+        RuntimeError: Si el módulo no se puede importar (ej: sin tkinter)
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        segundos, _, numpy_cargado = _importar_en_frio(modulo, con_memoria=False)
+        mejor = min(mejor, float(segundos))
+    return {
+        "caso": f"arranque/{modulo}",
+        "segundos": mejor,
+        "por_segundo": 1 / mejor if mejor else float("inf"),
+        "memoria_pico": int(_importar_en_frio(modulo, con_memoria=True)[1]),
+        "numpy": numpy_cargado == "1",
+    }
+
+
+def ejecutar_arranque(
+    modulos: Sequence[str] = MODULOS_ARRANQUE,
+    repeticiones: int = REPETICIONES
+) -> List[Dict[str, Any]]:
+    """Arranque en frío de cada módulo; los que no se pueden importar se omiten."""
+    resultados = []
+    for modulo in modulos:
+        try:
+            resultados.append(medir_arranque(modulo, repeticiones))
+        except RuntimeError as e:
+            print(f"⚠️ {e}", file=sys.stderr)
+    return resultados
+
+
+# ==================== LÍNEA BASE ====================
+
+def guardar_base(resultados: List[Dict[str, Any]], ruta: str) -> None:
+    """Guardar los resultados como línea base JSON (caso → métricas)."""
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({r["caso"]: r for r in resultados}, f, indent=2, sort_keys=True)
+
+
+def comparar_con_base(
+    resultados: List[Dict[str, Any]],
+    base: Dict[str, Dict[str, Any]],
+    umbral: float = UMBRAL_REGRESION
+) -> List[Dict[str, Any]]:
+    """
+    COMPARAR CON LÍNEA BASE
+    =======================
+
+    Args:
+        resultados: Resultados de la ejecución actual
+        base: Línea base cargada (caso → métricas)
+        umbral: Caída relativa de throughput tolerada
+
+    Returns:
+        Lista de regresiones: dicts con 'caso', 'base', 'actual' y 'cambio'
+        (cambio relativo de throughput; negativo = más lento). Los casos
+        que no están en la base se ignoran.
+    """
+    regresiones = []
+    for r in resultados:
+        anterior = base.get(r["caso"])
+        if not anterior or not anterior.get("por_segundo"):
+            continue
+        cambio = r["por_segundo"] / anterior["por_segundo"] - 1
+        if cambio < -umbral:
+            regresiones.append({
+                "caso": r["caso"],
+                "base": anterior["por_segundo"],
+                "actual": r["por_segundo"],
+                "cambio": cambio,
+            })
+    return regresiones
+
+
+# ==================== REPORTE ====================
+
+def imprimir_resultados(
+    resultados: List[Dict[str, Any]],
+    base: Optional[Dict[str, Dict[str, Any]]] = None
+) -> None:
+    """Tabla con throughput, memoria pico y cambio contra la base."""
+    print(f"{'CASO':<48} {'UNID/S':>14} {'MEM PICO':>12} {'vs BASE':>9}")
+    print("─" * 86)
+    for r in resultados:
+        cambio = ""
+        anterior = (base or {}).get(r["caso"])
+        if anterior and anterior.get("por_segundo"):
+            cambio = f"{(r['por_segundo'] / anterior['por_segundo'] - 1) * 100:+.1f}%"
+        print(f"{r['caso']:<48} {r['por_segundo']:>14,.0f} "
+              f"{r['memoria_pico'] / 1024 / 1024:>10.2f}MB {cambio:>9}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    PUNTO DE ENTRADA DE LOS BENCHMARKS
+    ==================================
+
+    Returns:
+        int: 0 si no hay regresiones, 1 si alguna supera el umbral
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks del encriptador matricial")
+    parser.add_argument("--rapido", action="store_true", help="Barrido reducido")
+    parser.add_argument("--arranque", action="store_true",
+                        help="Medir sólo el arranque en frío (tiempo de importación)")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--base", help="Línea base JSON contra la cual comparar")
+    parser.add_argument("--guardar-base", help="Guardar los resultados como línea base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="Caída de throughput tolerada (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    if args.arranque:
+        resultados = ejecutar_arranque(repeticiones=args.repeticiones)
+    elif args.rapido:
+        resultados = ejecutar_barrido(LONGITUDES_RAPIDO, TAMAÑOS_N_RAPIDO,
+                                      repeticiones=args.repeticiones)
+    else:
+        resultados = ejecutar_barrido(repeticiones=args.repeticiones)
+
+    base = None
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+
+    imprimir_resultados(resultados, base)
+    for r in resultados:
+        if "numpy" in r:
+            print(f"   {r['caso']}: {r['segundos'] * 1000:.1f} ms, "
+                  f"numpy {'cargado' if r['numpy'] else 'no cargado'}")
+
+    if args.guardar_base:
+        guardar_base(resultados, args.guardar_base)
+        print(f"\n✓ Línea base guardada en '{args.guardar_base}'")
+
+    if base is not None:
+        regresiones = comparar_con_base(resultados, base, args.umbral)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones (umbral {args.umbral:.0%}):")
+            for r in regresiones:
+                print(f"   {r['caso']}: {r['cambio'] * 100:+.1f}%")
+            return 1
+        print(f"\n✓ Sin regresiones (umbral {args.umbral:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""
+Bóveda de Cifrados
+
+Guarda cada encriptación bajo un identificador para poder desencriptar
+cualquiera de ellas más tarde, no sólo la última:
+
+  ┌───────────────────────────────┐  expulsión  ┌───────────────────────────┐
+  │ LRU en memoria (bytes máx.)   │ ──────────▶ │ Contenedores en disco     │
+  │ id → encriptador, cifrado     │ ◀────────── │ <directorio>/<id>.encm    │
+  └───────────────────────────────┘   recarga   └───────────────────────────┘
+
+- La capa en memoria retiene las entradas usadas más recientemente hasta
+  un presupuesto de bytes (cifrado + matrices del encriptador).
+- El encriptador puede llegar como functools.partial: se construye recién
+  en el primer obtener() (encriptar_lote no crea un objeto por mensaje).
+- Al expulsar una entrada se escribe como contenedor (ver contenedor.py)
+  si aún no estaba en disco. Al pedirla otra vez se recarga mapeada en
+  memoria y vuelve a la capa LRU, sin que quien llama lo note. Las
+  lecturas y escrituras de disco se hacen fuera del lock.
+- Sin directorio se usa uno temporal propio que se borra al cerrar.
+- Con directorio, los contenedores van a la subcarpeta `espacio`. Sin
+  espacio se usa una subcarpeta nueva por bóveda (borrada al cerrar):
+  los ids reinician con cada historial y un <id>.encm de una ejecución
+  anterior no debe servirse para un id nuevo.
+- numpy, el contenedor y los motores se importan al usarlos: crear la
+  bóveda (y ServicioEncriptacion) no carga numpy.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Presupuesto por defecto de la capa en memoria (bytes)
+BOVEDA_MEMORIA_MAX = 64 * 1024 * 1024
+
+# Entrada de la capa en memoria: (encriptador, cifrado, longitud, bytes del encriptador, en_disco)
+_Entrada = Tuple[Any, "NDArray", int, int, bool]
+
+
+class BovedaCifrados:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║     BÓVEDA DE CIFRADOS: LRU EN MEMORIA + DISCO        ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Es seguro entre hilos (lock interno).
+
+    Los cifrados de encriptar_lote son vistas sobre una matriz común: el
+    presupuesto cuenta esa matriz (la que realmente ocupa memoria) una
+    sola vez, mientras alguna de sus vistas siga en la capa en memoria.
+
+    EJEMPLO DE USO:
+    ===============
+    >>> boveda = BovedaCifrados(memoria_max=8 * 1024 * 1024)
+    >>> boveda.guardar(1, enc, cifrado, longitud=4)
+    >>> enc, cifrado, longitud = boveda.obtener(1)
+    >>> enc.desencriptar(cifrado, longitud)
+    'Hola'
+    """
+
+    def __init__(
+        self,
+        memoria_max: int = BOVEDA_MEMORIA_MAX,
+        directorio: Optional[str] = None,
+        espacio: Optional[str] = None
+    ) -> None:
+        """
+        INICIALIZAR BÓVEDA
+        ==================
+
+        Args:
+            memoria_max: Bytes máximos retenidos en la capa en memoria.
+                         0 = todo va directamente a disco.
+            directorio: Carpeta de los contenedores. None = carpeta
+                        temporal propia, borrada en cerrar().
+            espacio: Subcarpeta de `directorio` que persiste entre
+                     ejecuciones; debe identificar una secuencia de ids
+                     (ej: un historial SQLite). None = subcarpeta nueva
+                     de esta bóveda, borrada en cerrar().
+
+        Raises:
+            ValueError: Si memoria_max es negativo o espacio no es un
+                        nombre de carpeta simple
+        """
+        if memoria_max < 0:
+            raise ValueError(f"memoria_max debe ser >= 0: {memoria_max}")
+        if espacio is not None and (not espacio or os.path.basename(espacio) != espacio
+                                    or espacio in (".", "..")):
+            raise ValueError(f"espacio debe ser un nombre de carpeta simple: {espacio!r}")
+
+        self.memoria_max = memoria_max
+        self._memoria: "OrderedDict[int, _Entrada]" = OrderedDict()
+        # id(arreglo base) → [arreglo base, entradas que lo usan]
+        self._bases: Dict[int, List[Any]] = {}
+        self._bytes = 0
+        self._aciertos = 0
+        self._recargas = 0
+        self._expulsiones = 0
+        self._cerrada = False
+        self._lock = threading.Lock()
+        # Entradas expulsadas cuyo contenedor se está escribiendo (fuera del lock)
+        self._escribiendo: Dict[int, _Entrada] = {}
+
+        if directorio is None:
+            directorio = tempfile.mkdtemp(prefix="boveda_")
+        elif espacio is None:
+            os.makedirs(directorio, exist_ok=True)
+            directorio = tempfile.mkdtemp(prefix="boveda_", dir=directorio)
+        else:
+            directorio = os.path.join(directorio, espacio)
+            os.makedirs(directorio, exist_ok=True)
+        
+        self._limpieza = None
+        if espacio is None:
+            # Borrar la carpeta propia aunque nadie llame a cerrar()
+            self._limpieza = weakref.finalize(self, shutil.rmtree, directorio, True)
+        self.directorio = directorio
+
+    def _ruta(self, id_: int) -> str:
+        """Archivo del contenedor de una entrada."""
+        return os.path.join(self.directorio, f"{id_}.encm")
+
+    def _verificar_abierta(self) -> None:
+        """Levantar ValueError si ya se llamó a cerrar() (con lock)."""
+        if self._cerrada:
+            raise ValueError("La bóveda está cerrada")
+
+    @staticmethod
+    def _bytes_encriptador(encriptador: Any) -> int:
+        """Bytes de las matrices del encriptador (o de su functools.partial)."""
+        import numpy as np
+        
+        if isinstance(encriptador, functools.partial):
+            valores = (*encriptador.args, *encriptador.keywords.values())
+        else:
+            valores = vars(encriptador).values()
+        return sum(valor.nbytes for valor in valores if isinstance(valor, np.ndarray))
+
+    @staticmethod
+    def _base(cifrado: NDArray) -> NDArray:
+        """Arreglo que es dueño de la memoria de `cifrado` (él mismo si no es vista)."""
+        import numpy as np
+        
+        cifrado = np.asarray(cifrado)
+        while isinstance(cifrado.base, np.ndarray):
+            cifrado = cifrado.base
+        return cifrado
+
+    @staticmethod
+    def _parametros(encriptador: Any) -> Tuple[type, NDArray, Tuple[int, ...], Dict[str, Any]]:
+        """
+        Clase, clave, permutación y opciones de construcción (clave_inv,
+        dtype, codigo_max) de un encriptador o de su functools.partial.
+        """
+        from encriptador import EncriptadorEntero
+        
+        if isinstance(encriptador, functools.partial):
+            clave, permutacion = encriptador.args[:2]
+            return encriptador.func, clave, permutacion, dict(encriptador.keywords)
+        
+        opciones: Dict[str, Any] = {"codigo_max": encriptador.codigo_max}
+        if not isinstance(encriptador, EncriptadorEntero):
+            opciones["clave_inv"] = encriptador.clave_inv
+            opciones["dtype"] = encriptador.dtype
+        return type(encriptador), encriptador.clave, encriptador.permutacion, opciones
+
+    # ==================== ESCRITURA ====================
+
+    def guardar(self, id_: int, encriptador: Any, cifrado: NDArray, longitud: int) -> None:
+        """
+        GUARDAR ENTRADA
+        ===============
+
+        Args:
+            id_: Identificador (ej: el id del historial)
+            encriptador: Instancia que generó el cifrado, o
+                         functools.partial(clase, clave, permutacion, ...)
+                         que la construye en el primer obtener()
+            cifrado: Matriz cifrada
+            longitud: Caracteres del texto original
+
+        Raises:
+            ValueError: Si la bóveda ya está cerrada
+        """
+        with self._lock:
+            self._verificar_abierta()
+            self._insertar(id_, (encriptador, cifrado, longitud,
+                                 self._bytes_encriptador(encriptador), False))
+            expulsadas = self._aplicar_limite()
+        self._escribir(expulsadas)
+
+    def _insertar(self, id_: int, entrada: _Entrada) -> None:
+        """Poner una entrada como la más reciente (con lock)."""
+        anterior = self._memoria.pop(id_, None)
+        if anterior is not None:
+            self._descontar(anterior)
+        self._memoria[id_] = entrada
+        self._bytes += entrada[3]
+        
+        # La memoria del cifrado se cuenta una vez por arreglo base
+        base = self._base(entrada[1])
+        registro = self._bases.get(id(base))
+        if registro is None:
+            self._bases[id(base)] = [base, 1]
+            self._bytes += base.nbytes
+        else:
+            registro[1] += 1
+
+    def _descontar(self, entrada: _Entrada) -> None:
+        """Restar los bytes de una entrada que sale de memoria (con lock)."""
+        self._bytes -= entrada[3]
+        base = self._base(entrada[1])
+        registro = self._bases[id(base)]
+        registro[1] -= 1
+        if registro[1] == 0:
+            del self._bases[id(base)]
+            self._bytes -= base.nbytes
+
+    def _aplicar_limite(self, limite: Optional[int] = None) -> List[Tuple[int, _Entrada]]:
+        """
+        Expulsar las entradas menos usadas hasta entrar en `limite` bytes
+        (None = memoria_max, -1 = todas) (con lock). Retorna las que hay
+        que escribir con _escribir().
+        """
+        limite = self.memoria_max if limite is None else limite
+        expulsadas = []
+        while self._bytes > limite and self._memoria:
+            id_, entrada = self._memoria.popitem(last=False)
+            self._descontar(entrada)
+            self._expulsiones += 1
+            if not entrada[4]:
+                self._escribiendo[id_] = entrada
+                expulsadas.append((id_, entrada))
+        return expulsadas
+
+    def _escribir(self, expulsadas: List[Tuple[int, _Entrada]]) -> None:
+        """Escribir los contenedores de las entradas expulsadas (sin lock)."""
+        if not expulsadas:
+            return
+        from contenedor import guardar_contenedor, MOTOR_ENTERO, MOTOR_FLOAT32, MOTOR_FLOAT64
+        from encriptador import EncriptadorEntero, CODIGO_MAX_UNICODE
+        
+        for id_, entrada in expulsadas:
+            enc, cifrado, longitud = entrada[:3]
+            try:
+                clase, clave, permutacion, opciones = self._parametros(enc)
+                # Nombre del tipo de trabajo (np.float32 → "float32")
+                dtype = opciones.get("dtype", "float64")
+                dtype = getattr(dtype, "__name__", None) or str(dtype)
+                clave_inv = opciones.get("clave_inv")
+                if issubclass(clase, EncriptadorEntero):
+                    # El motor entero descifra con la adjunta: no necesita la inversa
+                    motor, clave_inv = MOTOR_ENTERO, None
+                else:
+                    motor = MOTOR_FLOAT32 if dtype == "float32" else MOTOR_FLOAT64
+                guardar_contenedor(self._ruta(id_), clave, permutacion, cifrado, longitud,
+                                   motor, clave_inv,
+                                   opciones.get("codigo_max") or CODIGO_MAX_UNICODE)
+            finally:
+                with self._lock:
+                    if self._escribiendo.get(id_) is entrada:
+                        del self._escribiendo[id_]
+
+    # ==================== LECTURA ====================
+
+    def obtener(self, id_: int) -> Tuple[Any, NDArray, int]:
+        """
+        OBTENER ENTRADA
+        ===============
+
+        Busca en memoria y, si no está, recarga el contenedor del disco
+        con la inversa, el tipo y el codigo_max guardados (sin recalcular
+        la inversa ni cambiar de precisión).
+
+        Args:
+            id_: Identificador usado en guardar()
+
+        Returns:
+            Tupla (encriptador, cifrado, longitud)
+
+        Raises:
+            KeyError: Si no existe ninguna entrada con ese id
+            ValueError: Si la bóveda ya está cerrada
+        """
+        from contenedor import cargar_contenedor, encriptador_de_contenedor
+        
+        with self._lock:
+            self._verificar_abierta()
+            entrada = self._memoria.get(id_)
+            if entrada is not None:
+                self._memoria.move_to_end(id_)
+                self._aciertos += 1
+                enc, cifrado, longitud, _, en_disco = entrada
+                expulsadas = []
+                if isinstance(enc, functools.partial):
+                    # Construcción diferida (ver guardar)
+                    enc = enc()
+                    self._insertar(id_, (enc, cifrado, longitud,
+                                         self._bytes_encriptador(enc), en_disco))
+                    expulsadas = self._aplicar_limite()
+            else:
+                # Expulsada pero todavía escribiéndose: sigue en memoria
+                entrada = self._escribiendo.get(id_)
+                if entrada is not None:
+                    self._aciertos += 1
+                    enc, cifrado, longitud = entrada[:3]
+                    if isinstance(enc, functools.partial):
+                        enc = enc()
+                    return enc, cifrado, longitud
+        
+        if entrada is not None:
+            self._escribir(expulsadas)
+            return enc, cifrado, longitud
+        
+        # Recarga desde disco, fuera del lock
+        try:
+            datos = cargar_contenedor(self._ruta(id_))
+        except FileNotFoundError:
+            raise KeyError(id_) from None
+        enc = encriptador_de_contenedor(datos)
+        
+        with self._lock:
+            self._verificar_abierta()
+            self._recargas += 1
+            self._insertar(id_, (enc, datos["cifrado"], datos["longitud"],
+                                 self._bytes_encriptador(enc), True))
+            expulsadas = self._aplicar_limite()
+        self._escribir(expulsadas)
+        return enc, datos["cifrado"], datos["longitud"]
+
+    def __contains__(self, id_: int) -> bool:
+        with self._lock:
+            if id_ in self._memoria or id_ in self._escribiendo:
+                return True
+        return os.path.exists(self._ruta(id_))
+
+    def estadisticas(self) -> Dict[str, int]:
+        """
+        ESTADÍSTICAS DE LA BÓVEDA
+        =========================
+
+        Returns:
+            Dict con 'entradas_memoria', 'bytes_memoria', 'aciertos',
+            'recargas' y 'expulsiones'
+        """
+        with self._lock:
+            return {
+                "entradas_memoria": len(self._memoria),
+                "bytes_memoria": self._bytes,
+                "aciertos": self._aciertos,
+                "recargas": self._recargas,
+                "expulsiones": self._expulsiones,
+            }
+
+    # ==================== CIERRE ====================
+
+    def cerrar(self) -> None:
+        """
+        Con carpeta propia: borrarla. Con espacio: escribir las entradas
+        que sólo están en memoria para que persistan. Después guardar()
+        y obtener() levantan ValueError; cerrar otra vez no hace nada.
+        """
+        with self._lock:
+            if self._cerrada:
+                return
+            self._cerrada = True
+            expulsadas = []
+            if self._limpieza is not None:
+                self._memoria.clear()
+                self._bases.clear()
+                self._bytes = 0
+            else:
+                expulsadas = self._aplicar_limite(-1)
+        
+        if self._limpieza is not None:
+            self._limpieza()
+        else:
+            self._escribir(expulsadas)
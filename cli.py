@@ -0,0 +1,417 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════╗
+║                  LÍNEA DE COMANDOS (SIN INTERFAZ GRÁFICA)             ║
+╚═══════════════════════════════════════════════════════════════════════╝
+
+Cifra y descifra en streaming desde archivos o stdin, sin tkinter: sirve
+en servidores, contenedores y pipelines.
+
+  encriptar:    texto UTF-8 (archivo o stdin) → contenedor .encm
+  desencriptar: contenedor .encm (archivo o stdin) → texto UTF-8
+
+La entrada se procesa por tramos de filas (decodificación incremental,
+sin cortar caracteres multibyte) que se cifran en paralelo con un único
+PoolTrabajadores, reutilizado en todos los tramos. Con una salida a
+archivo el contenedor se escribe a medida que avanza (ver
+contenedor.EscritorContenedor) en una ruta temporal que se renombra al
+terminar; hacia stdout, que no admite seek(), se arma en memoria y se
+escribe al final.
+
+Al terminar se imprime el throughput en stderr (--silencioso lo omite).
+
+EJECUCIÓN:
+==========
+    python cli.py encriptar texto.txt -o texto.encm --bloque 32 --trabajadores 4
+    cat texto.txt | python cli.py encriptar -o texto.encm --dtype float32
+    python cli.py desencriptar texto.encm -o texto.txt
+    python main.py encriptar ...          # main.py delega aquí si hay argumentos
+"""
+
+import argparse
+import codecs
+import contextlib
+import os
+import sys
+import time
+from typing import Any, BinaryIO, ContextManager, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from contenedor import (
+    ContenedorInvalidoError, EscritorContenedor, escribir_contenedor,
+    leer_contenedor, cargar_contenedor, encriptador_de_contenedor, tipo_para_cota,
+    MOTOR_ENTERO, MOTOR_FLOAT32, MOTOR_FLOAT64
+)
+from core import construir_clave_invertible, construir_claves_acotadas, EncriptacionError
+from encriptador import (
+    Encriptador, EncriptadorEntero, ClaveInvalidaError, MatrizInvalidaError,
+    PermutacionInvalidaError, PoolTrabajadores, texto_a_codigos, resolver_trabajadores,
+    MANTISA_FLOAT32, CODIGO_MAX_UNICODE
+)
+
+# Tamaño de clave por defecto (n×n)
+BLOQUE_DEFECTO = 16
+
+# Filas por bloque enviado a cada trabajador
+FILAS_POR_BLOQUE_CLI = 16384
+
+# Motores seleccionables con --dtype → código de motor del contenedor
+DTYPES = ("float64", "float32", "int")
+
+
+# ==================== CONSTRUCCIÓN DEL MOTOR ====================
+
+def crear_encriptador(n: int, dtype: str, codigo_max: int = CODIGO_MAX_UNICODE) -> Any:
+    """
+    CREAR ENCRIPTADOR CON CLAVE NUEVA
+    =================================
+
+    Args:
+        n: Tamaño de la clave
+        dtype: 'float64', 'float32' (clave con κ₁ acotado) o 'int'
+               (EncriptadorEntero, aritmética exacta)
+        codigo_max: Código Unicode máximo de la entrada
+
+    Returns:
+        Encriptador o EncriptadorEntero con clave y permutación aleatorias
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype desconocido: {dtype}")
+    if n < 1:
+        raise ValueError(f"El tamaño de bloque debe ser >= 1: {n}")
+
+    permutacion = tuple(int(i) for i in np.random.permutation(n))
+    if dtype == "float32":
+        claves, claves_inv = construir_claves_acotadas(1, n, MANTISA_FLOAT32 // codigo_max)
+        return Encriptador(claves[0], permutacion, claves_inv[0],
+                           dtype=np.float32, codigo_max=codigo_max)
+
+    clave, clave_inv = construir_clave_invertible(n)
+    if dtype == "int":
+        return EncriptadorEntero(clave, permutacion, codigo_max=codigo_max)
+    return Encriptador(clave, permutacion, clave_inv, codigo_max=codigo_max)
+
+
+def _cota_cifrado(enc: Any) -> int:
+    """Cota de |valor cifrado|: codigo_max · ‖K‖₁ (la clave es entera)."""
+    return enc.codigo_max * int(np.abs(np.asarray(enc.clave, dtype=np.int64)).sum(axis=0).max())
+
+
+def _abrir_pool(enc: Any, trabajadores: Optional[int], procesos: bool) -> ContextManager:
+    """
+    Un único pool para todo el flujo, reutilizado en cada tramo (con
+    procesos, lanzarlos por tramo reimportaría numpy cada vez).
+    Con un solo trabajador no hace falta pool: se entrega None.
+    """
+    if resolver_trabajadores(trabajadores) == 1:
+        return contextlib.nullcontext()
+    return PoolTrabajadores(enc, trabajadores, procesos)
+
+
+# ==================== ENCRIPTAR ====================
+
+def _tramos_de_codigos(
+    entrada: BinaryIO,
+    n: int,
+    bytes_por_lectura: int,
+    estadisticas: Dict[str, Any]
+) -> Iterator[NDArray]:
+    """
+    Leer la entrada por tramos y producir códigos en filas completas
+    (forma (k, n)); el último tramo se rellena con ceros.
+    """
+    decodificador = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+    pendiente = np.zeros(0, dtype=np.uint32)
+    while True:
+        datos = entrada.read(bytes_por_lectura)
+        final = not datos
+        estadisticas["bytes_entrada"] += len(datos)
+        codigos = texto_a_codigos(decodificador.decode(datos, final))
+        estadisticas["caracteres"] += len(codigos)
+        if len(pendiente):
+            codigos = np.concatenate((pendiente, codigos))
+
+        if final and len(codigos) % n:
+            codigos = np.concatenate((codigos, np.zeros(-len(codigos) % n, dtype=np.uint32)))
+        usados = len(codigos) - len(codigos) % n
+        pendiente = codigos[usados:]
+        if usados:
+            yield codigos[:usados].reshape(-1, n)
+        if final:
+            return
+
+
+def encriptar_flujo(
+    entrada: BinaryIO,
+    salida: BinaryIO,
+    n: int = BLOQUE_DEFECTO,
+    dtype: str = "float64",
+    trabajadores: Optional[int] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE_CLI,
+    procesos: bool = False,
+    codigo_max: int = CODIGO_MAX_UNICODE
+) -> Dict[str, Any]:
+    """
+    ENCRIPTAR UN FLUJO A CONTENEDOR
+    ===============================
+
+    Args:
+        entrada: Flujo binario con texto UTF-8
+        salida: Flujo binario donde se escribe el contenedor
+        n: Tamaño de la clave
+        dtype: Ver crear_encriptador
+        trabajadores: Hilos/procesos del pool (None = núcleos disponibles)
+        filas_por_bloque: Filas por bloque enviado a cada trabajador
+        procesos: Usar procesos en vez de hilos
+        codigo_max: Código Unicode máximo de la entrada
+
+    Returns:
+        Dict con 'caracteres', 'bytes_entrada', 'bytes_salida', 'filas',
+        'segundos', 'n', 'dtype' y 'trabajadores'
+
+    Raises:
+        ValueError: Si la entrada está vacía o tiene códigos > codigo_max
+    """
+    if filas_por_bloque < 1:
+        raise ValueError(f"filas_por_bloque debe ser >= 1: {filas_por_bloque}")
+
+    inicio = time.perf_counter()
+    enc = crear_encriptador(n, dtype, codigo_max)
+    # El contenedor guarda la inversa y el codigo_max: al descifrar se
+    # recrea el mismo motor sin invertir la clave ni cambiar de tipo
+    if isinstance(enc, EncriptadorEntero):
+        motor, clave_inv = MOTOR_ENTERO, None
+    else:
+        motor = MOTOR_FLOAT32 if dtype == "float32" else MOTOR_FLOAT64
+        clave_inv = enc.clave_inv
+    tipo_cifrado = tipo_para_cota(_cota_cifrado(enc))
+    estadisticas: Dict[str, Any] = {"caracteres": 0, "bytes_entrada": 0}
+
+    # Cada lectura alimenta a todos los trabajadores (≈ 1 byte por carácter)
+    bytes_por_lectura = filas_por_bloque * resolver_trabajadores(trabajadores) * n
+
+    # El escritor se crea con el primer tramo: una entrada vacía no deja
+    # una cabecera provisional en la salida
+    escritor = None
+    en_memoria: List[NDArray] = []
+
+    with _abrir_pool(enc, trabajadores, procesos) as pool:
+        for codigos in _tramos_de_codigos(entrada, n, bytes_por_lectura, estadisticas):
+            enc.validar_codigos(codigos)
+            if escritor is None and salida.seekable():
+                escritor = EscritorContenedor(salida, enc.clave, enc.permutacion, tipo_cifrado,
+                                              motor, clave_inv, enc.codigo_max)
+            cifrado = enc.procesar_en_paralelo(
+                codigos.astype(enc.dtype), cifrar=True, trabajadores=trabajadores,
+                filas_por_bloque=filas_por_bloque, pool=pool
+            )
+            if escritor is not None:
+                escritor.escribir(cifrado)
+            else:
+                en_memoria.append(cifrado)
+
+    caracteres = estadisticas["caracteres"]
+    if caracteres == 0:
+        raise ValueError("La entrada está vacía")
+
+    if escritor is not None:
+        bytes_salida = escritor.cerrar(caracteres)
+        filas = escritor.filas
+    else:
+        cifrado = np.concatenate(en_memoria)
+        bytes_salida = escribir_contenedor(salida, enc.clave, enc.permutacion,
+                                           cifrado.astype(tipo_cifrado), caracteres, motor,
+                                           clave_inv, enc.codigo_max)
+        filas = cifrado.shape[0]
+    salida.flush()
+
+    estadisticas.update({
+        "bytes_salida": bytes_salida,
+        "filas": filas,
+        "segundos": time.perf_counter() - inicio,
+        "n": n,
+        "dtype": dtype,
+        "trabajadores": trabajadores,
+    })
+    return estadisticas
+
+
+# ==================== DESENCRIPTAR ====================
+
+def desencriptar_contenedor(
+    datos: Dict[str, Any],
+    salida: BinaryIO,
+    trabajadores: Optional[int] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE_CLI,
+    procesos: bool = False
+) -> Dict[str, Any]:
+    """
+    DESENCRIPTAR UN CONTENEDOR A UN FLUJO
+    =====================================
+
+    Descifra por tramos y escribe el texto UTF-8 a medida que avanza,
+    con el mismo motor que cifró (ver contenedor.encriptador_de_contenedor):
+    inversa, tipo y codigo_max guardados.
+
+    Args:
+        datos: Contenedor leído (ver contenedor.leer_contenedor)
+        salida: Flujo binario donde se escribe el texto
+        trabajadores, filas_por_bloque, procesos: Ver encriptar_flujo
+
+    Returns:
+        Dict de estadísticas (ver encriptar_flujo)
+    """
+    if filas_por_bloque < 1:
+        raise ValueError(f"filas_por_bloque debe ser >= 1: {filas_por_bloque}")
+
+    inicio = time.perf_counter()
+    enc = encriptador_de_contenedor(datos)
+
+    cifrado = datos["cifrado"]
+    longitud = datos["longitud"]
+    paso = filas_por_bloque * resolver_trabajadores(trabajadores)
+    escritos = 0
+    bytes_salida = 0
+    with _abrir_pool(enc, trabajadores, procesos) as pool:
+        for fila in range(0, cifrado.shape[0], paso):
+            original = enc.procesar_en_paralelo(
+                cifrado[fila:fila + paso], cifrar=False, trabajadores=trabajadores,
+                filas_por_bloque=filas_por_bloque, pool=pool
+            )
+            texto = enc.matriz_a_texto(original, longitud=min(original.size, longitud - escritos))
+            datos_texto = texto.encode("utf-8", "surrogatepass")
+            salida.write(datos_texto)
+            escritos += len(texto)
+            bytes_salida += len(datos_texto)
+    salida.flush()
+
+    return {
+        "caracteres": escritos,
+        "bytes_entrada": cifrado.nbytes,
+        "bytes_salida": bytes_salida,
+        "filas": cifrado.shape[0],
+        "segundos": time.perf_counter() - inicio,
+        "n": enc.n,
+        "dtype": "int" if isinstance(enc, EncriptadorEntero) else enc.dtype.__name__,
+        "trabajadores": trabajadores,
+    }
+
+
+# ==================== REPORTE ====================
+
+def formatear_estadisticas(estadisticas: Dict[str, Any]) -> str:
+    """Línea de throughput: caracteres, bytes, tiempo, car/s y MB/s."""
+    segundos = estadisticas["segundos"] or float("inf")
+    megabytes = estadisticas["bytes_entrada"] / 1e6
+    return (
+        f"✓ {estadisticas['caracteres']:,} caracteres | "
+        f"{estadisticas['bytes_entrada']:,} B → {estadisticas['bytes_salida']:,} B | "
+        f"{estadisticas['segundos']:.3f} s | "
+        f"{estadisticas['caracteres'] / segundos:,.0f} car/s | "
+        f"{megabytes / segundos:.1f} MB/s | "
+        f"n={estadisticas['n']} dtype={estadisticas['dtype']} "
+        f"trabajadores={estadisticas['trabajadores'] or 'auto'}"
+    )
+
+
+# ==================== PUNTO DE ENTRADA ====================
+
+def _abrir(ruta: str, modo: str, abiertos: List[BinaryIO]) -> BinaryIO:
+    """Abrir `ruta` ('-' = stdin/stdout); los archivos abiertos se anotan para cerrarlos."""
+    if ruta == "-":
+        return sys.stdin.buffer if modo == "rb" else sys.stdout.buffer
+    archivo = open(ruta, modo)
+    abiertos.append(archivo)
+    return archivo
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Parser con los subcomandos 'encriptar' y 'desencriptar'."""
+    parser = argparse.ArgumentParser(
+        prog="encriptador",
+        description="Encriptador matricial NxN en línea de comandos (sin interfaz gráfica)"
+    )
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument("-o", "--salida", default="-", help="Archivo de salida ('-' = stdout)")
+    comunes.add_argument("--trabajadores", type=int, default=None,
+                         help="Trabajadores del pool (por defecto: núcleos disponibles)")
+    comunes.add_argument("--procesos", action="store_true",
+                         help="Usar procesos en vez de hilos")
+    comunes.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE_CLI,
+                         help="Filas por bloque enviado a cada trabajador")
+    comunes.add_argument("--silencioso", action="store_true",
+                         help="No imprimir estadísticas en stderr")
+
+    cifrar = subcomandos.add_parser("encriptar", parents=[comunes],
+                                    help="Texto UTF-8 → contenedor .encm")
+    cifrar.add_argument("entrada", nargs="?", default="-", help="Archivo de texto ('-' = stdin)")
+    cifrar.add_argument("--bloque", type=int, default=BLOQUE_DEFECTO,
+                        help="Tamaño n de la clave (n×n)")
+    cifrar.add_argument("--dtype", choices=DTYPES, default="float64",
+                        help="Motor: float64, float32 (mitad de memoria) o int (exacto)")
+    cifrar.add_argument("--codigo-max", type=lambda v: int(v, 0), default=CODIGO_MAX_UNICODE,
+                        help="Código Unicode máximo de la entrada (ej: 0xFFFF)")
+
+    descifrar = subcomandos.add_parser("desencriptar", parents=[comunes],
+                                       help="Contenedor .encm → texto UTF-8")
+    descifrar.add_argument("entrada", nargs="?", default="-", help="Contenedor ('-' = stdin)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    PUNTO DE ENTRADA DE LA LÍNEA DE COMANDOS
+    ========================================
+
+    Returns:
+        int: 0 si terminó bien, 1 si hubo un error de datos o de E/S
+    """
+    args = crear_parser().parse_args(argv)
+    abiertos: List[BinaryIO] = []
+
+    # Un contenedor a archivo se escribe en una ruta temporal y solo se
+    # mueve a la definitiva al terminar: un error no deja un .encm truncado
+    temporal = None
+    if args.comando == "encriptar" and args.salida != "-":
+        temporal = f"{args.salida}.parcial"
+
+    try:
+        if args.comando == "encriptar":
+            entrada = _abrir(args.entrada, "rb", abiertos)
+            salida = _abrir(temporal or args.salida, "wb", abiertos)
+            estadisticas = encriptar_flujo(
+                entrada, salida, args.bloque, args.dtype, args.trabajadores,
+                args.filas_por_bloque, args.procesos, args.codigo_max
+            )
+            if temporal is not None:
+                salida.close()
+                os.replace(temporal, args.salida)
+        else:
+            if args.entrada == "-":
+                datos = leer_contenedor(sys.stdin.buffer.read())
+            else:
+                datos = cargar_contenedor(args.entrada)
+            salida = _abrir(args.salida, "wb", abiertos)
+            estadisticas = desencriptar_contenedor(
+                datos, salida, args.trabajadores, args.filas_por_bloque, args.procesos
+            )
+    except (OSError, ValueError, ContenedorInvalidoError, EncriptacionError,
+            ClaveInvalidaError, MatrizInvalidaError, PermutacionInvalidaError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        for archivo in abiertos:
+            archivo.close()
+        if temporal is not None and os.path.exists(temporal):
+            os.remove(temporal)
+
+    if not args.silencioso:
+        print(formatear_estadisticas(estadisticas), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,567 @@
+"""
+Contenedor Binario de Cifrados
+
+Formato versionado y compacto para guardar y recargar un cifrado junto
+con todo lo necesario para descifrarlo (clave, permutación, longitud y,
+desde la versión 2, la inversa de la clave y el codigo_max del motor).
+
+Estructura del archivo (little-endian, secciones alineadas a 64 bytes):
+
+  ┌─────────────────────────────────────────────┐
+  │ Cabecera (64 bytes)                         │
+  │   magia "ENCM", versión, tipos, n, filas,   │
+  │   relleno, longitud y desplazamientos       │
+  ├─────────────────────────────────────────────┤
+  │ Clave n×n        (tipo mínimo que la cabe)  │
+  ├─────────────────────────────────────────────┤
+  │ Permutación n    (int32)                    │
+  ├─────────────────────────────────────────────┤
+  │ Inversa n×n      (float64, opcional, v2)    │
+  ├─────────────────────────────────────────────┤
+  │ Cifrado filas×n  (tipo mínimo que lo cabe)  │
+  └─────────────────────────────────────────────┘
+
+Al cargar, el archivo se mapea en memoria y clave, permutación y cifrado
+son vistas NumPy de solo lectura sobre ese buffer: no se parsea ni se
+copia el contenido. Encriptador.desencriptar acepta esas vistas tal cual.
+"""
+
+import mmap
+import struct
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+# ==================== EXCEPCIONES PERSONALIZADAS ====================
+
+class ContenedorInvalidoError(Exception):
+    """Excepción: El buffer no es un contenedor válido o está truncado."""
+    pass
+
+
+# ==================== CONSTANTES DEL FORMATO ====================
+
+MAGIA = b"ENCM"
+VERSION = 2
+
+# Versiones que se pueden leer (la 1 no tiene inversa ni codigo_max)
+VERSIONES_LEGIBLES = (1, 2)
+
+# Código del motor que generó el cifrado (campo "motor" de la cabecera)
+MOTOR_FLOAT64 = 0
+MOTOR_ENTERO = 1
+MOTOR_FLOAT32 = 2
+
+# codigo_max registrado cuando no se indica (todo Unicode)
+_CODIGO_MAX_UNICODE = 0x10FFFF
+
+# Alineación de cada sección (permite vistas alineadas sin copiar)
+ALINEACION = 64
+
+# magia, versión, tipo_clave, tipo_cifrado, motor, n, relleno,
+# filas, longitud, desplazamiento_clave, desplazamiento_perm, desplazamiento_cifrado,
+# desplazamiento_inversa (0 = sin inversa), codigo_max (v2; en v1 son ceros)
+_CABECERA = struct.Struct("<4sBBBBII5QII")
+TAMAÑO_CABECERA = ALINEACION
+
+# Códigos de tipo de dato guardados en la cabecera
+_TIPOS = {
+    1: np.dtype("<i1"),
+    2: np.dtype("<i2"),
+    3: np.dtype("<i4"),
+    4: np.dtype("<i8"),
+    5: np.dtype("<f4"),
+    6: np.dtype("<f8"),
+}
+_CODIGOS = {dtype: codigo for codigo, dtype in _TIPOS.items()}
+
+# Filas escritas por iteración al guardar (acota la memoria de conversión)
+_FILAS_POR_ESCRITURA = 65536
+
+
+# ==================== SELECCIÓN DE TIPO ====================
+
+def tipo_minimo(arr: NDArray) -> np.dtype:
+    """
+    TIPO DE DATO MÍNIMO
+    ===================
+
+    Si todos los valores son enteros, retorna el entero con signo más
+    pequeño que los contiene (int8 → int16 → int32 → int64). Si no,
+    conserva el tipo flotante (float32 o float64).
+
+    Args:
+        arr: Arreglo a almacenar.
+
+    Returns:
+        np.dtype little-endian soportado por el contenedor.
+
+    Ejemplo:
+        >>> tipo_minimo(np.array([[-3.0, 120.0]]))
+        dtype('int8')
+    """
+    arr = np.asarray(arr)
+    if arr.dtype == object:
+        arr = arr.astype(np.float64)
+
+    if np.issubdtype(arr.dtype, np.integer) or arr.size == 0:
+        es_entero = True
+    else:
+        es_entero = bool(np.all(np.isfinite(arr))) and np.array_equal(arr, np.rint(arr))
+    if not es_entero:
+        return np.dtype("<f4") if arr.dtype == np.float32 else np.dtype("<f8")
+
+    minimo = int(arr.min()) if arr.size else 0
+    maximo = int(arr.max()) if arr.size else 0
+    for codigo in (1, 2, 3, 4):
+        info = np.iinfo(_TIPOS[codigo])
+        if info.min <= minimo and maximo <= info.max:
+            return _TIPOS[codigo]
+    return np.dtype("<f8")
+
+
+def tipo_para_cota(cota: int) -> np.dtype:
+    """
+    Entero con signo más pequeño que representa [-cota, cota]. Permite
+    fijar el tipo del cifrado antes de conocerlo (escritura en streaming).
+    """
+    for codigo in (1, 2, 3, 4):
+        if cota <= np.iinfo(_TIPOS[codigo]).max:
+            return _TIPOS[codigo]
+    return np.dtype("<f8")
+
+
+def _alinear(posicion: int) -> int:
+    """Redondear `posicion` hacia arriba al múltiplo de ALINEACION."""
+    return -(-posicion // ALINEACION) * ALINEACION
+
+
+# Tipo de la sección de la inversa (puede no ser entera)
+_TIPO_INVERSA = np.dtype("<f8")
+
+
+def _desplazamientos(
+    n: int,
+    tipo_clave: np.dtype,
+    con_inversa: bool = False
+) -> Tuple[int, int, int, int]:
+    """Desplazamientos alineados de clave, permutación, cifrado e inversa (0 = sin ella)."""
+    desp_clave = TAMAÑO_CABECERA
+    desp_perm = _alinear(desp_clave + n * n * tipo_clave.itemsize)
+    desp_inv = _alinear(desp_perm + n * 4) if con_inversa else 0
+    desp_cifrado = _alinear((desp_inv + n * n * _TIPO_INVERSA.itemsize)
+                            if con_inversa else desp_perm + n * 4)
+    return desp_clave, desp_perm, desp_cifrado, desp_inv
+
+
+def _validar_opcionales(n: int, clave_inv: Optional[NDArray], codigo_max: int) -> None:
+    """Validar la inversa (n×n) y codigo_max antes de escribir."""
+    if clave_inv is not None and np.shape(clave_inv) != (n, n):
+        raise ContenedorInvalidoError(f"Inversa con forma {np.shape(clave_inv)} para n={n}")
+    if not 0 < codigo_max <= _CODIGO_MAX_UNICODE:
+        raise ContenedorInvalidoError(f"codigo_max fuera de rango: {codigo_max}")
+
+
+def _secciones_fijas(
+    clave: NDArray,
+    tipo_clave: np.dtype,
+    permutacion: Tuple[int, ...],
+    clave_inv: Optional[NDArray],
+    desplazamientos: Tuple[int, int, int, int]
+) -> bytes:
+    """Bytes desde el fin de la cabecera hasta el inicio del cifrado."""
+    desp_clave, desp_perm, desp_cifrado, desp_inv = desplazamientos
+    secciones = [(desp_clave, np.ascontiguousarray(clave, dtype=tipo_clave).tobytes()),
+                 (desp_perm, np.asarray(permutacion, dtype="<i4").tobytes())]
+    if clave_inv is not None:
+        secciones.append((desp_inv, np.ascontiguousarray(clave_inv, dtype=_TIPO_INVERSA).tobytes()))
+
+    partes = []
+    posicion = TAMAÑO_CABECERA
+    for desplazamiento, datos in secciones:
+        partes += [b"\0" * (desplazamiento - posicion), datos]
+        posicion = desplazamiento + len(datos)
+    partes.append(b"\0" * (desp_cifrado - posicion))
+    return b"".join(partes)
+
+
+def _convertir_tramo(tramo: NDArray, tipo_cifrado: np.dtype) -> bytes:
+    """Bytes de un tramo de filas en el tipo del contenedor."""
+    if np.issubdtype(tipo_cifrado, np.integer) and not np.issubdtype(tramo.dtype, np.integer):
+        tramo = np.rint(np.asarray(tramo, dtype=np.float64))
+    return np.ascontiguousarray(tramo, dtype=tipo_cifrado).tobytes()
+
+
+# ==================== ESCRITURA ====================
+
+def escribir_contenedor(
+    archivo: BinaryIO,
+    clave: NDArray,
+    permutacion: Tuple[int, ...],
+    cifrado: NDArray,
+    longitud: Optional[int] = None,
+    motor: int = MOTOR_FLOAT64,
+    clave_inv: Optional[NDArray] = None,
+    codigo_max: int = _CODIGO_MAX_UNICODE
+) -> int:
+    """
+    ESCRIBIR CONTENEDOR
+    ===================
+
+    Escribe el contenedor en un archivo binario abierto (o en cualquier
+    flujo con write(), como sys.stdout.buffer). El cifrado se convierte
+    a su tipo mínimo por tramos, así que admite cifrados mapeados en
+    memoria sin cargarlos enteros.
+
+    Args:
+        archivo: Flujo binario de escritura.
+        clave: Matriz clave n×n.
+        permutacion: Permutación de columnas (n índices).
+        cifrado: Matriz cifrada (filas, n).
+        longitud: Caracteres del texto original. None = filas × n
+                  (el relleno se quitará por ceros finales).
+        motor: Código (0-255) del motor que generó el cifrado
+               (MOTOR_FLOAT64, MOTOR_ENTERO o MOTOR_FLOAT32).
+        clave_inv: Inversa de la clave (opcional). Guardarla evita
+                   recalcularla con np.linalg.inv al cargar.
+        codigo_max: Código Unicode máximo del motor (ej: modo float32).
+
+    Returns:
+        int: Bytes escritos.
+
+    Raises:
+        ContenedorInvalidoError: Si las dimensiones no son coherentes.
+    """
+    clave = np.asarray(clave)
+    cifrado = np.asarray(cifrado)
+    n = clave.shape[0] if clave.ndim == 2 else -1
+
+    if clave.ndim != 2 or clave.shape != (n, n):
+        raise ContenedorInvalidoError(f"Clave no cuadrada: {clave.shape}")
+    if len(permutacion) != n:
+        raise ContenedorInvalidoError(f"Permutación de tamaño {len(permutacion)} para n={n}")
+    if cifrado.ndim != 2 or cifrado.shape[1] != n:
+        raise ContenedorInvalidoError(f"Cifrado con forma {cifrado.shape} para n={n}")
+    _validar_opcionales(n, clave_inv, codigo_max)
+
+    filas = cifrado.shape[0]
+    if longitud is None:
+        longitud = filas * n
+    if not 0 <= longitud <= filas * n:
+        raise ContenedorInvalidoError(f"Longitud fuera de rango: {longitud}")
+    if not 0 <= motor <= 255:
+        raise ContenedorInvalidoError(f"Código de motor fuera de rango: {motor}")
+
+    tipo_clave = tipo_minimo(clave)
+    tipo_cifrado = tipo_minimo(cifrado)
+
+    # Desplazamientos de cada sección (alineados)
+    desplazamientos = _desplazamientos(n, tipo_clave, clave_inv is not None)
+    desp_clave, desp_perm, desp_cifrado, desp_inv = desplazamientos
+
+    cabecera = _CABECERA.pack(
+        MAGIA, VERSION, _CODIGOS[tipo_clave], _CODIGOS[tipo_cifrado], motor,
+        n, filas * n - longitud, filas, longitud,
+        desp_clave, desp_perm, desp_cifrado, desp_inv, codigo_max
+    )
+
+    archivo.write(cabecera)
+    archivo.write(_secciones_fijas(clave, tipo_clave, permutacion, clave_inv, desplazamientos))
+    escritos = desp_cifrado
+
+    for inicio in range(0, filas, _FILAS_POR_ESCRITURA):
+        datos = _convertir_tramo(cifrado[inicio:inicio + _FILAS_POR_ESCRITURA], tipo_cifrado)
+        archivo.write(datos)
+        escritos += len(datos)
+
+    return escritos
+
+
+class EscritorContenedor:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║      ESCRITURA DE CONTENEDOR EN STREAMING             ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Para cifrados que se generan por tramos y cuyo total de filas no se
+    conoce de antemano (stdin, archivos grandes). Escribe clave y
+    permutación, agrega filas a medida que llegan y, al cerrar, vuelve
+    al inicio para completar la cabecera. Requiere un archivo con seek().
+
+    El tipo del cifrado se fija al crear el escritor (ver tipo_para_cota).
+
+    EJEMPLO DE USO:
+    ===============
+    >>> with open("salida.encm", "wb") as f:
+    ...     escritor = EscritorContenedor(f, clave, perm, tipo_para_cota(cota))
+    ...     for tramo in tramos:
+    ...         escritor.escribir(tramo)
+    ...     escritor.cerrar(longitud)
+    """
+
+    def __init__(
+        self,
+        archivo: BinaryIO,
+        clave: NDArray,
+        permutacion: Tuple[int, ...],
+        tipo_cifrado: np.dtype,
+        motor: int = MOTOR_FLOAT64,
+        clave_inv: Optional[NDArray] = None,
+        codigo_max: int = _CODIGO_MAX_UNICODE
+    ) -> None:
+        """
+        Args:
+            clave_inv, codigo_max: Ver escribir_contenedor
+
+        Raises:
+            ContenedorInvalidoError: Si las dimensiones o el tipo no son válidos.
+        """
+        clave = np.asarray(clave)
+        n = clave.shape[0] if clave.ndim == 2 else -1
+        if clave.ndim != 2 or clave.shape != (n, n):
+            raise ContenedorInvalidoError(f"Clave no cuadrada: {clave.shape}")
+        if len(permutacion) != n:
+            raise ContenedorInvalidoError(f"Permutación de tamaño {len(permutacion)} para n={n}")
+        _validar_opcionales(n, clave_inv, codigo_max)
+        tipo_cifrado = np.dtype(tipo_cifrado).newbyteorder("<")
+        if tipo_cifrado not in _CODIGOS:
+            raise ContenedorInvalidoError(f"Tipo de cifrado no soportado: {tipo_cifrado}")
+        if not 0 <= motor <= 255:
+            raise ContenedorInvalidoError(f"Código de motor fuera de rango: {motor}")
+
+        self.archivo = archivo
+        self.n = n
+        self.motor = motor
+        self.codigo_max = codigo_max
+        self.filas = 0
+        self.tipo_clave = tipo_minimo(clave)
+        self.tipo_cifrado = tipo_cifrado
+        self._inicio = archivo.tell()
+        self._desplazamientos = _desplazamientos(n, self.tipo_clave, clave_inv is not None)
+
+        # Cabecera provisional (se completa en cerrar)
+        archivo.write(self._cabecera(0, 0))
+        archivo.write(_secciones_fijas(clave, self.tipo_clave, permutacion,
+                                       clave_inv, self._desplazamientos))
+        self.escritos = self._desplazamientos[2]
+
+    def _cabecera(self, filas: int, longitud: int) -> bytes:
+        """Cabecera empaquetada con el total de filas y la longitud."""
+        return _CABECERA.pack(
+            MAGIA, VERSION, _CODIGOS[self.tipo_clave], _CODIGOS[self.tipo_cifrado],
+            self.motor, self.n, filas * self.n - longitud, filas, longitud,
+            *self._desplazamientos, self.codigo_max
+        )
+
+    def escribir(self, filas: NDArray) -> None:
+        """Agregar filas cifradas (forma (k, n))."""
+        filas = np.asarray(filas)
+        if filas.ndim != 2 or filas.shape[1] != self.n:
+            raise ContenedorInvalidoError(f"Filas con forma {filas.shape} para n={self.n}")
+        datos = _convertir_tramo(filas, self.tipo_cifrado)
+        self.archivo.write(datos)
+        self.escritos += len(datos)
+        self.filas += filas.shape[0]
+
+    def cerrar(self, longitud: Optional[int] = None) -> int:
+        """
+        Completar la cabecera.
+
+        Args:
+            longitud: Caracteres del texto original (None = filas × n).
+
+        Returns:
+            int: Bytes totales del contenedor.
+        """
+        if longitud is None:
+            longitud = self.filas * self.n
+        if not 0 <= longitud <= self.filas * self.n:
+            raise ContenedorInvalidoError(f"Longitud fuera de rango: {longitud}")
+        final = self.archivo.tell()
+        self.archivo.seek(self._inicio)
+        self.archivo.write(self._cabecera(self.filas, longitud))
+        self.archivo.seek(final)
+        return self.escritos
+
+
+def guardar_contenedor(
+    ruta: str,
+    clave: NDArray,
+    permutacion: Tuple[int, ...],
+    cifrado: NDArray,
+    longitud: Optional[int] = None,
+    motor: int = MOTOR_FLOAT64,
+    clave_inv: Optional[NDArray] = None,
+    codigo_max: int = _CODIGO_MAX_UNICODE
+) -> int:
+    """
+    GUARDAR CONTENEDOR EN ARCHIVO
+    =============================
+
+    Igual que escribir_contenedor, abriendo `ruta` para escritura.
+
+    Returns:
+        int: Bytes escritos.
+    """
+    with open(ruta, "wb") as archivo:
+        return escribir_contenedor(archivo, clave, permutacion, cifrado, longitud,
+                                   motor, clave_inv, codigo_max)
+
+
+# ==================== LECTURA (SIN COPIA) ====================
+
+def leer_contenedor(buffer: Any) -> Dict[str, Any]:
+    """
+    LEER CONTENEDOR DESDE UN BUFFER
+    ===============================
+
+    Interpreta un buffer (bytes, bytearray, mmap, memoryview) como
+    contenedor. Solo se decodifica la cabecera; clave, permutación y
+    cifrado son vistas np.frombuffer sobre el mismo buffer.
+
+    Args:
+        buffer: Objeto con protocolo de buffer.
+
+    Returns:
+        Dict con:
+            'version': Versión del formato
+            'n': Tamaño de la clave
+            'clave': Vista (n, n)
+            'permutacion': Vista (n,) int32
+            'clave_inv': Vista (n, n) float64, o None si no se guardó
+            'codigo_max': Código Unicode máximo del motor
+            'cifrado': Vista (filas, n) en su tipo mínimo
+            'longitud': Caracteres del texto original
+            'relleno': Ceros de relleno al final
+            'motor': Código del motor (ver escribir_contenedor)
+
+    Raises:
+        ContenedorInvalidoError: Si la cabecera o los tamaños no son válidos.
+    """
+    vista = memoryview(buffer)
+    if vista.nbytes < TAMAÑO_CABECERA:
+        raise ContenedorInvalidoError("Buffer demasiado corto para la cabecera")
+
+    (magia, version, cod_clave, cod_cifrado, motor, n, relleno, filas, longitud,
+     desp_clave, desp_perm, desp_cifrado, desp_inv, codigo_max) = _CABECERA.unpack_from(vista)
+
+    if magia != MAGIA:
+        raise ContenedorInvalidoError(f"Magia inválida: {magia!r}")
+    if version not in VERSIONES_LEGIBLES:
+        raise ContenedorInvalidoError(f"Versión no soportada: {version}")
+    if version == 1:
+        desp_inv, codigo_max = 0, _CODIGO_MAX_UNICODE
+    if not 0 < codigo_max <= _CODIGO_MAX_UNICODE:
+        raise ContenedorInvalidoError(f"codigo_max fuera de rango: {codigo_max}")
+    if cod_clave not in _TIPOS or cod_cifrado not in _TIPOS:
+        raise ContenedorInvalidoError(
+            f"Tipo de dato desconocido en la cabecera: clave={cod_clave}, cifrado={cod_cifrado}"
+        )
+
+    if n < 1:
+        raise ContenedorInvalidoError(f"Tamaño de clave inválido: n={n}")
+    if longitud > filas * n or relleno != filas * n - longitud:
+        raise ContenedorInvalidoError(
+            f"Longitud {longitud} y relleno {relleno} no cuadran con {filas}×{n}"
+        )
+
+    tipo_clave = _TIPOS[cod_clave]
+    tipo_cifrado = _TIPOS[cod_cifrado]
+
+    # Secciones en orden, alineadas, sin solaparse y dentro del buffer
+    secciones = [("clave", desp_clave, n * n * tipo_clave.itemsize),
+                 ("permutación", desp_perm, n * 4)]
+    if desp_inv:
+        secciones.append(("inversa", desp_inv, n * n * _TIPO_INVERSA.itemsize))
+    secciones.append(("cifrado", desp_cifrado, filas * n * tipo_cifrado.itemsize))
+
+    limite = TAMAÑO_CABECERA
+    for nombre, desplazamiento, tamaño in secciones:
+        if desplazamiento % ALINEACION or desplazamiento < limite:
+            raise ContenedorInvalidoError(
+                f"Desplazamiento de {nombre} inválido: {desplazamiento}"
+            )
+        limite = desplazamiento + tamaño
+        if limite > vista.nbytes:
+            raise ContenedorInvalidoError(
+                f"Contenedor truncado: la sección {nombre} termina en el byte "
+                f"{limite} de {vista.nbytes}"
+            )
+
+    clave = np.frombuffer(vista, dtype=tipo_clave, count=n * n, offset=desp_clave)
+    permutacion = np.frombuffer(vista, dtype="<i4", count=n, offset=desp_perm)
+    cifrado = np.frombuffer(vista, dtype=tipo_cifrado, count=filas * n, offset=desp_cifrado)
+
+    if not np.array_equal(np.sort(permutacion), np.arange(n)):
+        raise ContenedorInvalidoError("La permutación no es una permutación de 0..n-1")
+
+    clave_inv = None
+    if desp_inv:
+        clave_inv = np.frombuffer(vista, dtype=_TIPO_INVERSA, count=n * n,
+                                  offset=desp_inv).reshape(n, n)
+
+    return {
+        "version": version,
+        "n": n,
+        "clave": clave.reshape(n, n),
+        "permutacion": permutacion,
+        "clave_inv": clave_inv,
+        "codigo_max": codigo_max,
+        "cifrado": cifrado.reshape(filas, n),
+        "longitud": longitud,
+        "relleno": relleno,
+        "motor": motor,
+    }
+
+
+def cargar_contenedor(ruta: str) -> Dict[str, Any]:
+    """
+    CARGAR CONTENEDOR DESDE ARCHIVO
+    ===============================
+
+    Mapea el archivo en memoria (solo lectura) y retorna las vistas de
+    leer_contenedor. El sistema operativo carga las páginas bajo demanda:
+    abrir un contenedor de varios GB es inmediato.
+
+    Args:
+        ruta: Archivo generado por guardar_contenedor.
+
+    Returns:
+        Dict (ver leer_contenedor).
+
+    Ejemplo:
+        >>> datos = cargar_contenedor("mensaje.encm")
+        >>> enc = encriptador_de_contenedor(datos)
+        >>> enc.desencriptar(datos['cifrado'], datos['longitud'])
+    """
+    with open(ruta, "rb") as archivo:
+        if archivo.seek(0, 2) == 0:
+            raise ContenedorInvalidoError("Archivo vacío")
+        buffer = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    return leer_contenedor(buffer)
+
+
+def encriptador_de_contenedor(datos: Dict[str, Any]) -> Any:
+    """
+    RECREAR EL MOTOR DE UN CONTENEDOR
+    =================================
+
+    Construye el motor que generó el cifrado con lo guardado: clave,
+    permutación, inversa (sin recalcularla con np.linalg.inv), tipo
+    float32/float64 y codigo_max. Los contenedores v1 no guardan la
+    inversa ni el tipo y se recrean en float64.
+
+    Args:
+        datos: Contenedor leído (ver leer_contenedor)
+
+    Returns:
+        EncriptadorEntero si motor == MOTOR_ENTERO, si no Encriptador.
+    """
+    from encriptador import Encriptador, EncriptadorEntero
+
+    permutacion = tuple(int(i) for i in datos["permutacion"])
+    if datos["motor"] == MOTOR_ENTERO:
+        return EncriptadorEntero(datos["clave"], permutacion, codigo_max=datos["codigo_max"])
+    dtype = "float32" if datos["motor"] == MOTOR_FLOAT32 else "float64"
+    return Encriptador(datos["clave"], permutacion, datos["clave_inv"],
+                       dtype=dtype, codigo_max=datos["codigo_max"])
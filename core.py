@@ -1,8 +1,24 @@
+from __future__ import annotations
+
+import functools
+import hashlib
 import logging
 import math
-from typing import Tuple, Optional, Dict, Any, List
-import numpy as np
-from numpy.typing import NDArray
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Tuple, Optional, Dict, Any, List, Callable, Sequence, TYPE_CHECKING
+from historial import HistorialEncriptaciones, HISTORIAL_MAX
+from boveda import BovedaCifrados, BOVEDA_MEMORIA_MAX
+from instrumentacion import instrumentacion
+from metricas import medir_etapa, metricas
+
+# numpy, encriptador, contenedor y asyncio se importan dentro de las
+# funciones que los usan: `import core` (y la ventana de login) no los carga.
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
 
 class EncriptacionError(Exception):
     """Excepción base para errores de encriptación."""
@@ -24,10 +40,62 @@ class DesencriptacionError(EncriptacionError):
     """Excepción: Error durante la desencriptación."""
     pass
 
+class OperacionCanceladaError(EncriptacionError):
+    """Excepción: La operación se canceló antes de completarse."""
+    pass
+
 class AutenticacionError(Exception):
     """Excepción: Fallo de autenticación o límite de intentos alcanzado."""
     pass
 
+# ==================== CONFIGURACIÓN CENTRAL ====================
+
+# Credenciales por defecto del sistema
+USUARIO_DEFECTO = "Mile"
+PASSWORD_DEFECTO = "1234"
+
+# Número máximo de intentos fallidos antes de bloquear el acceso
+MAX_INTENTOS = 3
+
+# Determinante mínimo para considerar una matriz invertible
+DTERMINANTE_MIN = 1e-6
+
+# Tamaño de la ventana principal de la interfaz (ancho x alto)
+TAMAÑO_VENTANA = "900x800"
+
+# Cada cuántos ms la interfaz revisa si terminó el trabajo en segundo plano
+INTERVALO_SONDEO_MS = 50
+
+# Tamaño de bloque (n) del modo por bloques. None = modo clásico n = ceil(sqrt(len))
+TAMAÑO_BLOQUE_DEFECTO: Optional[int] = None
+
+# Elementos no nulos por columna de los factores triangulares de la clave.
+# Acota los valores de la clave y de su inversa a [-(1 + d), 1 + d]
+CLAVE_DENSIDAD = 3
+
+# κ₁ de las claves de densidad 1: la menor cota que admite construir_claves_acotadas
+COTA_CONDICION_MIN = 9
+
+# Fachada asyncio: hilos del executor y operaciones simultáneas máximas
+ASYNC_MAX_TRABAJADORES = 4
+ASYNC_MAX_EN_VUELO = 32
+
+# Pool de claves: niveles de reposición por tamaño y memoria máxima (bytes)
+POOL_NIVEL_BAJO = 2
+POOL_NIVEL_ALTO = 8
+POOL_MEMORIA_MAX = 32 * 1024 * 1024
+
+# Historial: entradas retenidas en memoria (HISTORIAL_MAX, definido en
+# historial.py) y archivo SQLite para las más antiguas (None = se
+# descartan al llenarse)
+HISTORIAL_RUTA_SQLITE: Optional[str] = None
+
+# Bóveda de cifrados: bytes en memoria (LRU, BOVEDA_MEMORIA_MAX, definido
+# en boveda.py) y carpeta de contenedores (None = carpeta temporal que se
+# borra al cerrar el servicio). Los contenedores sólo persisten entre
+# ejecuciones junto con un historial SQLite, que continúa sus ids
+BOVEDA_DIRECTORIO: Optional[str] = None
+
 # ==================== SISTEMA DE LOGGING ====================
 
 def obtener_logger(nombre: str) -> logging.Logger:
@@ -202,6 +270,427 @@ class ServicioAutenticacion:
         """
         return password == self.password
 
+# ==================== GENERACIÓN DE CLAVES ====================
+
+def _factores_nilpotentes(en_a: NDArray, densidad: int, superior: bool) -> NDArray:
+    """
+    Matrices N estrictamente triangulares con N @ N = 0, forma (k, n, n).
+    
+    `en_a` (k, n) reparte los índices en dos grupos A y B. El factor
+    inferior sólo tiene valores ±1 en filas de B y columnas de A; el
+    superior, en filas de A y columnas de B. Como ninguna columna es
+    también fila, N @ N = 0, y por tanto (I + N)^(-1) = I - N.
+    Cada columna recibe min(densidad, posiciones válidas) valores no
+    nulos, elegidos al azar (todo vectorizado, sin bucles).
+    """
+    import numpy as np
+    
+    k, n = en_a.shape
+    filas = np.arange(n)[:, None]
+    columnas = np.arange(n)[None, :]
+    if superior:
+        validos = en_a[:, :, None] & (~en_a)[:, None, :] & (columnas > filas)
+    else:
+        validos = (~en_a)[:, :, None] & en_a[:, None, :] & (columnas < filas)
+    puntajes = np.where(validos, np.random.rand(k, n, n), -1.0)
+    
+    # Quedarse con las `densidad` posiciones válidas de mayor puntaje por columna
+    elegidos = validos
+    if densidad < n:
+        umbral = -np.partition(-puntajes, densidad - 1, axis=1)[:, densidad - 1:densidad, :]
+        elegidos = validos & (puntajes >= umbral)
+    
+    signos = np.where(np.random.rand(k, n, n) < 0.5, -1, 1)
+    return np.where(elegidos, signos, 0).astype(np.int64)
+
+
+def _columnas_unitarias(claves: NDArray) -> NDArray:
+    """(k,) booleano: la clave tiene alguna columna con un único valor no nulo."""
+    import numpy as np
+    
+    return (np.count_nonzero(claves, axis=-2) <= 1).any(axis=-1)
+
+
+def construir_claves_invertibles(
+    k: int,
+    n: int,
+    densidad: int = CLAVE_DENSIDAD
+) -> Tuple[NDArray, NDArray]:
+    """
+    CONSTRUIR LOTE DE CLAVES INVERTIBLES
+    ====================================
+    
+    Versión por lotes de construir_clave_invertible: genera k claves
+    n×n y sus inversas con operaciones sobre arreglos (k, n, n).
+    
+    Args:
+        k: Número de claves
+        n: Tamaño de cada clave (n×n)
+        densidad: Valores no nulos por columna de N y M (d >= 1)
+    
+    Returns:
+        Tupla (claves, claves_inv) de arreglos int64 (k, n, n).
+    
+    Raises:
+        ValueError: Si densidad < 1
+    """
+    import numpy as np
+    
+    if densidad < 1:
+        raise ValueError(f"densidad debe ser >= 1: {densidad}")
+    
+    identidad = np.eye(n, dtype=np.int64)
+    claves = np.empty((k, n, n), dtype=np.int64)
+    claves_inv = np.empty((k, n, n), dtype=np.int64)
+    pendientes = np.arange(k)
+    while len(pendientes):
+        # 0 ∈ A y n-1 ∈ B: toda columna tiene al menos una posición válida
+        en_a = np.random.rand(len(pendientes), n) < 0.5
+        en_a[:, 0] = True
+        if n > 1:
+            en_a[:, -1] = False
+        n_inf = _factores_nilpotentes(en_a, densidad, superior=False)
+        m_sup = _factores_nilpotentes(en_a, densidad, superior=True)
+        
+        # L · U = I + N + M + N·M  y  U^(-1) · L^(-1) = I - N - M + M·N
+        # (productos en float64 para usar BLAS; con valores tan pequeños son exactos)
+        nm = np.matmul(n_inf.astype(float), m_sup.astype(float)).astype(np.int64)
+        mn = np.matmul(m_sup.astype(float), n_inf.astype(float)).astype(np.int64)
+        lu = identidad + n_inf + m_sup + nm
+        lu_inv = identidad - n_inf - m_sup + mn
+        
+        # K = P · (L·U) permuta filas; K^(-1) = (L·U)^(-1) · P^T permuta columnas
+        filas = np.argsort(np.random.rand(len(pendientes), n), axis=1)
+        claves[pendientes] = np.take_along_axis(lu, filas[:, :, None], axis=1)
+        claves_inv[pendientes] = np.take_along_axis(lu_inv, filas[:, None, :], axis=2)
+        
+        # Una columna unitaria copiaría un código del texto al cifrado:
+        # rehacer esas claves (sólo pasa si N·M cancela la diagonal).
+        # Con n = 1 la clave es [±1] y no hay otra opción.
+        if n == 1:
+            break
+        pendientes = pendientes[_columnas_unitarias(claves[pendientes])]
+    return claves, claves_inv
+
+
+def construir_clave_invertible(
+    n: int,
+    densidad: int = CLAVE_DENSIDAD
+) -> Tuple[NDArray, NDArray]:
+    """
+    CONSTRUIR CLAVE INVERTIBLE
+    ==========================
+    
+    Construye K = P · L · U con:
+      - L = I + N, unitriangular inferior, N @ N = 0  →  L^(-1) = I - N
+      - U = I + M, unitriangular superior, M @ M = 0  →  U^(-1) = I - M
+      - P permutación de filas aleatoria
+    
+    Entonces det(K) = ±1 sin calcularlo, y la inversa sale gratis:
+        K^(-1) = (I - M) · (I - N) · P^T
+    
+    Como N y M tienen a lo sumo `densidad` valores ±1 por columna, todos
+    los valores de K y de K^(-1) son enteros en [-(1 + d), 1 + d].
+    Ambas matrices son exactas en float64 para cualquier n.
+    
+    Toda columna de N o de M tiene al menos un valor, así que (para
+    n >= 2) ninguna columna de K es un vector unitario: cada valor del
+    cifrado mezcla al menos dos códigos del texto.
+    
+    Args:
+        n: Tamaño de la clave (n×n)
+        densidad: Valores no nulos por columna de N y M (d >= 1)
+    
+    Returns:
+        Tupla (clave, clave_inv) de matrices int64 (n, n).
+    
+    Ejemplo:
+        >>> clave, clave_inv = construir_clave_invertible(4)
+        >>> np.array_equal(clave @ clave_inv, np.eye(4))
+        True
+    """
+    claves, claves_inv = construir_claves_invertibles(1, n, densidad)
+    return claves[0], claves_inv[0]
+
+
+def construir_claves_acotadas(
+    k: int,
+    n: int,
+    cota_condicion: float,
+    densidad: int = CLAVE_DENSIDAD
+) -> Tuple[NDArray, NDArray]:
+    """
+    CONSTRUIR CLAVES CON CONDICIÓN ACOTADA
+    ======================================
+    
+    Como construir_claves_invertibles, pero sólo retorna claves con
+    κ₁(K) <= cota_condicion (ver encriptador.numero_condicion). Se
+    construyen candidatas por lotes y se filtran; si con la densidad
+    actual casi ninguna cumple, se reduce la densidad. Con densidad 1
+    cada columna de K y de K^(-1) suma a lo sumo 3 en valor absoluto
+    (κ₁ <= 9), así que el proceso siempre termina.
+    
+    Args:
+        k: Número de claves
+        n: Tamaño de cada clave (n×n)
+        cota_condicion: κ₁ máximo admitido (>= COTA_CONDICION_MIN)
+        densidad: Densidad inicial (ver construir_clave_invertible)
+    
+    Returns:
+        Tupla (claves, claves_inv) de arreglos int64 (k, n, n).
+    
+    Raises:
+        ValueError: Si cota_condicion < COTA_CONDICION_MIN
+    
+    Ejemplo:
+        >>> claves, _ = construir_claves_acotadas(4, 16, 2 ** 24 // 127)
+    """
+    import numpy as np
+    from encriptador import numero_condicion
+    
+    if cota_condicion < COTA_CONDICION_MIN:
+        raise ValueError(
+            f"cota_condicion debe ser >= {COTA_CONDICION_MIN}: {cota_condicion}"
+        )
+    
+    aceptadas: List[NDArray] = []
+    aceptadas_inv: List[NDArray] = []
+    faltan = k
+    while faltan > 0:
+        candidatas = max(2 * faltan, 8)
+        claves, claves_inv = construir_claves_invertibles(candidatas, n, densidad)
+        validas = numero_condicion(claves, claves_inv) <= cota_condicion
+        aceptadas.append(claves[validas][:faltan])
+        aceptadas_inv.append(claves_inv[validas][:faltan])
+        faltan -= len(aceptadas[-1])
+        
+        # Menos de 1 de cada 4 candidatas cumple: bajar la densidad
+        if densidad > 1 and validas.sum() * 4 < candidatas:
+            densidad -= 1
+    
+    return np.concatenate(aceptadas), np.concatenate(aceptadas_inv)
+
+# ==================== POOL DE CLAVES ====================
+
+# Entrada del pool: (clave, clave_inversa, permutacion)
+MaterialClave = Tuple["NDArray", "NDArray", Tuple[int, ...]]
+
+
+class PoolClaves:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║        POOL DE CLAVES PRE-GENERADAS EN SEGUNDO PLANO  ║
+    ╚═══════════════════════════════════════════════════════╝
+    
+    Mantiene, para cada tamaño n, una cola de claves listas (clave,
+    inversa y permutación) que un hilo trabajador repone en segundo
+    plano. Así la generación de claves sale de la latencia de encriptar().
+    
+    FUNCIONAMIENTO:
+    ===============
+    obtener(n) → Cola con material → acierto (sin generar nada)
+              → Cola vacía       → fallo (se genera en línea)
+    Si la cola queda por debajo de nivel_bajo, el trabajador la rellena
+    hasta nivel_alto.
+    
+    LÍMITE DE MEMORIA:
+    ==================
+    Si el material almacenado supera memoria_max, se descartan las colas
+    de los tamaños menos usados (nunca la del tamaño que se está pidiendo).
+    Un tamaño descartado deja de reponerse hasta que obtener(n) lo pide
+    de nuevo, así el trabajador no genera claves que luego descarta.
+    
+    Ejemplo:
+        >>> pool = PoolClaves(generador, nivel_bajo=2, nivel_alto=8)
+        >>> clave, clave_inv, permutacion = pool.obtener(16)
+        >>> pool.estadisticas()['aciertos']
+    """
+    
+    def __init__(
+        self,
+        generador: Callable[[int], MaterialClave],
+        nivel_bajo: int = POOL_NIVEL_BAJO,
+        nivel_alto: int = POOL_NIVEL_ALTO,
+        memoria_max: int = POOL_MEMORIA_MAX
+    ) -> None:
+        """
+        INICIALIZAR POOL DE CLAVES
+        ==========================
+        
+        Args:
+            generador: Función n → (clave, clave_inv, permutacion)
+            nivel_bajo: Cuando una cola baja de este nivel se pide reposición
+            nivel_alto: Nivel hasta el que el trabajador rellena cada cola
+            memoria_max: Bytes máximos de material almacenado
+        
+        Raises:
+            ValueError: Si los niveles no cumplen 0 <= nivel_bajo <= nivel_alto
+        """
+        if not 0 <= nivel_bajo <= nivel_alto or nivel_alto < 1:
+            raise ValueError(
+                f"Niveles inválidos: bajo={nivel_bajo}, alto={nivel_alto}"
+            )
+        
+        self.generador = generador
+        self.nivel_bajo = nivel_bajo
+        self.nivel_alto = nivel_alto
+        self.memoria_max = memoria_max
+        
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+        
+        self._colas: Dict[int, deque] = {}
+        self._usos: Dict[int, int] = {}
+        self._bytes = 0
+        self._pendientes: deque = deque()
+        self._condicion = threading.Condition()
+        self._activo = True
+        
+        self._hilo = threading.Thread(
+            target=self._trabajador, name="PoolClaves", daemon=True
+        )
+        self._hilo.start()
+        logger.info(f"Pool de claves iniciado (bajo={nivel_bajo}, alto={nivel_alto})")
+    
+    @staticmethod
+    def _tamaño_material(material: MaterialClave) -> int:
+        """Bytes ocupados por una entrada del pool."""
+        clave, clave_inv, permutacion = material
+        return clave.nbytes + clave_inv.nbytes + 8 * len(permutacion)
+    
+    def obtener(self, n: int) -> MaterialClave:
+        """
+        OBTENER MATERIAL DE CLAVE
+        =========================
+        
+        Args:
+            n: Tamaño de la clave (n×n)
+        
+        Returns:
+            Tupla (clave, clave_inv, permutacion) lista para usar.
+        """
+        with self._condicion:
+            self._usos[n] = self._usos.get(n, 0) + 1
+            cola = self._colas.setdefault(n, deque())
+            material = cola.popleft() if cola else None
+            
+            if material is not None:
+                self.aciertos += 1
+                self._bytes -= self._tamaño_material(material)
+            else:
+                self.fallos += 1
+            
+            # Pedir reposición si la cola quedó baja
+            if len(cola) < self.nivel_bajo and n not in self._pendientes:
+                self._pendientes.append(n)
+                self._condicion.notify()
+        
+        if material is None:
+            material = self.generador(n)
+        return material
+    
+    def _trabajador(self) -> None:
+        """Hilo de fondo: rellenar las colas pendientes hasta nivel_alto."""
+        while True:
+            with self._condicion:
+                while self._activo and not self._pendientes:
+                    self._condicion.wait()
+                if not self._activo:
+                    return
+                n = self._pendientes[0]
+                if len(self._colas.get(n, ())) >= self.nivel_alto:
+                    self._pendientes.popleft()
+                    continue
+            
+            # Generar fuera del lock para no bloquear a obtener()
+            try:
+                material = self.generador(n)
+            except Exception as e:
+                logger.error(f"❌ Error generando clave {n}×{n} para el pool: {e}")
+                with self._condicion:
+                    if n in self._pendientes:
+                        self._pendientes.remove(n)
+                continue
+            
+            with self._condicion:
+                # detener() pudo llegar mientras se generaba: no volver a llenar
+                if not self._activo:
+                    return
+                cola = self._colas.setdefault(n, deque())
+                cola.append(material)
+                self._bytes += self._tamaño_material(material)
+                if len(cola) >= self.nivel_alto and n in self._pendientes:
+                    self._pendientes.remove(n)
+                self._aplicar_limite_memoria(n)
+    
+    def _aplicar_limite_memoria(self, protegido: int) -> None:
+        """Descartar colas de los tamaños menos usados hasta caber en memoria_max."""
+        while self._bytes > self.memoria_max:
+            candidatos = [m for m, cola in self._colas.items()
+                          if cola and m != protegido]
+            if not candidatos:
+                # Sólo queda el tamaño protegido: recortar su cola
+                cola = self._colas[protegido]
+                self._bytes -= self._tamaño_material(cola.pop())
+                self.descartes += 1
+                if protegido in self._pendientes:
+                    self._pendientes.remove(protegido)
+                continue
+            
+            menos_usado = min(candidatos, key=lambda m: self._usos.get(m, 0))
+            cola = self._colas.pop(menos_usado)
+            self._bytes -= sum(self._tamaño_material(m) for m in cola)
+            self.descartes += len(cola)
+            # No reponerlo hasta que un obtener(n) lo vuelva a pedir
+            if menos_usado in self._pendientes:
+                self._pendientes.remove(menos_usado)
+            if instrumentacion.activa:
+                instrumentacion.emitir("pool.descarte", n=menos_usado, claves=len(cola))
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        ESTADÍSTICAS DEL POOL
+        =====================
+        
+        Returns:
+            Dict con:
+                'aciertos': Claves servidas desde el pool
+                'fallos': Claves generadas en línea (cola vacía)
+                'tasa_aciertos': aciertos / (aciertos + fallos)
+                'descartes': Claves descartadas por límite de memoria
+                'bytes': Memoria ocupada por el material almacenado
+                'colas': {n: claves disponibles}
+        """
+        with self._condicion:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "descartes": self.descartes,
+                "bytes": self._bytes,
+                "colas": {n: len(cola) for n, cola in self._colas.items()},
+            }
+    
+    def precargar(self, n: int) -> None:
+        """Pedir al trabajador que llene la cola de tamaño n por adelantado."""
+        with self._condicion:
+            self._usos.setdefault(n, 0)
+            if n not in self._pendientes:
+                self._pendientes.append(n)
+                self._condicion.notify()
+    
+    def detener(self) -> None:
+        """Detener el hilo trabajador y liberar el material almacenado."""
+        with self._condicion:
+            self._activo = False
+            self._colas.clear()
+            self._bytes = 0
+            self._condicion.notify_all()
+        self._hilo.join()
+        logger.info("Pool de claves detenido")
+
 # ==================== SERVICIO DE ENCRIPTACIÓN ====================
 
 class ServicioEncriptacion:
@@ -224,7 +713,7 @@ class ServicioEncriptacion:
     cifrado_actual: Última matriz encriptada generada
     clave_actual: Última clave generada
     permutacion_actual: Última permutación aplicada
-    historial: Lista de operaciones realizadas
+    historial: HistorialEncriptaciones acotado (ver historial.py)
     
     OPERACIÓN TÍPICA:
     =================
@@ -236,88 +725,280 @@ class ServicioEncriptacion:
     6. Encripta el texto → matriz de números grandes
     7. Almacena en historial
     8. Usuario puede desencriptar después
+    
+    MODO POR BLOQUES:
+    =================
+    Con tamaño_bloque=n el tamaño de la clave queda fijo: el texto se
+    reparte en filas de ancho n y se cifra con una única clave n×n.
+    El costo total crece linealmente con la longitud del texto
+    (un documento de 1 MB con n=16 usa una clave 16×16, no 1000×1000).
     """
     
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        tamaño_bloque: Optional[int] = TAMAÑO_BLOQUE_DEFECTO,
+        dtype: Any = "float64",
+        codigo_max: Optional[int] = None,
+        historial_max: int = HISTORIAL_MAX,
+        historial_sqlite: Optional[str] = HISTORIAL_RUTA_SQLITE,
+        boveda_memoria: int = BOVEDA_MEMORIA_MAX,
+        boveda_directorio: Optional[str] = BOVEDA_DIRECTORIO
+    ) -> None:
         """
         INICIALIZAR SERVICIO DE ENCRIPTACIÓN
         =====================================
         
+        Args:
+            tamaño_bloque: Ancho fijo n de las filas (modo por bloques).
+                           None usa el modo clásico n = ceil(sqrt(len(texto))).
+            dtype: "float64" (defecto) o "float32" (también np.float64 /
+                   np.float32). En float32 las claves se generan con
+                   κ₁(K) <= 2^24 / codigo_max para que el descifrado sea
+                   exacto (ver Encriptador).
+            codigo_max: Código Unicode máximo de los textos (sólo float32).
+                        None = todo Unicode.
+            historial_max: Entradas del historial retenidas en memoria.
+            historial_sqlite: Archivo SQLite donde desbordar el historial.
+            boveda_memoria: Bytes de cifrados retenidos en memoria.
+            boveda_directorio: Carpeta de los cifrados expulsados. Persisten
+                               entre ejecuciones sólo con historial_sqlite.
+        
+        Raises:
+            ValueError: Si tamaño_bloque no es un entero >= 2, o dtype
+                        no es float32/float64
+        
         Attributes iniciales:
             encriptador_actual: None (sin encriptación activa)
             cifrado_actual: None (sin resultado)
             clave_actual: None (sin clave generada)
             permutacion_actual: None (sin permutación)
-            historial: [] (lista vacía)
+            longitud_actual: None (longitud del texto cifrado)
+            historial: HistorialEncriptaciones vacío
+            boveda: BovedaCifrados vacía (cifrados por id)
         """
+        if tamaño_bloque is not None and (
+            not isinstance(tamaño_bloque, int) or tamaño_bloque < 2
+        ):
+            raise ValueError(f"tamaño_bloque debe ser un entero >= 2: {tamaño_bloque}")
+        
+        # Nombre del tipo, sin importar numpy (np.float32 → "float32")
+        self.dtype = getattr(dtype, "__name__", None) or str(dtype)
+        if self.dtype not in ("float32", "float64"):
+            raise ValueError(f"dtype debe ser float32 o float64: {dtype}")
+        
+        self.tamaño_bloque = tamaño_bloque
+        self.codigo_max = codigo_max
+        # κ₁ máximo de las claves generadas (None = sin cota, modo float64)
+        self.cota_condicion: Optional[int] = None
+        if self.dtype == "float32" or codigo_max is not None:
+            from encriptador import MANTISA_FLOAT32, CODIGO_MAX_UNICODE
+            if codigo_max is None:
+                self.codigo_max = CODIGO_MAX_UNICODE
+            if not 0 < self.codigo_max <= CODIGO_MAX_UNICODE:
+                raise ValueError(f"codigo_max fuera de rango: {codigo_max}")
+            if self.dtype == "float32":
+                self.cota_condicion = MANTISA_FLOAT32 // self.codigo_max
         self.encriptador_actual: Optional[Any] = None
         self.cifrado_actual: Optional[NDArray] = None
         self.clave_actual: Optional[NDArray] = None
         self.permutacion_actual: Optional[Tuple] = None
-        self.historial: List[Dict[str, Any]] = []
+        self.longitud_actual: Optional[int] = None
+        self.historial = HistorialEncriptaciones(historial_max, historial_sqlite)
+        
+        # Los ids sólo continúan entre ejecuciones con un historial SQLite:
+        # sólo entonces la bóveda reutiliza un espacio fijo de boveda_directorio
+        espacio = None
+        if historial_sqlite is not None and historial_sqlite != ":memory:":
+            ruta = os.path.abspath(historial_sqlite).encode("utf-8")
+            espacio = f"historial_{hashlib.sha1(ruta).hexdigest()[:12]}"
+        self.boveda = BovedaCifrados(boveda_memoria, boveda_directorio, espacio)
+        self.pool: Optional[PoolClaves] = None
+        
+        # Protege el estado actual y el historial entre hilos
+        self._lock = threading.Lock()
         logger.info("Servicio de encriptación inicializado")
     
-    def _generar_clave(self, n: int) -> NDArray:
+    @staticmethod
+    def _verificar_cancelacion(cancelacion: Optional[threading.Event]) -> None:
+        """Levantar OperacionCanceladaError si se pidió cancelar."""
+        if cancelacion is not None and cancelacion.is_set():
+            raise OperacionCanceladaError("Operación cancelada")
+    
+    def _procesar_cancelable(
+        self,
+        enc: Any,
+        matriz: NDArray,
+        cifrar: bool,
+        cancelacion: threading.Event
+    ) -> NDArray:
+        """
+        Cifrar o descifrar por bloques de filas (como procesar_en_paralelo,
+        en este hilo) revisando `cancelacion` entre bloques: cancelar no
+        espera a que termine una única multiplicación grande.
+        """
+        import numpy as np
+        from encriptador import FILAS_POR_BLOQUE
+        
+        # ≈ FILAS_POR_BLOQUE × n² operaciones / n por bloque, para cualquier n
+        filas = max(1, FILAS_POR_BLOQUE // enc.n)
+        bloques = []
+        for inicio in range(0, matriz.shape[0], filas):
+            self._verificar_cancelacion(cancelacion)
+            bloques.append(enc.procesar_en_paralelo(
+                matriz[inicio:inicio + filas], cifrar, trabajadores=1, filas_por_bloque=filas
+            ))
+        self._verificar_cancelacion(cancelacion)
+        return np.concatenate(bloques)
+    
+    def activar_pool(
+        self,
+        nivel_bajo: int = POOL_NIVEL_BAJO,
+        nivel_alto: int = POOL_NIVEL_ALTO,
+        memoria_max: int = POOL_MEMORIA_MAX
+    ) -> PoolClaves:
+        """
+        ACTIVAR POOL DE CLAVES
+        ======================
+        
+        Crea un PoolClaves que pre-genera claves en segundo plano. En modo
+        por bloques se precarga el tamaño fijo para que la primera
+        encriptación ya sea un acierto.
+        
+        Args:
+            nivel_bajo, nivel_alto, memoria_max: Ver PoolClaves
+        
+        Returns:
+            PoolClaves: El pool activo (para consultar estadisticas()).
+        """
+        self.desactivar_pool()
+        self.pool = PoolClaves(self._generar_material, nivel_bajo, nivel_alto, memoria_max)
+        if self.tamaño_bloque is not None:
+            self.pool.precargar(self.tamaño_bloque)
+        return self.pool
+    
+    def desactivar_pool(self) -> None:
+        """Detener el pool de claves (si hay uno activo)."""
+        if self.pool is not None:
+            self.pool.detener()
+            self.pool = None
+    
+    def _opciones_encriptador(self) -> Dict[str, Any]:
+        """Argumentos extra del encriptador: sólo el modo float32 los necesita."""
+        if self.dtype == "float32":
+            return {"dtype": self.dtype, "codigo_max": self.codigo_max}
+        return {}
+    
+    def _calcular_n(self, longitud: int) -> int:
+        """
+        CALCULAR TAMAÑO DE CLAVE
+        ========================
+        
+        Modo clásico: n = max(2, ceil(sqrt(longitud))), la clave crece
+        con el texto. Modo por bloques: n = tamaño_bloque, constante.
+        
+        Args:
+            longitud: Número de caracteres del texto
+        
+        Returns:
+            int: Tamaño n de la matriz clave (n×n)
+        """
+        if self.tamaño_bloque is not None:
+            return self.tamaño_bloque
+        return max(2, math.ceil(math.sqrt(longitud)))
+    
+    @medir_etapa("generar_clave", lambda args, claves: claves[0].nbytes)
+    def _generar_clave(self, n: int) -> Tuple[NDArray, NDArray]:
         """
         GENERAR MATRIZ INVERTIBLE ALEATORIA
         ====================================
         
-        Genera una matriz NxN con valores aleatorios entre 1-8 que sea
-        invertible (determinante > DTERMINANTE_MIN). Realiza hasta 100
-        intentos antes de rendirse.
-        
-        PROCESO:
-        ========
-        1. Generar matriz aleatoria (n×n) con valores en [1, 9)
-        2. Calcular determinante
-        3. Si |det| > DTERMINANTE_MIN → Retorna matriz
-        4. Si |det| ≈ 0 → Intenta de nuevo (máx 100 veces)
+        Construye una clave NxN invertible por construcción (ver
+        construir_clave_invertible), sin calcular determinantes.
+        La inversa sale de la misma construcción.
+        En modo float32 la clave además cumple κ₁(K) <= cota_condicion
+        (ver construir_claves_acotadas).
         
         Args:
             n: Tamaño de la matriz (n×n)
         
         Returns:
-            NDArray: Matriz invertible de forma (n, n)
+            Tupla (clave, clave_inv) de matrices enteras (n, n)
+            con clave @ clave_inv = I exactamente.
         
         Raises:
-            EncriptacionError: Si no logra generar matriz invertible
+            EncriptacionError: Si n < 1
         
         Ejemplo:
             >>> enc = ServicioEncriptacion()
-            >>> clave = enc._generar_clave(3)
-            >>> print(det(clave))  # > 0.000001
+            >>> clave, clave_inv = enc._generar_clave(3)
+            >>> clave @ clave_inv  # Identidad exacta
+        """
+        if n < 1:
+            msg = f"Tamaño de clave inválido: {n}"
+            logger.error(msg)
+            raise EncriptacionError(msg)
         
-        Nota matemática:
-            Una matriz es invertible ⟺ det(A) ≠ 0
-            DTERMINANTE_MIN = 1e-6 protege contra problemas numéricos
+        if self.cota_condicion is not None:
+            claves, claves_inv = construir_claves_acotadas(1, n, self.cota_condicion)
+            return claves[0], claves_inv[0]
+        
+        return construir_clave_invertible(n)
+    
+    def _generar_material(self, n: int) -> MaterialClave:
         """
-        # Intentar hasta 100 veces generar matriz invertible
-        for intento in range(100):
-            # Generar matriz aleatoria 1-8
-            matriz = np.random.randint(1, 9, size=(n, n))
-            
-            # Calcular determinante
-            det = np.linalg.det(matriz)
-            
-            # Validar invertibilidad
-            if abs(det) > DTERMINANTE_MIN:
-                logger.debug(f"Clave {n}×{n} generada en intento {intento+1} "
-                           f"(det={det:.6f})")
-                return matriz
+        GENERAR MATERIAL DE CLAVE
+        =========================
+        
+        Genera clave invertible, su inversa y una permutación aleatoria.
+        Es la función que usa PoolClaves para reponer sus colas.
         
-        # No se logró generar clave invertible
-        msg = "No se pudo generar matriz invertible después de 100 intentos"
-        logger.error(msg)
-        raise EncriptacionError(msg)
+        Args:
+            n: Tamaño de la clave (n×n)
+        
+        Returns:
+            Tupla (clave, clave_inv, permutacion)
+        """
+        import numpy as np
+        
+        clave, clave_inv = self._generar_clave(n)
+        permutacion = tuple(int(i) for i in np.random.permutation(n))
+        return clave, clave_inv, permutacion
+    
+    @medir_etapa("generar_clave_lote", lambda args, material: sum(m[0].nbytes for m in material))
+    def _generar_material_lote(self, n: int, k: int) -> List[MaterialClave]:
+        """Generar k entradas de material de clave n×n en una sola construcción."""
+        import numpy as np
+        
+        if self.cota_condicion is not None:
+            claves, claves_inv = construir_claves_acotadas(k, n, self.cota_condicion)
+        else:
+            claves, claves_inv = construir_claves_invertibles(k, n)
+        permutaciones = np.argsort(np.random.rand(k, n), axis=1).tolist()
+        return [
+            (claves[j], claves_inv[j], tuple(permutaciones[j]))
+            for j in range(k)
+        ]
+    
+    def _obtener_material(self, n: int) -> MaterialClave:
+        """Tomar material de clave del pool si está activo, o generarlo."""
+        if self.pool is not None:
+            return self.pool.obtener(n)
+        return self._generar_material(n)
     
-    def encriptar(self, texto: str, encriptador) -> Dict[str, Any]:
+    @medir_etapa("servicio.encriptar", lambda args, resultado: resultado["cifrado"].nbytes)
+    def encriptar(
+        self,
+        texto: str,
+        encriptador,
+        cancelacion: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
         """
         ENCRIPTAR TEXTO
         ===============
         
         Procesa un texto plano completando estos pasos:
         1. Validar que el texto no esté vacío
-        2. Calcular n = ceil(sqrt(len(texto)))
+        2. Calcular n = ceil(sqrt(len(texto))) o usar tamaño_bloque fijo
         3. Generar clave invertible n×n
         4. Generar permutación aleatoria de [0, 1, ..., n-1]
         5. Crear instancia de Encriptador
@@ -327,11 +1008,15 @@ class ServicioEncriptacion:
         Args:
             texto: String a encriptar
             encriptador: Clase Encriptador (ej: from encriptador import Encriptador)
+            cancelacion: Evento opcional; si se activa, la operación se
+                         detiene entre pasos (y entre bloques de filas
+                         del cifrado) sin modificar el estado
         
         Returns:
             Dict con:
+                'id': Identificador para desencriptar(id) más tarde
                 'texto': Texto original
-                'unicode': Lista de códigos Unicode de cada carácter
+                'unicode': Códigos Unicode de cada carácter (arreglo uint32)
                 'clave': Matriz clave generada (n×n)
                 'permutacion': Tupla de permutación aplicada
                 'cifrado': Matriz resultado de encriptación
@@ -339,79 +1024,74 @@ class ServicioEncriptacion:
         Raises:
             ValueError: Si el texto es vacío
             EncriptacionError: Si falla la generación de clave
+            OperacionCanceladaError: Si se activó `cancelacion`
         
         Ejemplo:
             >>> from encriptador import Encriptador
             >>> enc_svc = ServicioEncriptacion()
             >>> resultado = enc_svc.encriptar("Hola", Encriptador)
-            >>> print(resultado['unicode'])       # [72, 111, 108, 97]
+            >>> print(resultado['unicode'])       # [ 72 111 108  97]
             >>> print(resultado['cifrado'].shape) # (2, 2)
         
         DATOS ALMACENADOS:
         ==================
         Después de encriptar, el servicio guarda:
         - estado: encriptador_actual, cifrado_actual, clave_actual, permutacion_actual
-        - historial: Entrada con texto, codes unicode y permutación usada
+        - historial: Entrada con texto y permutación usada
         
         Esto permite desencriptar() después sin parámetros
         """
+        from encriptador import texto_a_codigos
+        
         try:
             # Paso 1: Validar entrada
             if not texto or not isinstance(texto, str) or not texto.strip():
                 raise ValueError("El texto debe ser un string no vacío")
             
-            logger.info(f"Iniciando encriptación de {len(texto)} caracteres")
-            
             # Paso 2: Calcular tamaño de matriz
-            # n debe ser al menos ceil(sqrt(len(texto))) para que quepa el texto
-            n = max(2, math.ceil(math.sqrt(len(texto))))
-            logger.debug(f"Tamaño de matriz calculado: {n}×{n}")
+            # Modo clásico: n = ceil(sqrt(len(texto))); modo por bloques: n fijo
+            n = self._calcular_n(len(texto))
+            if instrumentacion.activa:
+                instrumentacion.emitir("encriptar.inicio", caracteres=len(texto), n=n)
             
-            # Paso 3: Generar clave invertible
-            clave = self._generar_clave(n)
-            logger.debug(f"Clave generada: det={np.linalg.det(clave):.6f}")
+            # Pasos 3 y 4: Clave invertible, inversa y permutación (pool o en línea)
+            self._verificar_cancelacion(cancelacion)
+            clave, clave_inv, permutacion = self._obtener_material(n)
+            if instrumentacion.activa and instrumentacion.diagnosticos:
+                self._diagnosticar_clave(clave, clave_inv, permutacion)
             
-            # Paso 4: Generar permutación aleatoria
-            permutacion = tuple(np.random.permutation(n))
-            logger.debug(f"Permutación generada: {permutacion}")
+            # Paso 5: Crear encriptador (con la inversa ya calculada)
+            enc = encriptador(clave.tolist(), permutacion, clave_inv=clave_inv,
+                              **self._opciones_encriptador())
             
-            # Paso 5: Crear encriptador
-            enc = encriptador(clave.tolist(), permutacion)
-            logger.debug("Instancia de Encriptador creada")
+            # Paso 6: Ejecutar encriptación (por bloques si se puede cancelar)
+            self._verificar_cancelacion(cancelacion)
+            if cancelacion is None:
+                cifrado = enc.encriptar(texto)
+            else:
+                cifrado = self._procesar_cancelable(enc, enc.texto_a_matriz(texto), True,
+                                                    cancelacion)
             
-            # Paso 6: Ejecutar encriptación
-            cifrado = enc.encriptar(texto)
-            logger.info("✓ Encriptación exitosa")
-            
-            # Paso 7: Guardar estado
-            self.encriptador_actual = enc
-            self.cifrado_actual = cifrado
-            self.clave_actual = clave
-            self.permutacion_actual = permutacion
+            # Códigos Unicode (vista sobre el buffer UTF-32, sin listas Python)
+            unicode_codes = texto_a_codigos(texto)
             
-            # Convertir caracteres a códigos Unicode
-            unicode_codes = [ord(c) for c in texto]
-            
-            # Paso 8: Agregar al historial
-            self.historial.append({
-                "texto": texto,
-                "unicode": unicode_codes,
-                "permutacion": permutacion,
-                "timestamp": logger.handlers[0].formatter.formatTime(
-                    logging.LogRecord(
-                        name=__name__,
-                        level=logging.INFO,
-                        pathname="",
-                        lineno=0,
-                        msg="",
-                        args=(),
-                        exc_info=None
-                    )
-                ) if logger.handlers else "unknown"
-            })
+            # Pasos 7 y 8: Guardar estado y agregar al historial (atómico)
+            self._verificar_cancelacion(cancelacion)
+            with self._lock:
+                self.encriptador_actual = enc
+                self.cifrado_actual = cifrado
+                self.clave_actual = clave
+                self.permutacion_actual = permutacion
+                self.longitud_actual = len(texto)
+                
+                id_ = self.historial.agregar(texto, permutacion)
+            self.boveda.guardar(id_, enc, cifrado, len(texto))
+            if instrumentacion.activa:
+                instrumentacion.emitir("encriptar.fin", id=id_, caracteres=len(texto), n=n)
             
             # Retornar información completa
             return {
+                "id": id_,
                 "texto": texto,
                 "unicode": unicode_codes,
                 "clave": clave,
@@ -419,80 +1099,427 @@ class ServicioEncriptacion:
                 "cifrado": cifrado
             }
         
+        except OperacionCanceladaError:
+            if instrumentacion.activa:
+                instrumentacion.emitir("encriptar.cancelado", logging.INFO)
+            raise
+        
         except Exception as e:
             logger.error(f"❌ Error en encriptación: {str(e)}")
             raise EncriptacionError(f"Error: {str(e)}") from e
     
-    def desencriptar(self) -> str:
+    @staticmethod
+    def _diagnosticar_clave(clave: NDArray, clave_inv: NDArray,
+                            permutacion: Tuple[int, ...]) -> None:
         """
-        DESENCRIPTAR MATRIZ ACTUAL
-        ==========================
+        Diagnóstico caro de la clave (O(n³)): sólo con
+        instrumentacion.activar_diagnosticos().
+        """
+        import numpy as np
+        from encriptador import numero_condicion
+        
+        instrumentacion.emitir(
+            "clave.diagnostico",
+            n=len(permutacion),
+            det=float(np.linalg.det(clave)),
+            condicion=float(numero_condicion(clave, clave_inv)),
+            permutacion=permutacion
+        )
+    
+    def encriptar_lote(
+        self,
+        textos: Sequence[str],
+        encriptador,
+        cancelacion: Optional[threading.Event] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        ENCRIPTAR LOTE CON UNA CLAVE POR MENSAJE
+        ========================================
+        
+        Equivale a llamar encriptar() para cada texto (cada mensaje recibe
+        su propia clave y permutación aleatorias), pero agrupa los textos
+        por tamaño de clave n y procesa cada grupo con arreglos 3-D:
+        
+        1. Agrupar textos por n (en modo por bloques hay un solo grupo)
+        2. Concatenar las filas del grupo en M de forma (Σ filas, n),
+           con el desplazamiento de cada mensaje
+        3. Apilar las claves (con la permutación incorporada) en (k, n, n)
+        4. Una multiplicación por lotes por cubeta de mensajes de largo
+           similar: la memoria es O(Σ filas), no O(k × el más largo)
+        5. Registrar todos los resultados en el historial de una vez
+           y guardar cada cifrado en la bóveda con su id
+        
+        Las inversas salen de la construcción de las claves
+        (ver construir_clave_invertible), sin llamar a np.linalg.inv, y
+        los encriptadores de cada mensaje se construyen recién cuando la
+        bóveda los necesita (sólo el del último texto se crea al momento).
+        
+        Args:
+            textos: Secuencia de strings no vacíos
+            encriptador: Clase Encriptador (o EncriptadorEntero)
+            cancelacion: Evento opcional; se revisa entre grupos
+        
+        Returns:
+            Lista de dicts (mismo formato que encriptar()), en el orden
+            de entrada. Cada 'cifrado' es una vista de las filas del
+            mensaje sobre la matriz (Σ filas, n) de su grupo.
+        
+        Raises:
+            EncriptacionError: Si algún texto es inválido o falla el proceso
+        
+        Nota:
+            El estado actual (para desencriptar()) queda en el último texto.
+        """
+        try:
+            for texto in textos:
+                if not texto or not isinstance(texto, str) or not texto.strip():
+                    raise ValueError("Todos los textos deben ser strings no vacíos")
+            
+            if instrumentacion.activa:
+                instrumentacion.emitir("encriptar_lote.inicio", textos=len(textos))
+            
+            # Paso 1: Agrupar índices por tamaño de clave
+            grupos: Dict[int, List[int]] = {}
+            for i, texto in enumerate(textos):
+                grupos.setdefault(self._calcular_n(len(texto)), []).append(i)
+            
+            resultados: List[Optional[Dict[str, Any]]] = [None] * len(textos)
+            fabricas: List[Optional[functools.partial]] = [None] * len(textos)
+            for n, indices in grupos.items():
+                self._verificar_cancelacion(cancelacion)
+                self._encriptar_grupo(n, [textos[i] for i in indices], encriptador,
+                                      indices, resultados, fabricas)
+            
+            # Paso 6: Registrar todo de una vez
+            self._verificar_cancelacion(cancelacion)
+            if resultados:
+                # Sólo el encriptador del estado actual se construye ya
+                ultimo = resultados[-1]
+                fabricas[-1] = fabricas[-1]()
+                with self._lock:
+                    ids = self.historial.agregar_lote(
+                        (r["texto"], r["permutacion"]) for r in resultados
+                    )
+                    self.encriptador_actual = fabricas[-1]
+                    self.cifrado_actual = ultimo["cifrado"]
+                    self.clave_actual = ultimo["clave"]
+                    self.permutacion_actual = ultimo["permutacion"]
+                    self.longitud_actual = len(ultimo["texto"])
+                
+                for id_, r, fabrica in zip(ids, resultados, fabricas):
+                    r["id"] = id_
+                    self.boveda.guardar(id_, fabrica, r["cifrado"], len(r["texto"]))
+            
+            if instrumentacion.activa:
+                instrumentacion.emitir("encriptar_lote.fin", textos=len(textos), grupos=len(grupos))
+            return resultados
+        
+        except OperacionCanceladaError:
+            if instrumentacion.activa:
+                instrumentacion.emitir("encriptar_lote.cancelado", logging.INFO)
+            raise
         
-        Desencripta el cifrado_actual usando el encriptador_actual.
-        Requiere que previamente se haya ejecutado encriptar().
+        except Exception as e:
+            logger.error(f"❌ Error en encriptación por lotes: {str(e)}")
+            raise EncriptacionError(f"Error: {str(e)}") from e
+    
+    def _encriptar_grupo(
+        self,
+        n: int,
+        textos: List[str],
+        encriptador,
+        indices: List[int],
+        resultados: List[Optional[Dict[str, Any]]],
+        fabricas: List[Optional[functools.partial]]
+    ) -> None:
+        """
+        Cifrar todos los textos de un mismo tamaño n.
+        
+        Las filas de todos los mensajes se concatenan en una matriz
+        (Σ filas, n) con desplazamientos por mensaje, sin rellenar cada
+        texto al más largo. Los mensajes se agrupan en cubetas por número
+        de filas (potencias de 2): cada cubeta es UNA multiplicación por
+        lotes contra sus claves fusionadas, con a lo sumo el doble de filas.
+        
+        Los encriptadores no se construyen aquí: `fabricas` recibe un
+        functools.partial por mensaje (ver BovedaCifrados.guardar).
+        """
+        import numpy as np
+        from encriptador import (
+            EncriptadorEntero, texto_a_codigos, _dtype_entero_seguro, CODIGO_MAX_UNICODE
+        )
+        
+        if self.pool is not None:
+            material = [self.pool.obtener(n) for _ in textos]
+        else:
+            material = self._generar_material_lote(n, len(textos))
+        
+        # Paso 2: (Σ filas, n) con cada texto rellenado sólo hasta su última fila
+        filas = np.array([-(-len(t) // n) for t in textos], dtype=np.int64)
+        desplazamientos = np.zeros(len(textos) + 1, dtype=np.int64)
+        np.cumsum(filas, out=desplazamientos[1:])
+        codigos = texto_a_codigos("".join(t + "\x00" * (-len(t) % n) for t in textos))
+        codigo_max = self.codigo_max or CODIGO_MAX_UNICODE
+        if codigos.size and int(codigos.max()) > codigo_max:
+            raise ValueError(f"Código Unicode {int(codigos.max())} supera codigo_max={codigo_max}")
+        
+        # Paso 3: (k, n, n) claves con la permutación incorporada
+        claves = np.stack([clave for clave, _, _ in material])
+        permutaciones = np.array([permutacion for _, _, permutacion in material], dtype=np.intp)
+        fusionadas = np.take_along_axis(claves, permutaciones[:, None, :], axis=2)
+        
+        # Tipo del grupo: el del servicio, o el entero que no desborda con ninguna clave
+        if isinstance(encriptador, type) and issubclass(encriptador, EncriptadorEntero):
+            cota = codigo_max * int(np.abs(claves).sum(axis=1).max())
+            dtype = _dtype_entero_seguro(cota)
+            if dtype is None:
+                raise ValueError(f"Los valores del cifrado (hasta {cota:.3g}) desbordan int64")
+        else:
+            dtype = np.dtype(self.dtype)
+        matriz = codigos.reshape(-1, n).astype(dtype)
+        fusionadas = fusionadas.astype(dtype)
+        cifrado = np.empty_like(matriz)
+        
+        # Pasos 4 y 5: una multiplicación por cubeta de mensajes de largo similar
+        cubetas = np.ceil(np.log2(filas)).astype(np.int64)
+        for cubeta in np.unique(cubetas):
+            seleccion = np.flatnonzero(cubetas == cubeta)
+            filas_sel = filas[seleccion, None]
+            posiciones = np.arange(int(filas_sel.max()))
+            validas = posiciones < filas_sel
+            # Las filas de relleno repiten la última del mensaje y se descartan
+            origen = desplazamientos[seleccion, None] + np.minimum(posiciones, filas_sel - 1)
+            bloque = np.matmul(matriz[origen], fusionadas[seleccion])
+            cifrado[origen[validas]] = bloque[validas]
+        
+        opciones = self._opciones_encriptador()
+        limites = desplazamientos.tolist()
+        for j, (i, texto, (clave, clave_inv, permutacion)) in enumerate(
+            zip(indices, textos, material)
+        ):
+            inicio, fin = limites[j], limites[j + 1]
+            resultados[i] = {
+                "texto": texto,
+                "unicode": codigos[inicio * n:inicio * n + len(texto)],
+                "clave": clave,
+                "permutacion": permutacion,
+                "cifrado": cifrado[inicio:fin]
+            }
+            fabricas[i] = functools.partial(
+                encriptador, clave, permutacion, clave_inv=clave_inv, **opciones
+            )
+    
+    @medir_etapa("servicio.desencriptar", lambda args, texto: 4 * len(texto))
+    def desencriptar(
+        self,
+        id_: Optional[int] = None,
+        cancelacion: Optional[threading.Event] = None
+    ) -> str:
+        """
+        DESENCRIPTAR MATRIZ ACTUAL (O CUALQUIER ENCRIPTACIÓN PASADA)
+        ============================================================
+        
+        Sin id, desencripta el cifrado_actual usando el encriptador_actual.
+        Con id, desencripta la encriptación guardada en la bóveda con ese
+        id (el 'id' que retornó encriptar()), esté en memoria o en disco.
         
         PROCESO:
         ========
-        1. Validar que existe encriptación activa
-        2. Llamar a encriptador_actual.desencriptar(cifrado_actual)
+        1. Validar que existe encriptación activa (o buscar el id en la bóveda)
+        2. Llamar a encriptador.desencriptar(cifrado)
         3. Retornar texto original
         
+        Args:
+            id_: Identificador de una encriptación previa (opcional)
+            cancelacion: Evento opcional; se revisa entre bloques de filas
+        
         Returns:
             str: Texto desencriptado
         
         Raises:
-            EncriptacionError: Si no hay encriptación activa
+            EncriptacionError: Si no hay encriptación activa o el id no existe
             DesencriptacionError: Si falla el proceso de desencriptación
+            OperacionCanceladaError: Si se activó `cancelacion`
         
         Ejemplo:
             >>> enc_svc = ServicioEncriptacion()
             >>> resultado = enc_svc.encriptar("Secreto", Encriptador)
-            >>> original = enc_svc.desencriptar()
-            >>> assert original == "Secreto"  # ✓
+            >>> enc_svc.encriptar("Otro", Encriptador)
+            >>> enc_svc.desencriptar()                 # "Otro"
+            >>> enc_svc.desencriptar(resultado['id'])  # "Secreto"
         
         Nota:
             Requiere encriptación previa. Si llamas sin encriptar,
             levanta: EncriptacionError("No hay encriptación activa")
         """
+        if id_ is not None:
+            try:
+                enc, cifrado, longitud = self.boveda.obtener(id_)
+            except KeyError:
+                msg = f"⚠️ No existe una encriptación con id {id_}"
+                logger.warning(msg)
+                raise EncriptacionError(msg) from None
+        else:
+            # Tomar una instantánea consistente del estado actual
+            with self._lock:
+                enc = self.encriptador_actual
+                cifrado = self.cifrado_actual
+                longitud = self.longitud_actual
+        
         # Validación: ¿Hay encriptación activa?
-        if self.encriptador_actual is None or self.cifrado_actual is None:
+        if enc is None or cifrado is None:
             msg = "⚠️ No hay encriptación activa. Encripta primero."
             logger.warning(msg)
             raise EncriptacionError(msg)
         
         try:
-            logger.info("Iniciando desencriptación")
+            if instrumentacion.activa:
+                instrumentacion.emitir("desencriptar.inicio", id=id_)
             
-            # Ejecutar desencriptación
-            texto = self.encriptador_actual.desencriptar(self.cifrado_actual)
+            # Ejecutar desencriptación (la longitud descarta el relleno exacto)
+            if cancelacion is None:
+                texto = enc.desencriptar(cifrado, longitud=longitud)
+            else:
+                import numpy as np
+                
+                cifrado = np.asarray(cifrado)
+                if cifrado.ndim != 2 or cifrado.shape[1] != enc.n:
+                    raise ValueError(f"Número de columnas incorrecto: {cifrado.shape} vs {enc.n}")
+                original = self._procesar_cancelable(enc, cifrado, False, cancelacion)
+                texto = enc.matriz_a_texto(original, longitud)
             
-            logger.info(f"✓ Desencriptación exitosa: {len(texto)} caracteres")
+            if instrumentacion.activa:
+                instrumentacion.emitir("desencriptar.fin", id=id_, caracteres=len(texto))
             return texto
         
+        except OperacionCanceladaError:
+            if instrumentacion.activa:
+                instrumentacion.emitir("desencriptar.cancelado", logging.INFO)
+            raise
+        
         except Exception as e:
             logger.error(f"❌ Error en desencriptación: {str(e)}")
             raise DesencriptacionError(str(e)) from e
     
-    def obtener_historial(self) -> List[Dict]:
+    def guardar(self, ruta: str) -> int:
+        """
+        GUARDAR ENCRIPTACIÓN ACTUAL
+        ===========================
+        
+        Persiste clave, inversa, permutación, longitud y cifrado actuales
+        en un contenedor binario (ver contenedor.py).
+        
+        Args:
+            ruta: Archivo de destino
+        
+        Returns:
+            int: Bytes escritos
+        
+        Raises:
+            EncriptacionError: Si no hay encriptación activa o falla la escritura
+        """
+        with self._lock:
+            enc = self.encriptador_actual
+            clave = self.clave_actual
+            permutacion = self.permutacion_actual
+            cifrado = self.cifrado_actual
+            longitud = self.longitud_actual
+        
+        if cifrado is None or clave is None:
+            msg = "⚠️ No hay encriptación activa. Encripta primero."
+            logger.warning(msg)
+            raise EncriptacionError(msg)
+        
+        from contenedor import guardar_contenedor
+        
+        try:
+            # La inversa viaja con la clave: cargar() no la recalcula
+            escritos = guardar_contenedor(ruta, clave, permutacion, cifrado, longitud,
+                                          clave_inv=getattr(enc, "clave_inv", None),
+                                          codigo_max=enc.codigo_max)
+            logger.info(f"✓ Cifrado guardado en '{ruta}' ({escritos} bytes)")
+            return escritos
+        except Exception as e:
+            logger.error(f"❌ Error guardando cifrado: {str(e)}")
+            raise EncriptacionError(f"Error: {str(e)}") from e
+    
+    def cargar(self, ruta: str, encriptador) -> Dict[str, Any]:
+        """
+        CARGAR ENCRIPTACIÓN DESDE CONTENEDOR
+        ====================================
+        
+        Mapea el contenedor en memoria y lo deja como encriptación actual,
+        de modo que desencriptar() funciona sin volver a encriptar. El
+        cifrado queda como vista sobre el archivo (sin copia).
+        
+        Args:
+            ruta: Archivo generado por guardar()
+            encriptador: Clase Encriptador (o EncriptadorEntero)
+        
+        Returns:
+            Dict del contenedor (ver contenedor.leer_contenedor)
+        
+        Raises:
+            EncriptacionError: Si el archivo no es un contenedor válido
+        """
+        from contenedor import cargar_contenedor
+        
+        try:
+            datos = cargar_contenedor(ruta)
+            permutacion = tuple(int(i) for i in datos["permutacion"])
+            enc = encriptador(datos["clave"], permutacion, clave_inv=datos["clave_inv"],
+                              **self._opciones_encriptador())
+        except Exception as e:
+            logger.error(f"❌ Error cargando cifrado: {str(e)}")
+            raise EncriptacionError(f"Error: {str(e)}") from e
+        
+        with self._lock:
+            self.encriptador_actual = enc
+            self.cifrado_actual = datos["cifrado"]
+            self.clave_actual = datos["clave"]
+            self.permutacion_actual = permutacion
+            self.longitud_actual = datos["longitud"]
+        
+        logger.info(f"✓ Cifrado cargado desde '{ruta}'")
+        return datos
+    
+    def obtener_historial(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        truncar: Optional[int] = None
+    ) -> List[Dict]:
         """
         OBTENER HISTORIAL DE ENCRIPTACIONES
         ====================================
         
-        Retorna la lista completa de operaciones de encriptación
-        realizadas en esta sesión.
+        Retorna una página de las operaciones de encriptación, de la más
+        antigua a la más reciente. Sólo se copia la página pedida.
+        
+        Args:
+            offset: Entradas a saltar desde la más antigua
+            limit: Máximo de entradas (None = todas desde offset)
+            truncar: Caracteres máximos de cada texto (None = completos)
         
         Returns:
             List[Dict]: Lista de diccionarios con:
-                - 'texto': Texto encriptado
-                - 'unicode': Códigos Unicode
+                - 'id': Identificador de la entrada
+                - 'texto': Texto encriptado (recortado si se pidió truncar)
+                - 'longitud': Caracteres del texto completo
                 - 'permutacion': Permutación usada
                 - 'timestamp': Momento de la operación
         
+        Ejemplo:
+            >>> enc_svc.obtener_historial(offset=0, limit=50)  # primera página
+            >>> enc_svc.obtener_historial(0, 50, truncar=40)    # para un listado
+            >>> len(enc_svc.historial)                         # total consultable
+        
         Nota:
-            El historial se reiniza cada vez que se crea una nueva
-            instancia de ServicioEncriptacion
+            En memoria se retienen las últimas historial_max entradas; las
+            anteriores están en SQLite si se configuró historial_sqlite,
+            o se descartaron si no.
         """
-        return self.historial
+        return self.historial.obtener(offset, limit, truncar)
     
     def tiene_encriptacion_activa(self) -> bool:
         """
@@ -513,3 +1540,188 @@ class ServicioEncriptacion:
         """
         return (self.encriptador_actual is not None and
                 self.cifrado_actual is not None)
+    
+    @staticmethod
+    def metricas() -> Dict[str, Dict[str, Any]]:
+        """
+        MÉTRICAS POR ETAPA
+        ==================
+        
+        Instantánea de los histogramas de latencia (conteo, p50/p95/p99,
+        máximo, total y bytes procesados) de cada etapa: generar_clave,
+        texto_a_matriz, cifrar_matriz, encriptar, descifrar_matriz,
+        matriz_a_texto, desencriptar y las operaciones servicio.*.
+        
+        Returns:
+            Dict etapa → resumen (ver metricas.RegistroMetricas.instantanea)
+        
+        Ejemplo:
+            >>> enc_svc.metricas()["generar_clave"]["p95_ms"]
+        """
+        return metricas.instantanea()
+    
+    @staticmethod
+    def reiniciar_metricas() -> None:
+        """Borrar las mediciones acumuladas (p. ej. tras un calentamiento)."""
+        metricas.reiniciar()
+    
+    def cerrar(self) -> None:
+        """
+        CERRAR SERVICIO
+        ===============
+        
+        Detiene el pool de claves, escribe lo pendiente del historial
+        (si usa SQLite) y cierra la bóveda: con boveda_directorio e
+        historial SQLite persiste sus entradas; si no, borra su carpeta.
+        """
+        self.desactivar_pool()
+        self.historial.cerrar()
+        self.boveda.cerrar()
+
+
+# ==================== FACHADA ASYNCIO ====================
+
+class ServicioEncriptacionAsync:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║     FACHADA ASYNCIO DEL SERVICIO DE ENCRIPTACIÓN      ║
+    ╚═══════════════════════════════════════════════════════╝
+    
+    Expone encriptar/desencriptar como corrutinas para usar el servicio
+    desde aplicaciones asyncio sin bloquear el event loop:
+    
+    - El trabajo de CPU (claves, multiplicaciones) corre en un
+      ThreadPoolExecutor acotado (max_trabajadores)
+    - Un semáforo limita las operaciones en vuelo (max_en_vuelo); las
+      llamadas adicionales esperan su turno (backpressure)
+    - Cancelar la tarea que espera activa el evento de cancelación del
+      servicio: la operación se detiene en el siguiente paso y no
+      modifica ni el estado ni el historial. Su lugar en max_en_vuelo
+      se libera recién cuando el hilo termina
+    
+    Los resultados son los mismos que los del ServicioEncriptacion
+    síncrono que envuelve (se puede pasar uno existente).
+    
+    Ejemplo:
+        >>> async with ServicioEncriptacionAsync() as svc:
+        ...     resultado = await svc.encriptar("Hola", Encriptador)
+        ...     texto = await svc.desencriptar()
+    """
+    
+    def __init__(
+        self,
+        servicio: Optional[ServicioEncriptacion] = None,
+        max_trabajadores: int = ASYNC_MAX_TRABAJADORES,
+        max_en_vuelo: int = ASYNC_MAX_EN_VUELO
+    ) -> None:
+        """
+        INICIALIZAR FACHADA ASYNCIO
+        ===========================
+        
+        Args:
+            servicio: Servicio síncrono a envolver (None = uno nuevo)
+            max_trabajadores: Hilos del executor para el trabajo de CPU
+            max_en_vuelo: Operaciones simultáneas máximas (backpressure)
+        
+        Raises:
+            ValueError: Si algún límite es menor que 1
+        """
+        if max_trabajadores < 1 or max_en_vuelo < 1:
+            raise ValueError(
+                f"Límites inválidos: trabajadores={max_trabajadores}, "
+                f"en_vuelo={max_en_vuelo}"
+            )
+        
+        self.servicio = servicio if servicio is not None else ServicioEncriptacion()
+        self.max_en_vuelo = max_en_vuelo
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_trabajadores, thread_name_prefix="encriptacion"
+        )
+        # El semáforo se crea dentro del event loop que lo usa (ver _semaforo)
+        self._semaforos: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._en_vuelo = 0
+    
+    @property
+    def en_vuelo(self) -> int:
+        """Operaciones actualmente en ejecución o en cola del executor."""
+        return self._en_vuelo
+    
+    def _semaforo(self) -> Any:
+        """
+        Semáforo de max_en_vuelo del event loop en ejecución. Se crea en el
+        primer uso dentro de cada loop: antes de Python 3.10 un semáforo
+        creado fuera del loop queda ligado a otro, y la fachada puede
+        reutilizarse en varias llamadas a asyncio.run().
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_en_vuelo)
+        return semaforo
+    
+    async def _ejecutar(self, funcion: Callable, *args) -> Any:
+        """
+        Ejecutar `funcion` en el executor respetando el límite en vuelo.
+        
+        El lugar del semáforo se libera cuando termina el hilo, no la
+        corrutina: si la tarea se cancela mientras el hilo trabaja, la
+        operación sigue contando en max_en_vuelo hasta que se detiene.
+        """
+        import asyncio
+        
+        semaforo = self._semaforo()
+        await semaforo.acquire()
+        self._en_vuelo += 1
+        loop = asyncio.get_running_loop()
+        
+        def liberar() -> None:
+            self._en_vuelo -= 1
+            semaforo.release()
+        
+        def al_terminar(_futuro: Any) -> None:
+            # Corre en el hilo del executor (o en el loop si nunca empezó)
+            try:
+                loop.call_soon_threadsafe(liberar)
+            except RuntimeError:
+                # El loop ya cerró: su semáforo no vuelve a usarse
+                self._en_vuelo -= 1
+        
+        cancelacion = threading.Event()
+        funcion = functools.partial(funcion, cancelacion=cancelacion)
+        try:
+            futuro = self._executor.submit(funcion, *args)
+        except BaseException:
+            liberar()
+            raise
+        futuro.add_done_callback(al_terminar)
+        
+        try:
+            return await asyncio.wrap_future(futuro)
+        except asyncio.CancelledError:
+            # Si ya empezó en un hilo, el servicio se detiene en el próximo paso
+            cancelacion.set()
+            raise
+    
+    async def encriptar(self, texto: str, encriptador) -> Dict[str, Any]:
+        """Versión awaitable de ServicioEncriptacion.encriptar()."""
+        return await self._ejecutar(self.servicio.encriptar, texto, encriptador)
+    
+    async def encriptar_lote(self, textos: Sequence[str], encriptador) -> List[Dict[str, Any]]:
+        """Versión awaitable de ServicioEncriptacion.encriptar_lote()."""
+        return await self._ejecutar(self.servicio.encriptar_lote, textos, encriptador)
+    
+    async def desencriptar(self, id_: Optional[int] = None) -> str:
+        """Versión awaitable de ServicioEncriptacion.desencriptar()."""
+        return await self._ejecutar(self.servicio.desencriptar, id_)
+    
+    def cerrar(self) -> None:
+        """Cerrar el executor, descartando las operaciones que no empezaron."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def __aenter__(self) -> "ServicioEncriptacionAsync":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        self.cerrar()
@@ -14,10 +14,41 @@ Proceso de desencriptación:
   Cifrado → Permutación Inversa → Multiplicación por Clave Inversa → Matriz → Texto
 """
 
-from typing import Optional, Tuple, List
+import os
+import codecs
+import contextlib
+import logging
+import multiprocessing
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from typing import Optional, Tuple, List, Sequence, Dict, Any, Iterator
 import numpy as np
 from numpy.typing import NDArray
 
+from metricas import medir_etapa, metricas
+
+logger = logging.getLogger(__name__)
+
+# threadpoolctl es opcional: limita los hilos de BLAS ya cargados en un proceso
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+# Filas por bloque en el modo paralelo (≈ 8 MB por bloque con n=16 en float64)
+FILAS_POR_BLOQUE = 65536
+
+# Enteros consecutivos exactos en float32 (mantisa de 24 bits)
+MANTISA_FLOAT32 = 2 ** 24
+
+# Código Unicode máximo
+CODIGO_MAX_UNICODE = 0x10FFFF
+
+# Variables de entorno que leen OpenMP, OpenBLAS y MKL al cargarse
+_VARIABLES_HILOS_BLAS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
 # ==================== EXCEPCIONES PERSONALIZADAS ====================
 
 class MatrizInvalidaError(Exception):
@@ -33,6 +64,246 @@ class PermutacionInvalidaError(Exception):
     pass
 
 
+# ==================== CONVERSIÓN VECTORIZADA ====================
+
+def _bytes_resultado(args: tuple, resultado: Any) -> int:
+    """Bytes procesados por una etapa: tamaño de la matriz resultado."""
+    return resultado.nbytes
+
+
+def _bytes_entrada(args: tuple, resultado: Any) -> int:
+    """Bytes procesados por una etapa: tamaño de la matriz recibida."""
+    return getattr(args[1], "nbytes", 0)
+
+
+def numero_condicion(clave: NDArray, clave_inv: NDArray) -> float:
+    """
+    NÚMERO DE CONDICIÓN EN NORMA 1
+    ==============================
+    
+    κ₁(K) = ‖K‖₁ · ‖K⁻¹‖₁, con ‖A‖₁ = máxima suma de |valores| por columna.
+    
+    Para una fila m con |m_i| <= c, cada valor de m·K (y cada suma
+    parcial) está acotado por c·‖K‖₁, y cada suma parcial de
+    (m·K)·K⁻¹ por c·κ₁(K). Con clave e inversa enteras, el cifrado es
+    exacto en un tipo flotante mientras c·κ₁(K) no supere su mantisa.
+    
+    Args:
+        clave: Matriz (n, n) o lote (k, n, n)
+        clave_inv: Inversa con la misma forma
+    
+    Returns:
+        κ₁ (float) o arreglo (k,) si se pasa un lote.
+    """
+    norma = np.abs(np.asarray(clave, dtype=float)).sum(axis=-2).max(axis=-1)
+    norma_inv = np.abs(np.asarray(clave_inv, dtype=float)).sum(axis=-2).max(axis=-1)
+    return norma * norma_inv
+
+
+def texto_a_codigos(texto: str) -> NDArray:
+    """
+    CÓDIGOS UNICODE DE UN TEXTO
+    ===========================
+    
+    Codifica el texto en UTF-32 (un entero de 4 bytes por carácter) y
+    lo interpreta directamente como arreglo uint32, sin recorrer los
+    caracteres en Python. 'surrogatepass' conserva los sustitutos
+    sueltos igual que ord().
+    
+    Args:
+        texto: String a convertir.
+    
+    Returns:
+        Arreglo uint32 (solo lectura) con un código por carácter.
+    
+    Ejemplo:
+        >>> texto_a_codigos("Hola")
+        array([ 72, 111, 108,  97], dtype=uint32)
+    """
+    return np.frombuffer(texto.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+
+
+@contextlib.contextmanager
+def _ruta_temporal(ruta_salida: str) -> Iterator[str]:
+    """
+    Ruta temporal junto a `ruta_salida` que solo se mueve a la definitiva
+    (os.replace) si el bloque termina bien: un error no deja un archivo
+    a medio escribir.
+    """
+    temporal = f"{ruta_salida}.parcial"
+    try:
+        yield temporal
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporal)
+        raise
+    os.replace(temporal, ruta_salida)
+
+
+# ==================== PARALELISMO ====================
+
+def resolver_trabajadores(trabajadores: Optional[int]) -> int:
+    """
+    Número de trabajadores del pool: None = núcleos disponibles.
+    
+    Raises:
+        ValueError: Si trabajadores es menor que 1 (0 no significa "auto").
+    """
+    if trabajadores is None:
+        return os.cpu_count() or 1
+    if trabajadores < 1:
+        raise ValueError(f"trabajadores debe ser >= 1: {trabajadores}")
+    return trabajadores
+
+
+# Encriptador del proceso trabajador (se recibe una sola vez al iniciarlo)
+_encriptador_trabajador: Optional["Encriptador"] = None
+
+# Serializa los cambios temporales de os.environ al lanzar procesos hijos
+_lock_entorno = threading.Lock()
+
+# La advertencia de BLAS sin limitar se registra una sola vez
+_aviso_blas_emitido = False
+
+
+def _inicializar_trabajador(encriptador: "Encriptador", hilos_blas: int) -> None:
+    """
+    Inicializador de cada proceso del pool: guarda el encriptador y, con
+    threadpoolctl, limita BLAS a hilos_blas. El límite queda dentro del
+    proceso trabajador; el proceso principal no se modifica.
+    """
+    global _encriptador_trabajador
+    _encriptador_trabajador = encriptador
+    if threadpool_limits is not None:
+        threadpool_limits(limits=hilos_blas, user_api="blas")
+
+
+@contextlib.contextmanager
+def _entorno_hijos(hilos_blas: int) -> Iterator[None]:
+    """
+    Publicar OMP/OPENBLAS/MKL_NUM_THREADS mientras se lanzan procesos.
+    
+    Un proceso "spawn" hereda el entorno del padre al nacer, y BLAS lee
+    estas variables al importarse numpy (antes que cualquier
+    inicializador). Se restauran al salir; el lock evita que dos pools
+    mezclen sus valores.
+    """
+    with _lock_entorno:
+        previas = {variable: os.environ.get(variable) for variable in _VARIABLES_HILOS_BLAS}
+        os.environ.update({variable: str(hilos_blas) for variable in _VARIABLES_HILOS_BLAS})
+        try:
+            yield
+        finally:
+            for variable, valor in previas.items():
+                if valor is None:
+                    os.environ.pop(variable, None)
+                else:
+                    os.environ[variable] = valor
+
+
+def _cifrar_bloque_trabajador(bloque: NDArray) -> NDArray:
+    """Cifrar un bloque de filas en un proceso trabajador."""
+    return _encriptador_trabajador._cifrar_matriz(bloque)
+
+
+def _descifrar_bloque_trabajador(bloque: NDArray) -> NDArray:
+    """Descifrar un bloque de filas en un proceso trabajador."""
+    return _encriptador_trabajador._descifrar_matriz(bloque)
+
+
+class PoolTrabajadores:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║     POOL DE HILOS O PROCESOS CON BLAS COORDINADO      ║
+    ╚═══════════════════════════════════════════════════════╝
+    
+    Cifra y descifra bloques de filas de un encriptador en paralelo,
+    limitando BLAS a núcleos // trabajadores hilos para que el pool no
+    sobresuscriba los núcleos:
+      - hilos: threadpoolctl limita el BLAS del proceso mientras el
+        pool está abierto (el límite es global al proceso)
+      - procesos (spawn): los hijos nacen con OMP/OPENBLAS/MKL_NUM_THREADS
+        y, si threadpoolctl está instalado, cada uno lo aplica también
+    Sin threadpoolctl el modo hilos no puede limitar BLAS: se registra
+    una advertencia.
+    
+    Crearlo una vez y reutilizarlo (ver Encriptador.procesar_en_paralelo)
+    evita lanzar procesos, que importan numpy, en cada llamada.
+    
+    EJEMPLO:
+    ========
+    >>> with PoolTrabajadores(enc, trabajadores=4, procesos=True) as pool:
+    ...     for tramo in tramos:
+    ...         cifrado = enc.procesar_en_paralelo(tramo, cifrar=True, pool=pool)
+    """
+    
+    def __init__(
+        self,
+        encriptador: "Encriptador",
+        trabajadores: Optional[int] = None,
+        procesos: bool = False
+    ) -> None:
+        """
+        Args:
+            encriptador: Encriptador cuyos bloques procesa el pool
+            trabajadores: Hilos/procesos (None = núcleos disponibles)
+            procesos: Usar procesos "spawn" en vez de hilos
+        
+        Raises:
+            ValueError: Si trabajadores < 1
+        """
+        global _aviso_blas_emitido
+        
+        self.encriptador = encriptador
+        self.trabajadores = resolver_trabajadores(trabajadores)
+        self.procesos = procesos
+        self.hilos_blas = max(1, (os.cpu_count() or 1) // self.trabajadores)
+        self._limite = None
+        
+        if procesos:
+            # Pool lanza todos los procesos al crearse, dentro de la ventana
+            # en la que el entorno tiene los límites de BLAS
+            contexto = multiprocessing.get_context("spawn")
+            with _entorno_hijos(self.hilos_blas):
+                self._pool = contexto.Pool(
+                    self.trabajadores, _inicializar_trabajador,
+                    (encriptador, self.hilos_blas)
+                )
+        else:
+            if threadpool_limits is not None:
+                self._limite = threadpool_limits(limits=self.hilos_blas, user_api="blas")
+            elif not _aviso_blas_emitido:
+                _aviso_blas_emitido = True
+                logger.warning("⚠️ threadpoolctl no está instalado: el pool de hilos "
+                               "no puede limitar los hilos de BLAS")
+            self._pool = ThreadPoolExecutor(max_workers=self.trabajadores)
+    
+    def procesar(self, bloques: Sequence[NDArray], cifrar: bool) -> List[NDArray]:
+        """Cifrar o descifrar cada bloque; el resultado conserva el orden."""
+        if self.procesos:
+            tarea = _cifrar_bloque_trabajador if cifrar else _descifrar_bloque_trabajador
+            return self._pool.map(tarea, bloques, chunksize=1)
+        funcion = self.encriptador._cifrar_matriz if cifrar else self.encriptador._descifrar_matriz
+        return list(self._pool.map(funcion, bloques))
+    
+    def cerrar(self) -> None:
+        """Esperar a los trabajadores y restaurar el límite de BLAS."""
+        if self.procesos:
+            self._pool.close()
+            self._pool.join()
+        else:
+            self._pool.shutdown()
+        if self._limite is not None:
+            self._limite.restore_original_limits()
+            self._limite = None
+    
+    def __enter__(self) -> "PoolTrabajadores":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.cerrar()
+
+
 # ==================== CLASE PRINCIPAL: ENCRIPTADOR ====================
 
 class Encriptador:
@@ -61,6 +332,17 @@ class Encriptador:
     ============================
     - clave: Lista[Lista[float]] - Matriz NxN invertible (opcional)
     - permutacion: Tuple[int, ...] - Permutación de índices (opcional)
+    - dtype: np.float64 (defecto) o np.float32 (mitad de memoria, el
+      doble de valores por instrucción SIMD / BLAS)
+    - codigo_max: Código Unicode máximo admitido (acota el modo float32)
+    
+    MODO FLOAT32:
+    =============
+    float32 sólo representa enteros exactos hasta 2^24. Se acepta una
+    clave únicamente si clave e inversa son enteras y
+    codigo_max · κ₁(K) <= 2^24 (ver numero_condicion): así todo valor
+    intermedio es un entero representable y np.rint devuelve el texto
+    exacto. Ejemplo: ASCII (127) admite κ₁ hasta 132104.
     """
     
     # Matriz clave por defecto (3x3 invertible)
@@ -73,7 +355,10 @@ class Encriptador:
     def __init__(
         self,
         clave: Optional[List[List[float]]] = None,
-        permutacion: Optional[Tuple[int, ...]] = None
+        permutacion: Optional[Tuple[int, ...]] = None,
+        clave_inv: Optional[NDArray] = None,
+        dtype: Any = np.float64,
+        codigo_max: int = CODIGO_MAX_UNICODE
     ) -> None:
         """
         INICIALIZAR ENCRIPTADOR
@@ -82,16 +367,30 @@ class Encriptador:
         Args:
             clave: Matriz NxN invertible. Si es None, usa matriz por defecto.
             permutacion: Tupla de permutación. Si es None, usa identidad [0,1,2,...,n-1].
+            clave_inv: Inversa ya calculada de la clave (ej: desde un pool de
+                       claves). Si se indica, se omiten det() e inv().
+            dtype: Tipo de las matrices de trabajo (np.float64 o np.float32).
+            codigo_max: Código Unicode máximo de los textos a cifrar.
         
         Raises:
             MatrizInvalidaError: Si la matriz no es cuadrada.
-            ClaveInvalidaError: Si la matriz no es invertible.
+            ClaveInvalidaError: Si la matriz no es invertible, o si en modo
+                                float32 no garantiza un descifrado exacto.
             PermutacionInvalidaError: Si la permutación es inválida.
+            ValueError: Si dtype no es float32/float64 o codigo_max no es válido.
         """
         # Usar clave por defecto si no se especifica
         if clave is None:
             clave = self.DEFAULT_CLAVE
         
+        # Tipo de dato de las matrices de trabajo (texto y cifrado)
+        self.dtype = np.dtype(dtype).type
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"dtype debe ser float32 o float64: {dtype}")
+        if not 0 < codigo_max <= CODIGO_MAX_UNICODE:
+            raise ValueError(f"codigo_max fuera de rango: {codigo_max}")
+        self.codigo_max = codigo_max
+        
         # Convertir a matriz numpy
         self.clave = np.array(clave, dtype=float)
         
@@ -101,18 +400,45 @@ class Encriptador:
         
         self.n = self.clave.shape[0]
         
-        # ✓ VALIDAR: Matriz debe ser invertible (determinante ≠ 0)
-        det = np.linalg.det(self.clave)
-        if abs(det) < 1e-6:
-            raise ClaveInvalidaError(f"Determinante muy pequeño: {det}")
+        if clave_inv is not None:
+            # Inversa precalculada: sólo validar la forma
+            self.clave_inv = np.array(clave_inv, dtype=float)
+            if self.clave_inv.shape != self.clave.shape:
+                raise MatrizInvalidaError(
+                    f"Inversa con forma incorrecta: {self.clave_inv.shape}"
+                )
+        else:
+            # ✓ VALIDAR: Matriz debe ser invertible (determinante ≠ 0)
+            det = np.linalg.det(self.clave)
+            if abs(det) < 1e-6:
+                raise ClaveInvalidaError(f"Determinante muy pequeño: {det}")
+            
+            # Calcular matriz inversa (usada en desencriptación)
+            self.clave_inv = np.linalg.inv(self.clave)
         
-        # Calcular matriz inversa (usada en desencriptación)
-        self.clave_inv = np.linalg.inv(self.clave)
+        if self.dtype is np.float32:
+            self._validar_clave_float32()
         
-        # ✓ VALIDAR: Permutación debe ser válida
+        self._asignar_permutacion(permutacion)
+        
+        # Permutación incorporada a las claves: una sola multiplicación por sentido
+        #   (M × K)[:, p] = M × K[:, p]      C[:, p⁻¹] × K⁻¹ = C × K⁻¹[p, :]
+        self.clave_fusionada = np.ascontiguousarray(self.clave[:, list(self.permutacion)])
+        self.clave_inv_fusionada = np.ascontiguousarray(self.clave_inv[list(self.permutacion), :])
+
+    def _asignar_permutacion(self, permutacion: Optional[Sequence[int]]) -> None:
+        """
+        Validar la permutación (None = identidad) y guardarla junto con
+        su inversa.
+        
+        Raises:
+            PermutacionInvalidaError: Si no es una permutación de range(n).
+        """
         if permutacion is None:
             permutacion = tuple(range(self.n))
+        permutacion = tuple(int(i) for i in permutacion)
         
+        # ✓ VALIDAR: Permutación debe ser válida
         if len(permutacion) != self.n or set(permutacion) != set(range(self.n)):
             raise PermutacionInvalidaError(f"Permutación inválida: {permutacion}")
         
@@ -122,8 +448,82 @@ class Encriptador:
             permutacion.index(i) for i in range(self.n)
         )
 
+    def _validar_clave_float32(self) -> None:
+        """
+        VALIDAR CLAVE PARA MODO FLOAT32
+        ===============================
+        
+        Exige clave e inversa enteras (la inversa calculada se redondea y
+        se comprueba K × K⁻¹ = I en aritmética entera) y
+        codigo_max · κ₁(K) <= 2^24. Deja ambas matrices en float32.
+        
+        Raises:
+            ClaveInvalidaError: Si la clave no garantiza un descifrado exacto.
+        """
+        clave_inv = np.rint(self.clave_inv)
+        if not (np.array_equal(self.clave, np.rint(self.clave))
+                and np.array_equal(
+                    self.clave.astype(np.int64) @ clave_inv.astype(np.int64),
+                    np.eye(self.n, dtype=np.int64))):
+            raise ClaveInvalidaError(
+                "El modo float32 requiere una clave entera con inversa entera"
+            )
+        
+        condicion = numero_condicion(self.clave, clave_inv)
+        if self.codigo_max * condicion > MANTISA_FLOAT32:
+            raise ClaveInvalidaError(
+                f"κ₁={condicion:.0f} demasiado grande para float32 con "
+                f"codigo_max={self.codigo_max} (máximo {MANTISA_FLOAT32 // self.codigo_max})"
+            )
+        
+        self.clave = self.clave.astype(np.float32)
+        self.clave_inv = clave_inv.astype(np.float32)
+
+    # ==================== MÉTRICAS ====================
+
+    @staticmethod
+    def metricas() -> Dict[str, Dict[str, float]]:
+        """
+        MÉTRICAS POR ETAPA
+        ==================
+        
+        Instantánea de los histogramas de las etapas medidas (texto_a_matriz,
+        cifrar_matriz, encriptar, descifrar_matriz, matriz_a_texto,
+        desencriptar). Ver metricas.RegistroMetricas.instantanea.
+        
+        Ejemplo:
+            >>> Encriptador.metricas()["cifrar_matriz"]["p99_ms"]
+        """
+        return metricas.instantanea()
+
+    @staticmethod
+    def reiniciar_metricas() -> None:
+        """Borrar las mediciones acumuladas."""
+        metricas.reiniciar()
+
     # ==================== CONVERSION: TEXTO ↔ MATRIZ ====================
 
+    def calcular_relleno(self, longitud: int) -> int:
+        """
+        CALCULAR RELLENO
+        ================
+        
+        Número de ceros que se agregan al final para que un texto de
+        `longitud` caracteres ocupe filas completas de ancho n.
+        
+        Args:
+            longitud: Número de caracteres del texto.
+        
+        Returns:
+            int: Ceros de relleno (0 <= relleno < n).
+        
+        Ejemplo:
+            >>> Encriptador().calcular_relleno(4)  # n=3 → 2 filas, 2 ceros
+            2
+        """
+        return -longitud % self.n
+
+    @medir_etapa("texto_a_matriz", _bytes_resultado)
     def texto_a_matriz(self, texto: str) -> NDArray:
         """
         CONVERTIR TEXTO A MATRIZ DE UNICODE
@@ -134,6 +534,10 @@ class Encriptador:
         2. Agrupar en filas de tamaño n (rellenar con ceros si es necesario)
         3. Retornar como matriz numpy
         
+        El número de filas es ceil(len(texto) / n): un texto de cualquier
+        longitud se reparte en tantas filas como haga falta, siempre con
+        la misma clave n×n (modo por bloques).
+        
         Args:
             texto: String a convertir.
         
@@ -153,17 +557,50 @@ class Encriptador:
         if not texto or not isinstance(texto, str):
             raise ValueError("El texto debe ser un string no vacío")
         
-        # Paso 1: Convertir texto a códigos Unicode
-        nums = [ord(c) for c in texto]
+        # Paso 1: Convertir texto a códigos Unicode (vista sobre buffer UTF-32)
+        codigos = texto_a_codigos(texto)
+        self.validar_codigos(codigos)
         
-        # Paso 2: Rellenar con ceros hasta que sea múltiplo de n
-        while len(nums) % self.n != 0:
-            nums.append(0)  # Padding: agregar ceros
+        # Paso 2: Una sola reserva ya rellena con ceros (padding incluido)
+        filas = -(-len(codigos) // self.n)
+        matriz = np.zeros((filas, self.n), dtype=self.dtype)
         
-        # Paso 3: Reshapear a matriz
-        return np.array(nums, dtype=float).reshape(-1, self.n)
+        # Paso 3: Copiar los códigos sobre la matriz aplanada
+        matriz.reshape(-1)[:len(codigos)] = codigos
+        return matriz
 
-    def matriz_a_texto(self, matriz: NDArray) -> str:
+    def validar_codigos(self, codigos: NDArray) -> None:
+        """
+        VALIDAR CÓDIGOS UNICODE
+        =======================
+        
+        Verificar que ningún código supere codigo_max (si está acotado).
+        Útil para quien arma la matriz por su cuenta (ej: por tramos).
+        
+        Raises:
+            ValueError: Si algún código supera codigo_max
+        """
+        if self.codigo_max < CODIGO_MAX_UNICODE and codigos.size:
+            maximo = int(codigos.max())
+            if maximo > self.codigo_max:
+                raise ValueError(
+                    f"Código Unicode {maximo} supera codigo_max={self.codigo_max}"
+                )
+
+    def _texto_a_matriz_referencia(self, texto: str) -> NDArray:
+        """
+        Implementación original carácter a carácter de texto_a_matriz.
+        Se conserva como referencia para las pruebas de equivalencia.
+        """
+        if not texto or not isinstance(texto, str):
+            raise ValueError("El texto debe ser un string no vacío")
+        
+        nums = [ord(c) for c in texto]
+        nums.extend([0] * self.calcular_relleno(len(nums)))
+        return np.array(nums, dtype=self.dtype).reshape(-1, self.n)
+
+    @medir_etapa("matriz_a_texto", _bytes_entrada)
+    def matriz_a_texto(self, matriz: NDArray, longitud: Optional[int] = None) -> str:
         """
         CONVERTIR MATRIZ DE UNICODE A TEXTO
         ====================================
@@ -172,10 +609,16 @@ class Encriptador:
         1. Aplanar matriz a vector
         2. Redondear a enteros (necesario después de operaciones matriciales)
         3. Remover padding (ceros al final)
-        4. Convertir códigos a caracteres
+        4. Validar que todos los códigos sean Unicode válidos
+        5. Convertir códigos a caracteres (un solo decode UTF-32)
+        
+        Si se conoce la longitud original, el relleno se descarta con un
+        solo corte, y los caracteres '\\x00' reales al final del texto
+        se conservan.
         
         Args:
             matriz: Matriz numpy con códigos Unicode.
+            longitud: Longitud del texto original (opcional).
         
         Returns:
             String recuperado.
@@ -190,16 +633,60 @@ class Encriptador:
         """
         try:
             # Paso 1: Aplanar matriz
-            nums = np.array(matriz, dtype=float).flatten()
+            arr = np.asarray(matriz)
             
             # Paso 2: Redondear a enteros (importante para precisión numérica)
-            nums = np.rint(nums).astype(int)
+            if np.issubdtype(arr.dtype, np.integer):
+                nums = arr.reshape(-1)
+            else:
+                if not np.issubdtype(arr.dtype, np.floating):
+                    arr = np.asarray(arr, dtype=float)
+                # NaN/inf no pasan las comparaciones de rango del paso 4
+                if not np.isfinite(arr).all():
+                    raise ValueError("Código fuera del rango Unicode (0-0x10FFFF)")
+                nums = np.rint(arr).reshape(-1)
             
             # Paso 3: Remover padding (ceros al final)
-            while len(nums) > 0 and nums[-1] == 0:
-                nums = nums[:-1]
+            if longitud is not None:
+                if not 0 <= longitud <= len(nums):
+                    raise ValueError(f"Longitud fuera de rango: {longitud}")
+                nums = nums[:longitud]
+            else:
+                # Primer valor no nulo desde el final, en una sola pasada
+                no_nulos = nums[::-1] != 0
+                fin = len(nums) - int(np.argmax(no_nulos)) if no_nulos.any() else 0
+                nums = nums[:fin]
+            
+            # Paso 4: Validar todo el rango Unicode de una vez
+            if nums.size and (nums.min() < 0 or nums.max() > 0x10FFFF):
+                raise ValueError("Código fuera del rango Unicode (0-0x10FFFF)")
+            
+            # Paso 5: Decodificar desde un buffer UTF-32 contiguo
+            return nums.astype("<u4").tobytes().decode("utf-32-le", "surrogatepass")
+        
+        except Exception as e:
+            raise ValueError(f"Error en conversión de matriz a texto: {str(e)}") from e
+
+    def _matriz_a_texto_referencia(
+        self,
+        matriz: NDArray,
+        longitud: Optional[int] = None
+    ) -> str:
+        """
+        Implementación original carácter a carácter de matriz_a_texto.
+        Se conserva como referencia para las pruebas de equivalencia.
+        """
+        try:
+            nums = np.rint(np.array(matriz, dtype=float).flatten()).astype(int)
+            
+            if longitud is not None:
+                if not 0 <= longitud <= len(nums):
+                    raise ValueError(f"Longitud fuera de rango: {longitud}")
+                nums = nums[:longitud]
+            else:
+                while len(nums) > 0 and nums[-1] == 0:
+                    nums = nums[:-1]
             
-            # Paso 4: Convertir a caracteres
             return ''.join(chr(i) for i in nums)
         
         except Exception as e:
@@ -207,7 +694,8 @@ class Encriptador:
 
     # ==================== ENCRIPTACIÓN ====================
 
-    def encriptar(self, texto: str) -> NDArray:
+    @medir_etapa("encriptar", _bytes_resultado)
+    def encriptar(self, texto: str, salida: Optional[NDArray] = None) -> NDArray:
         """
         ENCRIPTAR TEXTO
         ===============
@@ -217,14 +705,21 @@ class Encriptador:
         2. Multiplicar: C = M × K (donde K es la clave invertible)
         3. Aplicar permutación: C_permutado = C[:, permutacion]
         
+        Los pasos 2 y 3 son una sola multiplicación por la clave
+        fusionada K[:, permutacion], precalculada en el constructor.
+        
         Args:
             texto: Texto plano a encriptar.
+            salida: Arreglo (filas, n) preasignado donde escribir el cifrado
+                    (ej: un buffer reutilizado o un np.memmap). Su dtype
+                    debe ser el del cifrado (self.dtype).
         
         Returns:
             Matriz cifrada (números grandes y aparentemente aleatorios).
+            Si se pasó salida, es ese mismo arreglo.
         
         Raises:
-            ValueError: Si el texto es inválido.
+            ValueError: Si el texto es inválido o salida no tiene la forma correcta.
         
         Ejemplo:
             >>> enc = Encriptador()
@@ -234,17 +729,19 @@ class Encriptador:
         # Convertir texto a matriz
         matriz = self.texto_a_matriz(texto)
         
-        # Multiplicación matricial: M × K
-        cifrada = np.dot(matriz, self.clave)
-        
-        # Aplicar permutación de columnas
-        cifrada = cifrada[:, self.permutacion]
-        
-        return cifrada
+        return self._cifrar_matriz(matriz, salida)
+
+    @medir_etapa("cifrar_matriz", _bytes_resultado)
+    def _cifrar_matriz(self, matriz: NDArray, salida: Optional[NDArray] = None) -> NDArray:
+        """Cifrar una matriz de códigos: (M × K)[:, permutacion] = M × K[:, permutacion]."""
+        if salida is not None and salida.shape != matriz.shape:
+            raise ValueError(f"Salida con forma {salida.shape}, se esperaba {matriz.shape}")
+        return np.matmul(matriz, self.clave_fusionada, out=salida)
 
     # ==================== DESENCRIPTACIÓN ====================
 
-    def desencriptar(self, cifrada: NDArray) -> str:
+    @medir_etapa("desencriptar", _bytes_entrada)
+    def desencriptar(self, cifrada: NDArray, longitud: Optional[int] = None) -> str:
         """
         DESENCRIPTAR MATRIZ
         ===================
@@ -254,8 +751,12 @@ class Encriptador:
         2. Multiplicar por matriz inversa: M = C_original × K^(-1)
         3. Convertir matriz a texto
         
+        Acepta cifrados de cualquier número de filas (modo por bloques).
+        
         Args:
             cifrada: Matriz encriptada (resultado de encriptar).
+            longitud: Longitud del texto original. Si se indica, el relleno
+                      se elimina exactamente (ver matriz_a_texto).
         
         Returns:
             Texto original descifrado.
@@ -270,22 +771,679 @@ class Encriptador:
             >>> assert original == "Hola"
         """
         # Convertir a array numpy
-        arr = np.array(cifrada, dtype=float)
+        arr = np.asarray(cifrada)
         
         # Validar dimensiones
-        if arr.shape[1] != self.n:
+        if arr.ndim != 2 or arr.shape[1] != self.n:
             raise ValueError(
-                f"Número de columnas incorrecto: {arr.shape[1]} vs {self.n}"
+                f"Número de columnas incorrecto: {arr.shape} vs {self.n}"
             )
         
-        # Paso 1: Invertir permutación
-        original = arr[:, self.permutacion_inv]
-        
-        # Paso 2: Multiplicar por matriz inversa: C × K^(-1)
-        original = np.dot(original, self.clave_inv)
+        # Pasos 1 y 2: permutación inversa y multiplicación por K^(-1)
+        original = self._descifrar_matriz(arr)
         
         # Paso 3: Convertir matriz a texto
-        return self.matriz_a_texto(original)
+        return self.matriz_a_texto(original, longitud)
+
+    @medir_etapa("descifrar_matriz", _bytes_resultado)
+    def _descifrar_matriz(self, arr: NDArray, salida: Optional[NDArray] = None) -> NDArray:
+        """Descifrar una matriz cifrada: C[:, permutacion_inv] × K^(-1) = C × K^(-1)[permutacion, :]."""
+        return np.matmul(np.asarray(arr, dtype=self.dtype), self.clave_inv_fusionada, out=salida)
+
+    # ==================== MODO PARALELO (VARIOS NÚCLEOS) ====================
+
+    def encriptar_paralelo(
+        self,
+        texto: str,
+        trabajadores: Optional[int] = None,
+        filas_por_bloque: int = FILAS_POR_BLOQUE,
+        procesos: bool = False
+    ) -> NDArray:
+        """
+        ENCRIPTAR EN PARALELO
+        =====================
+        
+        Las filas de M son independientes (cada una se multiplica por K
+        por separado), así que el texto se parte en bloques de filas que
+        se cifran en un pool de hilos o de procesos. El resultado es
+        idéntico a encriptar(texto) y conserva el orden de las filas.
+        
+        Args:
+            texto: Texto plano a encriptar.
+            trabajadores: Número de trabajadores (None = núcleos disponibles).
+            filas_por_bloque: Filas de cada bloque enviado a un trabajador.
+            procesos: True usa procesos (sin GIL); False usa hilos (NumPy
+                      libera el GIL durante la multiplicación).
+        
+        Nota:
+            BLAS se limita a núcleos // trabajadores hilos mientras dura
+            el pool (ver PoolTrabajadores): con procesos, en el entorno
+            con que nacen los hijos; con hilos, mediante threadpoolctl.
+        
+        Returns:
+            Matriz cifrada, igual a la de encriptar().
+        
+        Raises:
+            ValueError: Si el texto o los parámetros son inválidos
+                        (ej: trabajadores < 1).
+        """
+        matriz = self.texto_a_matriz(texto)
+        return self.procesar_en_paralelo(
+            matriz, cifrar=True, trabajadores=trabajadores,
+            filas_por_bloque=filas_por_bloque, procesos=procesos
+        )
+
+    def desencriptar_paralelo(
+        self,
+        cifrada: NDArray,
+        longitud: Optional[int] = None,
+        trabajadores: Optional[int] = None,
+        filas_por_bloque: int = FILAS_POR_BLOQUE,
+        procesos: bool = False
+    ) -> str:
+        """
+        DESENCRIPTAR EN PARALELO
+        ========================
+        
+        Operación simétrica a encriptar_paralelo: descifra bloques de filas
+        en paralelo y convierte el resultado a texto una sola vez.
+        
+        Args:
+            cifrada: Matriz encriptada (resultado de encriptar).
+            longitud: Longitud del texto original (opcional).
+            trabajadores, filas_por_bloque, procesos: Ver encriptar_paralelo.
+        
+        Returns:
+            Texto original descifrado.
+        """
+        arr = np.asarray(cifrada)
+        if arr.ndim != 2 or arr.shape[1] != self.n:
+            raise ValueError(
+                f"Número de columnas incorrecto: {arr.shape} vs {self.n}"
+            )
+        
+        original = self.procesar_en_paralelo(
+            arr, cifrar=False, trabajadores=trabajadores,
+            filas_por_bloque=filas_por_bloque, procesos=procesos
+        )
+        return self.matriz_a_texto(original, longitud)
+
+    def procesar_en_paralelo(
+        self,
+        matriz: NDArray,
+        cifrar: bool,
+        trabajadores: Optional[int] = None,
+        filas_por_bloque: int = FILAS_POR_BLOQUE,
+        procesos: bool = False,
+        pool: Optional[PoolTrabajadores] = None
+    ) -> NDArray:
+        """
+        CIFRAR O DESCIFRAR UNA MATRIZ EN PARALELO
+        =========================================
+        
+        Reparte bloques de filas entre trabajadores y los une en orden.
+        A diferencia de encriptar_paralelo, recibe la matriz ya armada
+        (filas, n), así que sirve para procesar un flujo por tramos.
+        
+        Args:
+            matriz: Códigos (cifrar=True) o cifrado (cifrar=False), (filas, n)
+            cifrar: True cifra, False descifra
+            trabajadores, filas_por_bloque, procesos: Ver encriptar_paralelo
+            pool: PoolTrabajadores ya abierto para reutilizar entre llamadas
+                  (trabajadores y procesos se ignoran); None crea uno por llamada
+        
+        Returns:
+            Matriz resultado con la misma forma.
+        
+        Raises:
+            ValueError: Si los parámetros son inválidos o el pool es de otro encriptador
+        """
+        if filas_por_bloque < 1:
+            raise ValueError(f"filas_por_bloque debe ser >= 1: {filas_por_bloque}")
+        if pool is not None and pool.encriptador is not self:
+            raise ValueError("El pool pertenece a otro encriptador")
+        
+        trabajadores = resolver_trabajadores(trabajadores)
+        bloques = [matriz[i:i + filas_por_bloque]
+                   for i in range(0, matriz.shape[0], filas_por_bloque)]
+        funcion = self._cifrar_matriz if cifrar else self._descifrar_matriz
+        
+        if pool is not None:
+            return np.concatenate(pool.procesar(bloques, cifrar))
+        
+        # Un solo bloque o trabajador: no vale la pena crear un pool
+        if len(bloques) == 1 or trabajadores == 1:
+            return funcion(matriz)
+        
+        with PoolTrabajadores(self, min(trabajadores, len(bloques)), procesos) as pool:
+            resultados = pool.procesar(bloques, cifrar)
+        
+        # Los resultados conservan el orden de los bloques
+        return np.concatenate(resultados)
+
+    # ==================== ARCHIVOS (MEMORIA CONSTANTE) ====================
+
+    def encriptar_archivo(
+        self,
+        ruta_entrada: str,
+        ruta_salida: str,
+        filas_por_bloque: int = FILAS_POR_BLOQUE
+    ) -> Dict[str, Any]:
+        """
+        ENCRIPTAR ARCHIVO
+        =================
+        
+        Cifra un archivo de texto UTF-8 de cualquier tamaño sin cargarlo
+        entero en memoria:
+        1. Mapear la entrada en memoria (np.memmap de bytes)
+        2. Contar caracteres (bytes que no son de continuación UTF-8)
+        3. Crear la salida .npy mapeada en memoria con forma (filas, n)
+        4. Decodificar, cifrar y escribir bloque a bloque
+        
+        Se escribe en una ruta temporal que reemplaza a ruta_salida solo
+        al terminar: un error (p. ej. UTF-8 inválido) no deja un .npy
+        a medio escribir.
+        
+        La memoria usada depende de filas_por_bloque, no del tamaño del
+        archivo. La salida es idéntica a encriptar(texto_completo).
+        
+        Args:
+            ruta_entrada: Archivo de texto UTF-8.
+            ruta_salida: Archivo .npy donde se escribe el cifrado.
+            filas_por_bloque: Filas procesadas por iteración.
+        
+        Returns:
+            Dict con 'caracteres', 'filas' y 'relleno'. Se necesita
+            'caracteres' para descifrar con exactitud (ver desencriptar_archivo).
+        
+        Raises:
+            ValueError: Si el archivo está vacío o no es UTF-8 válido.
+        """
+        if filas_por_bloque < 1:
+            raise ValueError(f"filas_por_bloque debe ser >= 1: {filas_por_bloque}")
+        if self.dtype is object:
+            raise ValueError("El cifrado de archivos requiere un tipo numérico fijo")
+        if os.path.getsize(ruta_entrada) == 0:
+            raise ValueError("El archivo de entrada está vacío")
+        
+        entrada = np.memmap(ruta_entrada, dtype=np.uint8, mode="r")
+        paso_bytes = filas_por_bloque * self.n
+        
+        # Paso 2: Contar caracteres sin decodificar (memoria constante)
+        caracteres = 0
+        for inicio in range(0, entrada.size, paso_bytes):
+            bloque = entrada[inicio:inicio + paso_bytes]
+            caracteres += int(np.count_nonzero((bloque & 0xC0) != 0x80))
+        
+        filas = -(-caracteres // self.n)
+        with _ruta_temporal(ruta_salida) as temporal:
+            salida = np.lib.format.open_memmap(
+                temporal, mode="w+", dtype=self.dtype, shape=(filas, self.n)
+            )
+            try:
+                self._cifrar_archivo(entrada, salida, paso_bytes)
+                salida.flush()
+            finally:
+                del salida
+        
+        return {
+            "caracteres": caracteres,
+            "filas": filas,
+            "relleno": self.calcular_relleno(caracteres)
+        }
+
+    def _cifrar_archivo(self, entrada: NDArray, salida: NDArray, paso_bytes: int) -> None:
+        """Paso 4 de encriptar_archivo: cifrar `entrada` (bytes UTF-8) en `salida`."""
+        # Decodificar (sin cortar caracteres multibyte), cifrar y escribir
+        decodificador = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+        pendiente = np.zeros(0, dtype=np.uint32)
+        fila = 0
+        for inicio in range(0, entrada.size, paso_bytes):
+            final = inicio + paso_bytes >= entrada.size
+            texto = decodificador.decode(entrada[inicio:inicio + paso_bytes].tobytes(), final)
+            codigos = np.concatenate((pendiente, texto_a_codigos(texto)))
+            
+            completas = len(codigos) // self.n
+            if final and len(codigos) % self.n:
+                # Último bloque: rellenar la fila incompleta con ceros
+                completas += 1
+                codigos = np.concatenate(
+                    (codigos, np.zeros(self.calcular_relleno(len(codigos)), dtype=np.uint32))
+                )
+            
+            usados = completas * self.n
+            pendiente = codigos[usados:]
+            if completas:
+                self.validar_codigos(codigos[:usados])
+                matriz = codigos[:usados].reshape(completas, self.n).astype(self.dtype)
+                self._cifrar_matriz(matriz, salida[fila:fila + completas])
+                fila += completas
+
+    def desencriptar_archivo(
+        self,
+        ruta_cifrado: str,
+        ruta_salida: str,
+        longitud: Optional[int] = None,
+        filas_por_bloque: int = FILAS_POR_BLOQUE
+    ) -> int:
+        """
+        DESENCRIPTAR ARCHIVO
+        ====================
+        
+        Operación inversa de encriptar_archivo: abre el .npy mapeado en
+        memoria y escribe el texto UTF-8 bloque a bloque. Con longitud se
+        detiene en cuanto la alcanza; sin ella, los ceros finales se tratan
+        como relleno (igual que matriz_a_texto) reteniendo sólo su cantidad,
+        no los datos. Como encriptar_archivo, escribe en una ruta temporal.
+        
+        Args:
+            ruta_cifrado: Archivo .npy generado por encriptar_archivo.
+            ruta_salida: Archivo de texto donde se escribe el resultado.
+            longitud: Caracteres originales (ver encriptar_archivo).
+            filas_por_bloque: Filas procesadas por iteración.
+        
+        Returns:
+            int: Caracteres escritos.
+        
+        Raises:
+            ValueError: Si el cifrado tiene dimensiones incorrectas.
+        """
+        if filas_por_bloque < 1:
+            raise ValueError(f"filas_por_bloque debe ser >= 1: {filas_por_bloque}")
+        
+        cifrado = np.load(ruta_cifrado, mmap_mode="r")
+        if cifrado.ndim != 2 or cifrado.shape[1] != self.n:
+            raise ValueError(
+                f"Número de columnas incorrecto: {cifrado.shape} vs {self.n}"
+            )
+        if longitud is not None and not 0 <= longitud <= cifrado.size:
+            raise ValueError(f"Longitud fuera de rango: {longitud}")
+        
+        # Con longitud conocida, no descifrar las filas que solo son relleno
+        filas = cifrado.shape[0] if longitud is None else -(-longitud // self.n)
+        
+        escritos = 0
+        ceros_pendientes = 0
+        with _ruta_temporal(ruta_salida) as temporal, \
+                open(temporal, "w", encoding="utf-8", errors="surrogatepass", newline="") as f:
+            for inicio in range(0, filas, filas_por_bloque):
+                original = self._descifrar_matriz(cifrado[inicio:min(inicio + filas_por_bloque, filas)])
+                texto = self.matriz_a_texto(original, longitud=original.size)
+                
+                if longitud is not None:
+                    texto = texto[:longitud - escritos]
+                else:
+                    # Diferir los ceros finales: sólo son texto si luego hay más datos
+                    recortado = texto.rstrip("\x00")
+                    if recortado and ceros_pendientes:
+                        f.write("\x00" * ceros_pendientes)
+                        escritos += ceros_pendientes
+                        ceros_pendientes = 0
+                    ceros_pendientes += len(texto) - len(recortado)
+                    texto = recortado
+                
+                f.write(texto)
+                escritos += len(texto)
+        
+        return escritos
+
+    # ==================== LOTES (MUCHOS MENSAJES, UNA CLAVE) ====================
+
+    def encriptar_lote(self, textos: Sequence[str]) -> Tuple[List[NDArray], NDArray]:
+        """
+        ENCRIPTAR LOTE DE TEXTOS
+        ========================
+        
+        Cifra muchos mensajes con la misma clave en una sola operación:
+        1. Cada texto se rellena hasta filas completas y se concatenan
+        2. Se construye UNA matriz apilada con todas las filas
+        3. Se ejecuta UNA multiplicación y UNA permutación
+        4. Se devuelve, para cada mensaje, una vista de sus filas
+        
+        Args:
+            textos: Secuencia de strings no vacíos.
+        
+        Returns:
+            Tupla (cifrados, desplazamientos):
+                cifrados: Lista de vistas (sin copia) sobre la matriz cifrada
+                desplazamientos: Arreglo de k+1 enteros; el mensaje i ocupa
+                                 las filas [desplazamientos[i], desplazamientos[i+1])
+        
+        Raises:
+            ValueError: Si algún texto es vacío o no válido.
+        
+        Ejemplo:
+            >>> enc = Encriptador()
+            >>> cifrados, desp = enc.encriptar_lote(["Hola", "Mundo"])
+            >>> enc.desencriptar_lote(cifrados)
+            ['Hola', 'Mundo']
+        """
+        for texto in textos:
+            if not texto or not isinstance(texto, str):
+                raise ValueError("Todos los textos deben ser strings no vacíos")
+        
+        # Paso 1: Filas por mensaje y desplazamientos acumulados
+        filas = np.array([-(-len(t) // self.n) for t in textos], dtype=np.int64)
+        desplazamientos = np.zeros(len(textos) + 1, dtype=np.int64)
+        np.cumsum(filas, out=desplazamientos[1:])
+        if not len(textos):
+            return [], desplazamientos
+        
+        # Paso 2: Un solo texto con cada mensaje rellenado a filas completas
+        completo = "".join(t + "\x00" * self.calcular_relleno(len(t)) for t in textos)
+        matriz = self.texto_a_matriz(completo)
+        
+        # Paso 3: Una multiplicación y una permutación para todo el lote
+        cifrada = self._cifrar_matriz(matriz)
+        
+        # Paso 4: Vistas por mensaje
+        cifrados = [cifrada[a:b] for a, b in zip(desplazamientos[:-1], desplazamientos[1:])]
+        return cifrados, desplazamientos
+
+    def desencriptar_lote(
+        self,
+        cifrados: Sequence[NDArray],
+        longitudes: Optional[Sequence[int]] = None
+    ) -> List[str]:
+        """
+        DESENCRIPTAR LOTE DE CIFRADOS
+        =============================
+        
+        Operación simétrica a encriptar_lote: apila los cifrados (sin
+        copiar si son las vistas consecutivas que devuelve encriptar_lote),
+        ejecuta UNA multiplicación por la inversa y separa los textos.
+        
+        Args:
+            cifrados: Secuencia de matrices cifradas con n columnas.
+            longitudes: Longitudes originales (opcional, ver matriz_a_texto).
+        
+        Returns:
+            Lista de textos en el mismo orden.
+        
+        Raises:
+            ValueError: Si algún cifrado tiene dimensiones incorrectas.
+        """
+        arrs = [np.asarray(c) for c in cifrados]
+        for arr in arrs:
+            if arr.ndim != 2 or arr.shape[1] != self.n:
+                raise ValueError(
+                    f"Número de columnas incorrecto: {arr.shape} vs {self.n}"
+                )
+        if longitudes is not None and len(longitudes) != len(arrs):
+            raise ValueError("Debe haber una longitud por cifrado")
+        if not arrs:
+            return []
+        
+        desplazamientos = np.zeros(len(arrs) + 1, dtype=np.int64)
+        np.cumsum([arr.shape[0] for arr in arrs], out=desplazamientos[1:])
+        
+        apilada = self._base_comun(arrs, desplazamientos)
+        if apilada is None:
+            apilada = np.concatenate(arrs)
+        
+        original = self._descifrar_matriz(apilada)
+        
+        # Redondear una sola vez y decodificar TODO el lote en un solo string
+        plano = original.reshape(-1)
+        if np.issubdtype(plano.dtype, np.floating):
+            plano = np.rint(plano).astype(np.int64)
+        if plano.size and (plano.min() < 0 or plano.max() > 0x10FFFF):
+            raise ValueError("Código fuera del rango Unicode (0-0x10FFFF)")
+        completo = plano.astype("<u4").tobytes().decode("utf-32-le", "surrogatepass")
+        
+        # Límites de cada mensaje dentro del string completo
+        inicios = desplazamientos[:-1] * self.n
+        if longitudes is not None:
+            longitudes = np.asarray(longitudes, dtype=np.int64)
+            maximos = np.diff(desplazamientos) * self.n
+            if np.any((longitudes < 0) | (longitudes > maximos)):
+                raise ValueError("Longitud fuera de rango")
+            fines = inicios + longitudes
+        else:
+            # Último código no nulo de cada mensaje (quita el relleno)
+            fines = inicios.copy()
+            con_filas = np.diff(desplazamientos) > 0
+            if con_filas.any():
+                posiciones = np.where(plano != 0, np.arange(1, plano.size + 1), 0)
+                ultimos = np.maximum.reduceat(posiciones, inicios[con_filas])
+                fines[con_filas] = np.maximum(ultimos, inicios[con_filas])
+        
+        return [completo[a:b] for a, b in zip(inicios.tolist(), fines.tolist())]
+
+    @staticmethod
+    def _base_comun(arrs: List[NDArray], desplazamientos: NDArray) -> Optional[NDArray]:
+        """
+        Si los cifrados son vistas consecutivas sobre la misma memoria (como
+        las de encriptar_lote), retornar una vista que los abarca a todos
+        para evitar la copia de np.concatenate.
+        """
+        primero = arrs[0]
+        base = primero.base
+        if base is None or any(
+            arr.base is not base or arr.strides != primero.strides for arr in arrs
+        ):
+            return None
+        
+        inicio = primero.__array_interface__["data"][0]
+        paso = primero.strides[0]
+        for arr, fila in zip(arrs, desplazamientos[:-1]):
+            if arr.__array_interface__["data"][0] != inicio + int(fila) * paso:
+                return None
+        
+        # Las vistas son contiguas por filas dentro de la misma base
+        return np.lib.stride_tricks.as_strided(
+            primero,
+            shape=(int(desplazamientos[-1]), primero.shape[1]),
+            strides=primero.strides,
+            writeable=False
+        )
+
+
+# ==================== MOTOR ENTERO EXACTO ====================
+
+# Límites de los tipos enteros candidatos, del más rápido al más amplio
+_LIMITES_ENTEROS = (
+    (np.int32, np.iinfo(np.int32).max),
+    (np.int64, np.iinfo(np.int64).max),
+)
+
+
+def _dtype_entero_seguro(cota: int):
+    """
+    Elegir el tipo entero más pequeño que representa valores en [-cota, cota].
+    Si ni int64 alcanza, retorna None (ver EncriptadorEntero.permitir_objeto).
+    """
+    for dtype, limite in _LIMITES_ENTEROS:
+        if cota <= limite:
+            return dtype
+    return None
+
+
+def determinante_y_adjunta(clave: List[List[int]]) -> Tuple[int, List[List[int]]]:
+    """
+    DETERMINANTE Y ADJUNTA EXACTOS
+    ==============================
+    
+    Calcula det(K) y adj(K) con aritmética racional (Gauss-Jordan sobre
+    Fraction), sin ningún redondeo. Como K·adj(K) = det(K)·I, se cumple
+    K^(-1) = adj(K) / det(K) con adj(K) entera.
+    
+    Args:
+        clave: Matriz cuadrada de enteros.
+    
+    Returns:
+        Tupla (det, adj) con det entero y adj como lista de listas de enteros.
+    
+    Raises:
+        ClaveInvalidaError: Si la matriz es singular (det = 0).
+    """
+    n = len(clave)
+    a = [[Fraction(int(v)) for v in fila] + [Fraction(int(i == j)) for j in range(n)]
+         for i, fila in enumerate(clave)]
+    det = Fraction(1)
+    
+    for col in range(n):
+        # Buscar pivote no nulo (intercambio de filas cambia el signo)
+        pivote = next((f for f in range(col, n) if a[f][col] != 0), None)
+        if pivote is None:
+            raise ClaveInvalidaError("Matriz singular: determinante exacto = 0")
+        if pivote != col:
+            a[col], a[pivote] = a[pivote], a[col]
+            det = -det
+        
+        p = a[col][col]
+        det *= p
+        a[col] = [v / p for v in a[col]]
+        
+        for f in range(n):
+            if f != col and a[f][col] != 0:
+                factor = a[f][col]
+                a[f] = [vf - factor * vc for vf, vc in zip(a[f], a[col])]
+    
+    adj = [[int(v * det) for v in fila[n:]] for fila in a]
+    return int(det), adj
+
+
+class EncriptadorEntero(Encriptador):
+    """
+    ╔════════════════════════════════════════════════════════════════╗
+    ║         ENCRIPTADOR MATRICIAL ENTERO (EXACTO)                 ║
+    ╚════════════════════════════════════════════════════════════════╝
+    
+    Variante de Encriptador que trabaja con enteros en lugar de float64.
+    La desencriptación usa la adjunta y el determinante exactos:
+    
+        M = (C[:, permutacion_inv] × adj(K)) / det(K) = (C × adj(K)[permutacion, :]) / det(K)
+    
+    La división es entera y exacta, así que el resultado es idéntico
+    bit a bit al texto original para cualquier n y cualquier código
+    Unicode, sin depender de np.rint.
+    
+    SELECCIÓN DE TIPO:
+    ==================
+    A partir de codigo_max y de las sumas por columna de |K| y |adj(K)|
+    se acotan los valores intermedios y se elige el tipo más rápido que
+    no desborda: int32 → int64. Si ni int64 alcanza, la clave se rechaza
+    salvo con permitir_objeto=True (enteros de Python: exactos pero
+    mucho más lentos, con un RuntimeWarning).
+    
+    EJEMPLO DE USO:
+    ===============
+    >>> enc = EncriptadorEntero()
+    >>> cifrado = enc.encriptar("Hola")   # dtype int32
+    >>> enc.desencriptar(cifrado)
+    'Hola'
+    """
+
+    def __init__(
+        self,
+        clave: Optional[List[List[float]]] = None,
+        permutacion: Optional[Tuple[int, ...]] = None,
+        clave_inv: Optional[NDArray] = None,
+        dtype: Any = None,
+        codigo_max: int = CODIGO_MAX_UNICODE,
+        permitir_objeto: bool = False
+    ) -> None:
+        """
+        INICIALIZAR ENCRIPTADOR ENTERO
+        ==============================
+        
+        Acepta los mismos argumentos que Encriptador, así que los servicios
+        pueden crear cualquiera de los dos motores con las mismas opciones.
+        
+        Args:
+            clave: Matriz NxN invertible de enteros. Si es None, usa la de defecto.
+            permutacion: Tupla de permutación. Si es None, usa identidad.
+            clave_inv: Inversa ya calculada (ej: desde un pool de claves).
+                       Sólo se comprueba su forma: este motor descifra con
+                       la adjunta exacta y expone clave_inv = adj(K) / det(K).
+            dtype: Sólo None. El tipo entero sale de las cotas de los
+                   valores intermedios; un tipo flotante (ej: el de un
+                   servicio en float32) se rechaza en lugar de ignorarse.
+            codigo_max: Código Unicode máximo admitido (acota los desbordes).
+            permitir_objeto: Si ni int64 alcanza, usar enteros de Python
+                             (muy lento) en lugar de rechazar la clave.
+        
+        Raises:
+            MatrizInvalidaError: Si la matriz no es cuadrada o no es entera.
+            ClaveInvalidaError: Si la matriz es singular, o si sus valores
+                                intermedios desbordan int64 sin permitir_objeto.
+            PermutacionInvalidaError: Si la permutación es inválida.
+            ValueError: Si se indica dtype o codigo_max no es válido.
+        """
+        if clave is None:
+            clave = self.DEFAULT_CLAVE
+        if dtype is not None:
+            raise ValueError(
+                f"El motor entero elige su propio tipo entero; no admite dtype={dtype}"
+            )
+        if not 0 < codigo_max <= CODIGO_MAX_UNICODE:
+            raise ValueError(f"codigo_max fuera de rango: {codigo_max}")
+        
+        clave_arr = np.array(clave)
+        if clave_arr.ndim != 2 or clave_arr.shape[0] != clave_arr.shape[1]:
+            raise MatrizInvalidaError(f"Matriz debe ser cuadrada: {clave_arr.shape}")
+        if not np.array_equal(clave_arr, np.round(clave_arr)):
+            raise MatrizInvalidaError("La clave del motor entero debe tener valores enteros")
+        if clave_inv is not None and np.shape(clave_inv) != clave_arr.shape:
+            raise MatrizInvalidaError(f"Inversa con forma incorrecta: {np.shape(clave_inv)}")
+        
+        self.n = clave_arr.shape[0]
+        self.codigo_max = codigo_max
+        
+        # Determinante y adjunta exactos (K^(-1) = adj / det)
+        claves_int = [[int(v) for v in fila] for fila in clave_arr.tolist()]
+        self.det, adj = determinante_y_adjunta(claves_int)
+        
+        # Cotas de los valores intermedios → tipo más rápido sin desborde
+        col_clave = max(sum(abs(claves_int[i][j]) for i in range(self.n))
+                        for j in range(self.n))
+        col_adj = max(sum(abs(adj[i][j]) for i in range(self.n))
+                      for j in range(self.n))
+        cota_cifrado = codigo_max * col_clave
+        cota_descifrado = cota_cifrado * col_adj
+        
+        self.dtype = _dtype_entero_seguro(cota_cifrado)
+        self.dtype_descifrado = _dtype_entero_seguro(cota_descifrado)
+        if self.dtype_descifrado is None:
+            if not permitir_objeto:
+                raise ClaveInvalidaError(
+                    f"Los valores intermedios (hasta {cota_descifrado:.3g}) desbordan "
+                    f"int64; use una clave menor o permitir_objeto=True"
+                )
+            warnings.warn(
+                "EncriptadorEntero usa enteros de Python (dtype=object): "
+                "exacto pero mucho más lento",
+                RuntimeWarning,
+                stacklevel=2
+            )
+            self.dtype = self.dtype or object
+            self.dtype_descifrado = object
+        
+        self.clave = np.array(claves_int, dtype=self.dtype)
+        self.adjunta = np.array(adj, dtype=self.dtype_descifrado)
+        self.clave_inv = np.array(adj, dtype=float) / self.det
+        
+        self._asignar_permutacion(permutacion)
+        
+        # Permutación incorporada a clave y adjunta (ver Encriptador)
+        self.clave_fusionada = np.ascontiguousarray(self.clave[:, list(self.permutacion)])
+        self.adjunta_fusionada = np.ascontiguousarray(self.adjunta[list(self.permutacion), :])
+
+    @medir_etapa("descifrar_matriz", _bytes_resultado)
+    def _descifrar_matriz(self, arr: NDArray, salida: Optional[NDArray] = None) -> NDArray:
+        """Descifrar con aritmética entera exacta: (C × adj(K)[permutacion, :]) / det(K)."""
+        arr = np.asarray(arr)
+        if np.issubdtype(arr.dtype, np.floating) and not np.array_equal(arr, np.round(arr)):
+            raise ValueError("El cifrado del motor entero debe tener valores enteros")
+        
+        original = np.matmul(arr.astype(self.dtype_descifrado, copy=False), self.adjunta_fusionada)
+        
+        # Si el cifrado fue generado con esta clave, la división es exacta
+        if np.any(original % self.det != 0):
+            raise ValueError("El cifrado no corresponde a esta clave")
+        
+        return np.floor_divide(original, self.det, out=salida)
 
 
 # ==================== BLOQUE DE PRUEBA ====================
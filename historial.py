@@ -0,0 +1,300 @@
+"""
+Historial de Encriptaciones
+
+Almacén acotado y compacto de las operaciones de ServicioEncriptacion:
+
+  ┌──────────────────────────────┐   desborde   ┌───────────────────────────┐
+  │ Anillo en memoria (maxlen)   │ ───────────▶ │ SQLite en disco (opcional)│
+  │ tuplas (id, marca, texto, …) │   por lotes  │ tabla indexada por marca  │
+  └──────────────────────────────┘              └───────────────────────────┘
+
+- Las marcas de tiempo son time.monotonic() (una llamada barata); la fecha
+  legible se calcula sólo al consultar, a partir de un origen fijado al
+  crear el historial.
+- Sin ruta de SQLite, las entradas más antiguas se descartan al llenarse
+  el anillo: la memoria queda acotada en procesos de larga duración.
+- obtener(offset, limit) pagina sobre disco + memoria sin copiar el resto;
+  con truncar, los textos largos se recortan antes de salir de SQLite.
+"""
+
+import itertools
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+# Entradas retenidas en memoria por defecto
+HISTORIAL_MAX = 1000
+
+# Entradas desbordadas acumuladas antes de escribirlas a SQLite en una transacción
+LOTE_VOLCADO = 256
+
+# (id, marca monotónica, texto, permutación)
+Entrada = Tuple[int, float, str, Tuple[int, ...]]
+
+_ESQUEMA = (
+    """CREATE TABLE IF NOT EXISTS historial (
+        id INTEGER PRIMARY KEY,
+        marca REAL NOT NULL,
+        longitud INTEGER NOT NULL,
+        texto TEXT NOT NULL,
+        permutacion TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_historial_marca ON historial(marca)",
+    "CREATE INDEX IF NOT EXISTS idx_historial_longitud ON historial(longitud)",
+)
+
+
+class HistorialEncriptaciones:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║      HISTORIAL ACOTADO CON DESBORDE A SQLITE          ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Guarda cada operación como una tupla (id, marca, texto, permutación)
+    en un deque de tamaño máximo fijo. Con ruta_sqlite, las entradas que
+    salen del anillo se escriben en disco por lotes en vez de perderse,
+    y siguen disponibles en obtener().
+
+    Es seguro entre hilos (lock interno).
+
+    EJEMPLO DE USO:
+    ===============
+    >>> historial = HistorialEncriptaciones(maximo=100, ruta_sqlite="historial.db")
+    >>> historial.agregar("Hola", (1, 0))
+    >>> historial.obtener(offset=0, limit=20)
+    [{'id': 1, 'texto': 'Hola', 'permutacion': (1, 0), 'timestamp': '...'}]
+    """
+
+    def __init__(
+        self,
+        maximo: int = HISTORIAL_MAX,
+        ruta_sqlite: Optional[str] = None,
+        lote_volcado: int = LOTE_VOLCADO
+    ) -> None:
+        """
+        INICIALIZAR HISTORIAL
+        =====================
+
+        Args:
+            maximo: Entradas retenidas en memoria (tamaño del anillo)
+            ruta_sqlite: Archivo SQLite para las entradas desbordadas.
+                         None = descartarlas.
+            lote_volcado: Entradas desbordadas por transacción de escritura
+
+        Raises:
+            ValueError: Si maximo o lote_volcado son < 1
+        """
+        if maximo < 1:
+            raise ValueError(f"maximo debe ser >= 1: {maximo}")
+        if lote_volcado < 1:
+            raise ValueError(f"lote_volcado debe ser >= 1: {lote_volcado}")
+
+        self.maximo = maximo
+        self.lote_volcado = lote_volcado
+        self._memoria: Deque[Entrada] = deque(maxlen=maximo)
+        self._pendientes: List[Entrada] = []
+        self._siguiente_id = 1
+        self._en_disco = 0
+        self._descartadas = 0
+        self._lock = threading.Lock()
+
+        # Origen para convertir marcas monotónicas en fecha (sin relojes por entrada)
+        self._origen_real = time.time()
+        self._origen_monotonico = time.monotonic()
+
+        self._conexion: Optional[sqlite3.Connection] = None
+        if ruta_sqlite is not None:
+            self._conexion = sqlite3.connect(ruta_sqlite, check_same_thread=False)
+            for sentencia in _ESQUEMA:
+                self._conexion.execute(sentencia)
+            self._conexion.commit()
+            fila = self._conexion.execute("SELECT COUNT(*), MAX(id) FROM historial").fetchone()
+            self._en_disco = fila[0]
+            self._siguiente_id = (fila[1] or 0) + 1
+
+    # ==================== ESCRITURA ====================
+
+    def agregar(self, texto: str, permutacion: Tuple[int, ...]) -> int:
+        """
+        AGREGAR ENTRADA
+        ===============
+
+        Args:
+            texto: Texto encriptado
+            permutacion: Permutación usada
+
+        Returns:
+            int: Identificador de la entrada
+        """
+        return self.agregar_lote([(texto, permutacion)])[0]
+
+    def agregar_lote(self, entradas: Iterable[Tuple[str, Tuple[int, ...]]]) -> List[int]:
+        """
+        AGREGAR VARIAS ENTRADAS CON LA MISMA MARCA
+        =========================================
+
+        Args:
+            entradas: Pares (texto, permutacion)
+
+        Returns:
+            List[int]: Identificadores asignados, en orden
+        """
+        marca = time.monotonic()
+        ids = []
+        with self._lock:
+            for texto, permutacion in entradas:
+                if len(self._memoria) == self.maximo:
+                    self._desbordar(self._memoria[0])
+                entrada = (self._siguiente_id, marca, texto, tuple(permutacion))
+                self._memoria.append(entrada)
+                ids.append(self._siguiente_id)
+                self._siguiente_id += 1
+            if len(self._pendientes) >= self.lote_volcado:
+                self._volcar()
+        return ids
+
+    def _desbordar(self, entrada: Entrada) -> None:
+        """Entrada que sale del anillo: a disco (por lotes) o descartada."""
+        if self._conexion is None:
+            self._descartadas += 1
+        else:
+            self._pendientes.append(entrada)
+
+    def _volcar(self) -> None:
+        """Escribir las entradas pendientes en una sola transacción (con lock)."""
+        if not self._pendientes or self._conexion is None:
+            return
+        with self._conexion:
+            self._conexion.executemany(
+                "INSERT INTO historial (id, marca, longitud, texto, permutacion) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (id_, self._a_epoch(marca), len(texto), texto,
+                     ",".join(map(str, permutacion)))
+                    for id_, marca, texto, permutacion in self._pendientes
+                ]
+            )
+        self._en_disco += len(self._pendientes)
+        self._pendientes.clear()
+
+    # ==================== CONSULTA ====================
+
+    def obtener(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        truncar: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        OBTENER PÁGINA DEL HISTORIAL
+        ============================
+
+        Entradas en orden cronológico (la más antigua primero), primero
+        las de disco y después las de memoria. Sólo se materializa la
+        página pedida.
+
+        Args:
+            offset: Entradas a saltar desde la más antigua
+            limit: Máximo de entradas a retornar (None = hasta el final)
+            truncar: Caracteres máximos de cada texto (None = completos).
+                     Para listados: no se leen los textos enteros.
+
+        Returns:
+            List[Dict] con 'id', 'texto', 'longitud' (del texto completo),
+            'permutacion' y 'timestamp'
+
+        Raises:
+            ValueError: Si offset, limit o truncar son negativos
+        """
+        if offset < 0 or (limit is not None and limit < 0) or (truncar is not None and truncar < 0):
+            raise ValueError(f"offset, limit y truncar deben ser >= 0: {offset}, {limit}, {truncar}")
+
+        with self._lock:
+            self._volcar()
+            pagina: List[Tuple[int, float, str, int, Tuple[int, ...]]] = []
+            restantes = limit
+
+            if self._conexion is not None and offset < self._en_disco:
+                columna_texto = "texto" if truncar is None else "substr(texto, 1, ?)"
+                filas = self._conexion.execute(
+                    f"SELECT id, marca, {columna_texto}, longitud, permutacion FROM historial "
+                    "ORDER BY id LIMIT ? OFFSET ?",
+                    (() if truncar is None else (truncar,))
+                    + (-1 if restantes is None else restantes, offset)
+                ).fetchall()
+                pagina.extend(
+                    (id_, marca, texto, longitud, tuple(int(i) for i in perm.split(",") if i))
+                    for id_, marca, texto, longitud, perm in filas
+                )
+                if restantes is not None:
+                    restantes -= len(filas)
+
+            inicio = max(0, offset - self._en_disco)
+            fin = None if restantes is None else inicio + restantes
+            pagina.extend(
+                (id_, self._a_epoch(marca), texto[:truncar], len(texto), permutacion)
+                for id_, marca, texto, permutacion
+                in itertools.islice(self._memoria, inicio, fin)
+            )
+
+        return [
+            {
+                "id": id_,
+                "texto": texto,
+                "longitud": longitud,
+                "permutacion": permutacion,
+                "timestamp": self._formatear(epoch)
+            }
+            for id_, epoch, texto, longitud, permutacion in pagina
+        ]
+
+    def __len__(self) -> int:
+        """Entradas consultables (disco + pendientes + memoria)."""
+        with self._lock:
+            return self._en_disco + len(self._pendientes) + len(self._memoria)
+
+    def estadisticas(self) -> Dict[str, int]:
+        """
+        ESTADÍSTICAS DEL HISTORIAL
+        ==========================
+
+        Returns:
+            Dict con 'memoria', 'disco', 'pendientes', 'descartadas' y 'maximo'
+        """
+        with self._lock:
+            return {
+                "memoria": len(self._memoria),
+                "disco": self._en_disco,
+                "pendientes": len(self._pendientes),
+                "descartadas": self._descartadas,
+                "maximo": self.maximo,
+            }
+
+    # ==================== CIERRE ====================
+
+    def cerrar(self) -> None:
+        """
+        Con SQLite: escribir también las entradas en memoria (el próximo
+        proceso las encuentra en disco) y cerrar la conexión.
+        """
+        with self._lock:
+            if self._conexion is not None:
+                self._pendientes.extend(self._memoria)
+                self._memoria.clear()
+                self._volcar()
+                self._conexion.close()
+                self._conexion = None
+
+    # ==================== MARCAS DE TIEMPO ====================
+
+    def _a_epoch(self, marca: float) -> float:
+        """Convertir una marca monotónica a segundos desde epoch."""
+        return self._origen_real + (marca - self._origen_monotonico)
+
+    @staticmethod
+    def _formatear(epoch: float) -> str:
+        """Formato del logger: 'AAAA-MM-DD HH:MM:SS,mmm'."""
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch)) + \
+            f",{int(epoch * 1000) % 1000:03d}"
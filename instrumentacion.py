@@ -0,0 +1,137 @@
+"""
+Instrumentación de Costo Cero
+
+Eventos estructurados para el camino caliente de los servicios. Un evento
+es un dict plano:
+
+    {"evento": "encriptar.fin", "nivel": 10, "marca": 1234.56,
+     "hilo": 1403..., "caracteres": 11, "n": 4}
+
+y se entrega a los sumideros registrados (cualquier callable que reciba
+el dict: una lista, una cola, un logger, un exportador...).
+
+COSTO CERO SI ESTÁ APAGADA:
+===========================
+Quien instrumenta protege cada llamada con el atributo `activa`:
+
+    if instrumentacion.activa:
+        instrumentacion.emitir("encriptar.fin", caracteres=len(texto))
+
+Sin sumideros `activa` es False y no se construye ni evalúa nada: ni
+f-strings ni argumentos. Los diagnósticos caros (determinante, número de
+condición) además exigen `diagnosticos`, que es opt-in.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+# Evento estructurado entregado a los sumideros
+Evento = Dict[str, Any]
+Sumidero = Callable[[Evento], None]
+
+
+class Instrumentacion:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║       EVENTOS ESTRUCTURADOS CON SUMIDEROS             ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    EJEMPLO DE USO:
+    ===============
+    >>> eventos = []
+    >>> instrumentacion.agregar_sumidero(eventos.append)
+    >>> servicio.encriptar("Hola", Encriptador)
+    >>> [e["evento"] for e in eventos]
+    ['encriptar.inicio', 'encriptar.fin']
+    """
+
+    def __init__(self) -> None:
+        # (sumidero, nivel mínimo); tupla inmutable: emitir() no toma locks
+        self._sumideros: Tuple[Tuple[Sumidero, int], ...] = ()
+        self._lock = threading.Lock()
+        self.activa = False
+        self.diagnosticos = False
+
+    def agregar_sumidero(self, sumidero: Sumidero, nivel: int = logging.DEBUG) -> Sumidero:
+        """
+        AGREGAR SUMIDERO
+        ================
+
+        Args:
+            sumidero: Callable que recibe cada evento (dict)
+            nivel: Nivel mínimo (niveles de logging) de los eventos que recibe
+
+        Returns:
+            El mismo sumidero (para quitar_sumidero)
+        """
+        with self._lock:
+            self._sumideros += ((sumidero, nivel),)
+            self.activa = True
+        return sumidero
+
+    def quitar_sumidero(self, sumidero: Sumidero) -> None:
+        """Dejar de enviar eventos a `sumidero`."""
+        with self._lock:
+            self._sumideros = tuple(s for s in self._sumideros if s[0] is not sumidero)
+            self.activa = bool(self._sumideros)
+
+    def activar_diagnosticos(self, activar: bool = True) -> None:
+        """Habilitar los eventos de diagnóstico caros (sólo con sumideros)."""
+        self.diagnosticos = activar
+
+    def emitir(self, nombre: str, nivel: int = logging.DEBUG, **campos: Any) -> None:
+        """
+        EMITIR EVENTO
+        =============
+
+        Args:
+            nombre: Nombre del evento ('modulo.accion')
+            nivel: Nivel de logging del evento
+            **campos: Datos del evento
+
+        Nota:
+            Un sumidero que falla no interrumpe la operación instrumentada.
+        """
+        sumideros = self._sumideros
+        if not sumideros:
+            return
+        evento = {
+            "evento": nombre,
+            "nivel": nivel,
+            "marca": time.monotonic(),
+            "hilo": threading.get_ident(),
+            **campos,
+        }
+        for sumidero, minimo in sumideros:
+            if nivel >= minimo:
+                try:
+                    sumidero(evento)
+                except Exception:
+                    logging.getLogger(__name__).exception(f"Sumidero falló con '{nombre}'")
+
+
+def sumidero_logging(logger: logging.Logger) -> Sumidero:
+    """
+    SUMIDERO HACIA UN LOGGER
+    ========================
+
+    Reenvía cada evento como una línea de `logger` con su nivel. El
+    formateo es perezoso (%-args): si el logger no acepta el nivel, no
+    se formatea nada.
+
+    Ejemplo:
+        >>> instrumentacion.agregar_sumidero(sumidero_logging(logger), logging.INFO)
+    """
+    def sumidero(evento: Evento) -> None:
+        nivel = evento["nivel"]
+        if logger.isEnabledFor(nivel):
+            campos = {k: v for k, v in evento.items()
+                      if k not in ("evento", "nivel", "marca", "hilo")}
+            logger.log(nivel, "%s %s", evento["evento"], campos)
+    return sumidero
+
+
+# Instancia global usada por los servicios
+instrumentacion = Instrumentacion()
@@ -26,7 +26,10 @@ CARACTERÍSTICAS PRINCIPALES:
 ✓ Esquema de colores profesional
 ✓ Emojis para identificación visual
 ✓ Área de resultados con scroll
-✓ Formateo automático de matrices
+✓ Encriptación en segundo plano: la ventana no se congela, con barra de
+  progreso y botón para cancelar
+✓ Visores de matrices y de códigos Unicode virtualizados: sólo se
+  formatean las filas visibles
 ✓ Manejo robusto de errores
 
 FLUJO DE USUARIO (HAPPY PATH):
@@ -50,6 +53,9 @@ FLUJO DE USUARIO (HAPPY PATH):
 6. Puede [VER HISTORIAL] → Muestra todas las operaciones
 """
 
+import functools
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from core import (
@@ -57,9 +63,12 @@ from core import (
     ServicioEncriptacion,
     AutenticacionError,
     EncriptacionError,
+    OperacionCanceladaError,
     TAMAÑO_VENTANA,
+    INTERVALO_SONDEO_MS,
     logger
 )
+from visores import VisorMatriz, PanelUnicode, VentanaHistorial
 
 
 class InterfazEncriptador:
@@ -92,6 +101,7 @@ class InterfazEncriptador:
     - encriptar(): Encriptar texto ingresado
     - desencriptar(): Desencriptar cifrado actual
     - ver_historial(): Mostrar todas las operaciones
+    - cancelar(): Cancelar la operación en segundo plano
     - on_closing(): Cerrar aplicación correctamente
     
     Métodos privados (helpers):
@@ -100,7 +110,15 @@ class InterfazEncriptador:
     - _crear_seccion_entrada(): Crear área de entrada de texto
     - _crear_seccion_botones(): Crear botones de acción
     - _crear_seccion_resultados(): Crear área con scroll
-    - _formatear_matriz(): Convertir matriz a string visual
+    - _ejecutar_en_segundo_plano(): Correr un trabajo fuera del hilo de tkinter
+    
+    HILOS:
+    ======
+    Encriptar y desencriptar corren en un hilo de trabajo; el hilo de
+    tkinter sólo lee la entrada y muestra resultados. El trabajo deja su
+    resultado en una cola que se revisa con root.after() cada
+    INTERVALO_SONDEO_MS (tkinter no admite llamadas desde otros hilos).
+    Hay a lo sumo un trabajo a la vez.
     """
     
     # ==================== CONSTANTES DE ESTILO ====================
@@ -156,6 +174,12 @@ class InterfazEncriptador:
         self.auth = ServicioAutenticacion()  # Gestiona autenticación
         self.encryption = ServicioEncriptacion()  # Gestiona encriptación
         
+        # Trabajo en segundo plano: hilo, evento de cancelación y cola de resultados
+        self._trabajo = None
+        self._cancelacion = None
+        self._resultados = queue.Queue()
+        self._ventana_historial = None
+        
         # Crear ventana principal
         self.root = tk.Tk()
         self.root.title("🔐 Sistema de Encriptación Matricial")  # Título con emoji
@@ -272,7 +296,7 @@ class InterfazEncriptador:
         
         # Crear canvas con scroll
         canvas = tk.Canvas(self.main, bg=self.COLOR_FONDO, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.main, orient="vertical", command=canvas.scroll)
+        scrollbar = ttk.Scrollbar(self.main, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
         
         scrollable_frame.bind(
@@ -311,10 +335,22 @@ class InterfazEncriptador:
         botones = ttk.Frame(frame)
         botones.pack(fill="x", pady=10)
         
-        ttk.Button(botones, text="🔒 ENCRIPTAR", command=self.encriptar).pack(side="left", padx=5, expand=True)
-        ttk.Button(botones, text="🔓 DESENCRIPTAR", command=self.desencriptar).pack(side="left", padx=5, expand=True)
+        self.boton_encriptar = ttk.Button(botones, text="🔒 ENCRIPTAR", command=self.encriptar)
+        self.boton_encriptar.pack(side="left", padx=5, expand=True)
+        self.boton_desencriptar = ttk.Button(botones, text="🔓 DESENCRIPTAR", command=self.desencriptar)
+        self.boton_desencriptar.pack(side="left", padx=5, expand=True)
         ttk.Button(botones, text="📋 HISTORIAL", command=self.ver_historial).pack(side="left", padx=5, expand=True)
         ttk.Button(botones, text="🚪 SALIR", command=self.on_closing).pack(side="left", padx=5, expand=True)
+        
+        # Progreso del trabajo en segundo plano
+        progreso = ttk.Frame(frame)
+        progreso.pack(fill="x")
+        self.estado = ttk.Label(progreso, text="")
+        self.estado.pack(side="left")
+        self.boton_cancelar = ttk.Button(progreso, text="⛔ CANCELAR", command=self.cancelar, state="disabled")
+        self.boton_cancelar.pack(side="right", padx=5)
+        self.progreso = ttk.Progressbar(progreso, mode="indeterminate", length=250)
+        self.progreso.pack(side="right", padx=5)
     
     def _crear_seccion_resultados(self, parent):
         """Crear sección de resultados."""
@@ -323,15 +359,13 @@ class InterfazEncriptador:
         
         # Unicode
         ttk.Label(frame, text="1️⃣ Códigos Unicode del Texto:", style='Subtitulo.TLabel').pack(anchor="w", pady=(10, 5))
-        self.unicode = tk.Text(frame, height=2, width=90, font=("Courier", 9), bg="#f9fafb", relief="solid", bd=1)
+        self.unicode = PanelUnicode(frame)
         self.unicode.pack(fill="x", pady=5)
-        self.unicode.config(state="disabled")
         
         # Matriz Clave
         ttk.Label(frame, text="2️⃣ Matriz Clave (NxN Invertible):", style='Subtitulo.TLabel').pack(anchor="w", pady=(10, 5))
-        self.clave = tk.Text(frame, height=4, width=90, font=("Courier", 8), bg="#f9fafb", relief="solid", bd=1)
+        self.clave = VisorMatriz(frame)
         self.clave.pack(fill="x", pady=5)
-        self.clave.config(state="disabled")
         
         # Permutación
         ttk.Label(frame, text="3️⃣ Permutación de Columnas:", style='Subtitulo.TLabel').pack(anchor="w", pady=(10, 5))
@@ -341,9 +375,8 @@ class InterfazEncriptador:
         
         # Cifrado
         ttk.Label(frame, text="4️⃣ Matriz Encriptada:", style='Subtitulo.TLabel').pack(anchor="w", pady=(10, 5))
-        self.matriz = tk.Text(frame, height=4, width=90, font=("Courier", 8), bg="#f9fafb", relief="solid", bd=1)
+        self.matriz = VisorMatriz(frame)
         self.matriz.pack(fill="x", pady=5)
-        self.matriz.config(state="disabled")
         
         # Desencriptado
         ttk.Label(frame, text="5️⃣ Texto Desencriptado:", style='Subtitulo.TLabel').pack(anchor="w", pady=(10, 5))
@@ -351,135 +384,204 @@ class InterfazEncriptador:
         self.resultado.pack(fill="x", pady=5)
         self.resultado.config(state="disabled")
     
+    # ===================== TRABAJO EN SEGUNDO PLANO =====================
+    
+    def _ocupado(self):
+        """Avisar y retornar True si ya hay una operación en curso."""
+        if self._trabajo is None:
+            return False
+        messagebox.showwarning("⏳ Operación en curso",
+                               "Espere a que termine la operación actual o cancélela")
+        return True
+    
+    def _ejecutar_en_segundo_plano(self, accion, descripcion, funcion, al_terminar, cancelable=True):
+        """
+        EJECUTAR TRABAJO EN SEGUNDO PLANO
+        =================================
+        
+        Args:
+            accion: Verbo para los mensajes de error ("encriptar")
+            descripcion: Texto junto a la barra de progreso
+            funcion: Callable(cancelacion) ejecutado en el hilo de trabajo.
+                     No debe tocar widgets.
+            al_terminar: Callable(resultado) ejecutado en el hilo de tkinter
+            cancelable: Habilitar el botón Cancelar
+        
+        Returns:
+            bool: False si ya había una operación en curso (no se inicia otra)
+        """
+        if self._ocupado():
+            return False
+        
+        cancelacion = threading.Event()
+        
+        def trabajar():
+            try:
+                self._resultados.put((accion, al_terminar, funcion(cancelacion), None))
+            except Exception as e:
+                self._resultados.put((accion, al_terminar, None, e))
+        
+        self._cancelacion = cancelacion
+        self._trabajo = threading.Thread(target=trabajar, name="interfaz-trabajo", daemon=True)
+        self._mostrar_progreso(descripcion, cancelable)
+        self._trabajo.start()
+        self.root.after(INTERVALO_SONDEO_MS, self._sondear_trabajo)
+        return True
+    
+    def _sondear_trabajo(self):
+        """Revisar (en el hilo de tkinter) si el trabajo terminó y mostrar su resultado."""
+        try:
+            accion, al_terminar, resultado, error = self._resultados.get_nowait()
+        except queue.Empty:
+            self.root.after(INTERVALO_SONDEO_MS, self._sondear_trabajo)
+            return
+        
+        self._trabajo = None
+        self._cancelacion = None
+        self._ocultar_progreso()
+        
+        if isinstance(error, OperacionCanceladaError):
+            self.estado.config(text="⛔ Operación cancelada")
+            logger.info(f"Operación '{accion}' cancelada por el usuario")
+        elif error is not None:
+            messagebox.showerror("❌ Error", f"No se pudo {accion}: {str(error)}")
+            logger.error(f"Error al {accion}: {str(error)}")
+        else:
+            al_terminar(resultado)
+    
+    def _mostrar_progreso(self, descripcion, cancelable):
+        """Bloquear las acciones y animar la barra de progreso."""
+        self.boton_encriptar.config(state="disabled")
+        self.boton_desencriptar.config(state="disabled")
+        self.boton_cancelar.config(state="normal" if cancelable else "disabled")
+        self.estado.config(text=descripcion)
+        self.progreso.start(15)
+    
+    def _ocultar_progreso(self):
+        """Detener la barra de progreso y rehabilitar las acciones."""
+        self.progreso.stop()
+        self.estado.config(text="")
+        self.boton_cancelar.config(state="disabled")
+        self.boton_encriptar.config(state="normal")
+        self.boton_desencriptar.config(state="normal")
+    
+    def cancelar(self):
+        """Pedir la cancelación del trabajo en curso (se detiene en el próximo paso)."""
+        if self._cancelacion is not None:
+            self._cancelacion.set()
+            self.boton_cancelar.config(state="disabled")
+            self.estado.config(text="⛔ Cancelando...")
+    
+    @staticmethod
+    def _escribir(widget, contenido):
+        """Reemplazar el contenido de un tk.Text de solo lectura."""
+        widget.config(state="normal")
+        widget.delete("1.0", tk.END)
+        widget.insert(tk.END, contenido)
+        widget.config(state="disabled")
+    
     # ===================== FUNCIONES DE ENCRIPTACIÓN =====================
     
     def encriptar(self):
-        """Encriptar el texto ingresado."""
-        try:
-            texto = self.texto.get("1.0", tk.END).strip()
-            if not texto:
-                messagebox.showwarning("⚠️ Advertencia", "Ingrese un texto para encriptar")
-                return
-            
-            logger.info(f"Encriptando texto de {len(texto)} caracteres")
-            
-            from encriptador import Encriptador
-            resultado = self.encryption.encriptar(texto, Encriptador)
-            
-            # Mostrar Unicode
-            unicode_str = " | ".join([f"'{c}':{ord(c)}" for c in texto])
-            self.unicode.config(state="normal")
-            self.unicode.delete("1.0", tk.END)
-            self.unicode.insert(tk.END, unicode_str)
-            self.unicode.config(state="disabled")
-            
-            # Mostrar Clave
-            self.clave.config(state="normal")
-            self.clave.delete("1.0", tk.END)
-            clave_formateada = self._formatear_matriz(resultado['clave'])
-            self.clave.insert(tk.END, clave_formateada)
-            self.clave.config(state="disabled")
-            
-            # Mostrar Permutación
-            n = len(resultado['permutacion'])
-            perm_str = f"Original: {tuple(range(n))}\nPermutado: {resultado['permutacion']}"
-            self.perm.config(state="normal")
-            self.perm.delete("1.0", tk.END)
-            self.perm.insert(tk.END, perm_str)
-            self.perm.config(state="disabled")
-            
-            # Mostrar Cifrado
-            self.matriz.config(state="normal")
-            self.matriz.delete("1.0", tk.END)
-            cifrado_formateado = self._formatear_matriz(resultado['cifrado'])
-            self.matriz.insert(tk.END, cifrado_formateado)
-            self.matriz.config(state="disabled")
-            
-            # Limpiar resultado
-            self.resultado.config(state="normal")
-            self.resultado.delete("1.0", tk.END)
-            self.resultado.config(state="disabled")
-            
-            messagebox.showinfo("✅ Éxito", f"Texto encriptado correctamente\n({len(texto)} caracteres)")
-            logger.info("Encriptación exitosa")
+        """Encriptar el texto ingresado (en segundo plano)."""
+        if self._ocupado():
+            return
+        
+        texto = self.texto.get("1.0", tk.END).strip()
+        if not texto:
+            messagebox.showwarning("⚠️ Advertencia", "Ingrese un texto para encriptar")
+            return
         
-        except Exception as e:
-            messagebox.showerror("❌ Error", f"No se pudo encriptar: {str(e)}")
-            logger.error(f"Error en encriptación: {str(e)}")
+        logger.info(f"Encriptando texto de {len(texto)} caracteres")
+        self._ejecutar_en_segundo_plano(
+            "encriptar",
+            f"🔒 Encriptando {len(texto):,} caracteres...",
+            functools.partial(self._trabajo_encriptar, texto),
+            self._mostrar_encriptacion
+        )
     
-    def desencriptar(self):
-        """Desencriptar el texto encriptado."""
-        try:
-            if not self.encryption.tiene_encriptacion_activa():
-                messagebox.showerror("❌ Error", "Primero debe encriptar un texto")
-                return
-            
-            pwd = simpledialog.askstring(
-                "🔑 Contraseña Requerida",
-                "Ingrese la contraseña para desencriptar:",
-                show="●"
-            )
-            if pwd is None:
-                return
-            
-            logger.debug("Verificando contraseña para desencriptación")
-            
-            if self.auth.verificar_password(pwd):
-                texto = self.encryption.desencriptar()
-                
-                self.resultado.config(state="normal")
-                self.resultado.delete("1.0", tk.END)
-                self.resultado.insert(tk.END, texto)
-                self.resultado.config(state="disabled")
-                
-                messagebox.showinfo("✅ Éxito", f"Texto desencriptado correctamente\n({len(texto)} caracteres)")
-                logger.info("Desencriptación exitosa")
-            else:
-                messagebox.showerror("❌ Error", "Contraseña incorrecta")
-                logger.warning("Intento de desencriptación con contraseña incorrecta")
-        
-        except EncriptacionError as e:
-            messagebox.showerror("❌ Error", f"No se pudo desencriptar: {str(e)}")
-            logger.error(f"Error en desencriptación: {str(e)}")
+    def _trabajo_encriptar(self, texto, cancelacion):
+        """Encriptar y preparar lo que se muestra (hilo de trabajo, sin widgets)."""
+        from encriptador import Encriptador
+        resultado = self.encryption.encriptar(texto, Encriptador, cancelacion)
+        
+        n = len(resultado['permutacion'])
+        return {
+            "caracteres": len(texto),
+            "unicode": resultado['unicode'],
+            "clave": resultado['clave'],
+            "permutacion": f"Original: {tuple(range(n))}\nPermutado: {resultado['permutacion']}",
+            "cifrado": resultado['cifrado'],
+        }
     
-    def ver_historial(self):
-        """Mostrar historial de operaciones."""
-        historial = self.encryption.obtener_historial()
-        if not historial:
-            messagebox.showinfo("📋 Historial", "El historial está vacío")
+    def _mostrar_encriptacion(self, vista):
+        """Mostrar los resultados (hilo de tkinter; los visores sólo formatean lo visible)."""
+        self.unicode.mostrar(vista['unicode'])
+        self.clave.mostrar(vista['clave'])
+        self._escribir(self.perm, vista['permutacion'])
+        self.matriz.mostrar(vista['cifrado'])
+        self._escribir(self.resultado, "")
+        
+        messagebox.showinfo("✅ Éxito", f"Texto encriptado correctamente\n({vista['caracteres']} caracteres)")
+        logger.info("Encriptación exitosa")
+    
+    def desencriptar(self):
+        """Desencriptar el texto encriptado (en segundo plano)."""
+        if self._ocupado():
             return
         
-        texto = "═" * 70 + "\n"
-        texto += "HISTORIAL DE OPERACIONES DE ENCRIPTACIÓN\n"
-        texto += "═" * 70 + "\n\n"
+        if not self.encryption.tiene_encriptacion_activa():
+            messagebox.showerror("❌ Error", "Primero debe encriptar un texto")
+            return
         
-        for idx, item in enumerate(historial, 1):
-            texto += f"#{idx} - {item['texto']}\n"
-            texto += f"    Permutación: {item['permutacion']}\n"
-            texto += "─" * 70 + "\n"
+        pwd = simpledialog.askstring(
+            "🔑 Contraseña Requerida",
+            "Ingrese la contraseña para desencriptar:",
+            show="●"
+        )
+        if pwd is None:
+            return
         
-        messagebox.showinfo("📋 Historial", texto)
-        logger.info(f"Historial consultado: {len(historial)} registros")
-    
-    @staticmethod
-    def _formatear_matriz(matriz):
-        """Formatear matriz para visualización legible."""
-        import numpy as np
-        matriz = np.array(matriz)
-        filas, cols = matriz.shape
+        logger.debug("Verificando contraseña para desencriptación")
         
-        texto = ""
-        for i in range(filas):
-            texto += "[ "
-            for j in range(cols):
-                texto += f"{matriz[i][j]:8.2f} "
-            texto += "]\n"
+        if self.auth.verificar_password(pwd):
+            # El servicio revisa la cancelación entre bloques de filas
+            self._ejecutar_en_segundo_plano(
+                "desencriptar",
+                "🔓 Desencriptando...",
+                lambda cancelacion: self.encryption.desencriptar(cancelacion=cancelacion),
+                self._mostrar_desencriptacion
+            )
+        else:
+            messagebox.showerror("❌ Error", "Contraseña incorrecta")
+            logger.warning("Intento de desencriptación con contraseña incorrecta")
+    
+    def _mostrar_desencriptacion(self, texto):
+        """Mostrar el texto desencriptado (hilo de tkinter)."""
+        self._escribir(self.resultado, texto)
+        messagebox.showinfo("✅ Éxito", f"Texto desencriptado correctamente\n({len(texto)} caracteres)")
+        logger.info("Desencriptación exitosa")
+    
+    def ver_historial(self):
+        """Mostrar historial de operaciones (ventana paginada, una sola a la vez)."""
+        total = len(self.encryption.historial)
+        if not total:
+            messagebox.showinfo("📋 Historial", "El historial está vacío")
+            return
         
-        return texto
+        ventana = self._ventana_historial
+        if ventana is not None and ventana.winfo_exists():
+            ventana.ir_a(ventana.pagina)
+            ventana.lift()
+        else:
+            self._ventana_historial = VentanaHistorial(self.root, self.encryption)
+        logger.info(f"Historial consultado: {total} registros")
     
     def on_closing(self):
         """Manejar el cierre de la aplicación."""
         logger.info("Aplicación cerrada por el usuario")
+        if self._cancelacion is not None:
+            self._cancelacion.set()
         self.root.quit()
 
 
@@ -5,11 +5,13 @@
 ╚═══════════════════════════════════════════════════════════════════════╝
 
 Este módulo es el punto de entrada principal de la aplicación.
-Simplemente instancia la interfaz gráfica y la inicia.
+Sin argumentos instancia la interfaz gráfica y la inicia; con
+argumentos delega en la línea de comandos (cli.py), sin importar tkinter.
 
 EJECUCIÓN:
 ==========
-    python main.py
+    python main.py                                   # interfaz gráfica
+    python main.py encriptar texto.txt -o texto.encm # línea de comandos
 
 FLUJO:
 ======
@@ -23,8 +25,16 @@ ESTRUCTURA DEL PROYECTO:
 ├── main.py ..................... Este archivo (punto de entrada)
 ├── encriptador.py .............. Lógica de encriptación (matrices)
 ├── interfaz.py ................. Interfaz gráfica (tkinter)
+├── visores.py .................. Visores virtualizados de la interfaz
+├── cli.py ...................... Línea de comandos en streaming (sin tkinter)
 ├── core.py ..................... Servicios y configuración central
+├── contenedor.py ............... Formato binario para guardar cifrados
+├── historial.py ................ Historial acotado (memoria + SQLite)
+├── boveda.py ................... Bóveda de cifrados por id (LRU + disco)
+├── instrumentacion.py .......... Eventos estructurados (costo cero si apagada)
+├── metricas.py ................. Histogramas de latencia por etapa
 ├── tests.py .................... Suite de pruebas unitarias
+├── benchmarks.py ............... Benchmarks de throughput y memoria
 └── README.md ................... Documentación
 
 DEPENDENCIAS:
@@ -35,10 +45,11 @@ DEPENDENCIAS:
 - interfaz: Interfaz de usuario
 """
 
-from interfaz import InterfazEncriptador
+import sys
+from typing import Optional, Sequence
 
 
-def main() -> None:
+def main(argv: Optional[Sequence[str]] = None) -> Optional[int]:
     """
     FUNCIÓN PRINCIPAL - PUNTO DE ENTRADA
     ====================================
@@ -46,20 +57,31 @@ def main() -> None:
     Crea instancia de la aplicación y la inicia.
     
     Esta función:
-    1. Instancia InterfazEncriptador
-    2. Inicia el loop de eventos de tkinter
+    1. Con argumentos: delega en cli.main (tkinter no se importa)
+    2. Sin argumentos: instancia InterfazEncriptador
+    3. Inicia el loop de eventos de tkinter
+    
+    Args:
+        argv: Argumentos de línea de comandos (None = sys.argv[1:])
     
     Returns:
-        None (Se queda ejecutando hasta que el usuario cierre la ventana)
+        Código de salida de la línea de comandos, o None con la interfaz
+        (se queda ejecutando hasta que el usuario cierre la ventana)
     
     Note:
         La interfaz gráfica maneja toda la lógica de usuario.
         No hay procesamiento en este nivel.
     """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from cli import main as main_cli
+        return main_cli(argv)
+    
+    from interfaz import InterfazEncriptador
     app = InterfazEncriptador()
     # El mainloop() está incluido en InterfazEncriptador.__init__()
 
 
 if __name__ == "__main__":
     """Ejecutar aplicación sólo si este archivo es el script principal."""
-    main()
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Métricas por Etapa
+
+Temporizadores para las etapas del cifrado (generar clave, texto → matriz,
+multiplicación, matriz → texto...) que alimentan histogramas en proceso:
+
+    >>> metricas.instantanea()["texto_a_matriz"]
+    {'conteo': 120, 'p50_ms': 0.41, 'p95_ms': 0.9, 'p99_ms': 1.3,
+     'max_ms': 1.4, 'total_s': 0.06, 'bytes': 3840000, 'mb_por_s': 64.0}
+
+HISTOGRAMA LOG-LINEAL:
+======================
+Cada duración (ns) cae en un bucket de 8 subdivisiones por potencia de 2
+(error relativo <= 12.5%), calculado con bit_length(): registrar es O(1),
+sin guardar las muestras y con memoria fija por etapa.
+
+Registrar una medición cuesta ~1 µs, así que las métricas vienen activadas
+y pueden quedarse así en producción. Con metricas.activas = False los
+decoradores sólo comprueban ese atributo.
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Subdivisiones por potencia de 2 (8 = 3 bits de mantisa)
+_BITS_SUB = 3
+_SUB = 1 << _BITS_SUB
+_BUCKETS = _SUB * 64
+
+
+def _bucket(valor: int) -> int:
+    """Índice del bucket log-lineal de `valor` (entero >= 0)."""
+    if valor < 2 * _SUB:
+        return valor
+    desplazamiento = valor.bit_length() - _BITS_SUB - 1
+    return _SUB * desplazamiento + (valor >> desplazamiento)
+
+
+def _limites_bucket(indice: int) -> tuple:
+    """Rango [inferior, superior) de valores del bucket `indice`."""
+    if indice < 2 * _SUB:
+        return indice, indice + 1
+    desplazamiento = indice // _SUB - 1
+    inferior = (indice - _SUB * desplazamiento) << desplazamiento
+    return inferior, inferior + (1 << desplazamiento)
+
+
+class HistogramaLatencia:
+    """Histograma de duraciones (ns) con conteo, total, máximo y bytes."""
+
+    __slots__ = ("conteos", "conteo", "total_ns", "maximo_ns", "bytes")
+
+    def __init__(self) -> None:
+        self.conteos: List[int] = [0] * _BUCKETS
+        self.conteo = 0
+        self.total_ns = 0
+        self.maximo_ns = 0
+        self.bytes = 0
+
+    def registrar(self, duracion_ns: int, nbytes: int = 0) -> None:
+        """Agregar una medición."""
+        self.conteos[_bucket(duracion_ns)] += 1
+        self.conteo += 1
+        self.total_ns += duracion_ns
+        self.bytes += nbytes
+        if duracion_ns > self.maximo_ns:
+            self.maximo_ns = duracion_ns
+
+    def percentil(self, p: float) -> float:
+        """
+        Duración (ns) del percentil p (0-100): punto medio del bucket que
+        lo contiene, acotado por el máximo observado.
+        """
+        if not self.conteo:
+            return 0.0
+        objetivo = max(1, -(-self.conteo * p // 100))
+        acumulado = 0
+        for indice, cantidad in enumerate(self.conteos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                inferior, superior = _limites_bucket(indice)
+                return min((inferior + superior) / 2, self.maximo_ns)
+        return float(self.maximo_ns)
+
+    def resumen(self) -> Dict[str, float]:
+        """Resumen en milisegundos (ver RegistroMetricas.instantanea)."""
+        total_s = self.total_ns / 1e9
+        return {
+            "conteo": self.conteo,
+            "p50_ms": self.percentil(50) / 1e6,
+            "p95_ms": self.percentil(95) / 1e6,
+            "p99_ms": self.percentil(99) / 1e6,
+            "max_ms": self.maximo_ns / 1e6,
+            "total_s": total_s,
+            "bytes": self.bytes,
+            "mb_por_s": self.bytes / total_s / 1e6 if total_s else 0.0,
+        }
+
+
+class RegistroMetricas:
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║       HISTOGRAMAS DE LATENCIA POR ETAPA               ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Es seguro entre hilos (lock interno, tomado sólo al registrar).
+
+    EJEMPLO DE USO:
+    ===============
+    >>> with metricas.medir("mi_etapa", nbytes=1024):
+    ...     trabajo()
+    >>> metricas.instantanea()["mi_etapa"]["conteo"]
+    1
+    >>> metricas.reiniciar()
+    """
+
+    def __init__(self, activas: bool = True) -> None:
+        self.activas = activas
+        self._histogramas: Dict[str, HistogramaLatencia] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, etapa: str, duracion_ns: int, nbytes: int = 0) -> None:
+        """Agregar una medición de `etapa`."""
+        with self._lock:
+            histograma = self._histogramas.get(etapa)
+            if histograma is None:
+                histograma = self._histogramas[etapa] = HistogramaLatencia()
+            histograma.registrar(duracion_ns, nbytes)
+
+    def medir(self, etapa: str, nbytes: int = 0) -> "_Medicion":
+        """Context manager que mide el bloque como una ejecución de `etapa`."""
+        return _Medicion(self, etapa, nbytes)
+
+    def instantanea(self) -> Dict[str, Dict[str, float]]:
+        """
+        INSTANTÁNEA DE MÉTRICAS
+        =======================
+
+        Returns:
+            Dict etapa → {'conteo', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+            'total_s', 'bytes', 'mb_por_s'}
+        """
+        with self._lock:
+            return {etapa: h.resumen() for etapa, h in self._histogramas.items()}
+
+    def reiniciar(self) -> None:
+        """Borrar todas las mediciones."""
+        with self._lock:
+            self._histogramas.clear()
+
+
+class _Medicion:
+    """Context manager de RegistroMetricas.medir()."""
+
+    __slots__ = ("registro", "etapa", "nbytes", "inicio")
+
+    def __init__(self, registro: RegistroMetricas, etapa: str, nbytes: int) -> None:
+        self.registro = registro
+        self.etapa = etapa
+        self.nbytes = nbytes
+        self.inicio = 0
+
+    def __enter__(self) -> "_Medicion":
+        if self.registro.activas:
+            self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.inicio:
+            self.registro.registrar(
+                self.etapa, time.perf_counter_ns() - self.inicio, self.nbytes
+            )
+
+
+def medir_etapa(
+    etapa: str,
+    bytes_de: Optional[Callable[[tuple, Any], int]] = None
+) -> Callable:
+    """
+    DECORADOR DE ETAPA
+    ==================
+
+    Mide cada llamada de la función decorada en el registro global.
+
+    Args:
+        etapa: Nombre del histograma
+        bytes_de: Función (args, resultado) → bytes procesados (opcional)
+
+    Ejemplo:
+        >>> @medir_etapa("texto_a_matriz", lambda args, r: r.nbytes)
+        ... def texto_a_matriz(self, texto): ...
+    """
+    def decorador(funcion: Callable) -> Callable:
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not metricas.activas:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter_ns()
+            resultado = funcion(*args, **kwargs)
+            duracion = time.perf_counter_ns() - inicio
+            metricas.registrar(
+                etapa, duracion, bytes_de(args, resultado) if bytes_de else 0
+            )
+            return resultado
+        return envoltura
+    return decorador
+
+
+# Registro global usado por Encriptador y ServicioEncriptacion
+metricas = RegistroMetricas()
@@ -2,19 +2,55 @@
 Pruebas unitarias del sistema de encriptación.
 """
 
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from collections import deque
+from unittest import mock
 import numpy as np
 from encriptador import (
     Encriptador,
+    EncriptadorEntero,
     MatrizInvalidaError,
     ClaveInvalidaError,
-    PermutacionInvalidaError
+    PermutacionInvalidaError,
+    PoolTrabajadores,
+    numero_condicion
 )
+from contenedor import (
+    ContenedorInvalidoError,
+    MOTOR_ENTERO,
+    MOTOR_FLOAT32,
+    MOTOR_FLOAT64,
+    cargar_contenedor,
+    leer_contenedor
+)
+from historial import HistorialEncriptaciones
+from boveda import BovedaCifrados
+from instrumentacion import instrumentacion
+from metricas import HistogramaLatencia, metricas
+import benchmarks
+import cli
+from visores import formatear_filas, formatear_codigos, resumir_codigos, resumir_entrada
 from core import (
     ServicioAutenticacion,
     ServicioEncriptacion,
     AutenticacionError,
-    EncriptacionError
+    EncriptacionError,
+    OperacionCanceladaError,
+    ServicioEncriptacionAsync,
+    PoolClaves,
+    CLAVE_DENSIDAD,
+    COTA_CONDICION_MIN,
+    construir_clave_invertible,
+    construir_claves_invertibles,
+    construir_claves_acotadas
 )
 
 
@@ -42,6 +78,57 @@ class TestEncriptador(unittest.TestCase):
         cifrado = self.enc.encriptar(texto)
         descifrado = self.enc.desencriptar(cifrado)
         self.assertEqual(texto, descifrado)
+    
+    def test_vectorized_text_to_matrix(self):
+        """La conversión vectorizada coincide con la de referencia."""
+        for texto in ("a", "Hola", "¡Hola! 😀\ud800", "x" * 1000 + "\U0010FFFF"):
+            for enc in (self.enc, EncriptadorEntero(), Encriptador([[1, 2], [3, 5]])):
+                rapida = enc.texto_a_matriz(texto)
+                referencia = enc._texto_a_matriz_referencia(texto)
+                self.assertEqual(rapida.dtype, referencia.dtype)
+                self.assertTrue(np.array_equal(rapida, referencia))
+    
+    def test_vectorized_matrix_to_text(self):
+        """La decodificación vectorizada coincide con la de referencia."""
+        for texto in ("Hola", "¡Hola! 😀\ud800", "abc\x00\x00"):
+            matriz = self.enc.texto_a_matriz(texto) + 1e-9
+            for longitud in (None, len(texto)):
+                self.assertEqual(
+                    self.enc.matriz_a_texto(matriz, longitud),
+                    self.enc._matriz_a_texto_referencia(matriz, longitud)
+                )
+        self.assertEqual(self.enc.matriz_a_texto(np.zeros((2, 3))), "")
+    
+    def test_invalid_code_points(self):
+        """Rechazar códigos fuera del rango Unicode."""
+        for valor in (-1, 0x110000):
+            with self.assertRaises(ValueError):
+                self.enc.matriz_a_texto(np.array([[72, valor, 0]]))
+        for valor in (np.nan, np.inf):
+            with self.assertRaisesRegex(ValueError, "fuera del rango Unicode"):
+                self.enc.matriz_a_texto(np.array([[72.0, valor, 0.0]]))
+    
+    def test_fused_permutation(self):
+        """La clave fusionada produce el mismo cifrado que permutar después."""
+        clave, clave_inv = construir_clave_invertible(8)
+        permutacion = (3, 0, 7, 1, 6, 2, 5, 4)
+        texto = "Permutación fusionada 😀" * 20
+        for enc in (Encriptador(clave, permutacion, clave_inv=clave_inv),
+                    EncriptadorEntero(clave, permutacion)):
+            matriz = enc.texto_a_matriz(texto)
+            esperado = np.dot(matriz, enc.clave)[:, permutacion]
+            cifrado = enc.encriptar(texto)
+            self.assertTrue(np.array_equal(cifrado, esperado))
+            self.assertEqual(enc.desencriptar(cifrado), texto)
+    
+    def test_output_buffer(self):
+        """Escribir el cifrado en un buffer preasignado."""
+        salida = np.empty((2, 3))
+        cifrado = self.enc.encriptar("Hola", salida=salida)
+        self.assertIs(cifrado, salida)
+        self.assertEqual(self.enc.desencriptar(salida), "Hola")
+        with self.assertRaises(ValueError):
+            self.enc.encriptar("Hola", salida=np.empty((3, 3)))
 
 
 class TestAutenticacion(unittest.TestCase):
@@ -113,5 +200,1014 @@ class TestServicioEncriptacion(unittest.TestCase):
         self.assertEqual(historial[0]['texto'], "Texto1")
 
 
+class TestModoBloques(unittest.TestCase):
+    """Pruebas del modo por bloques (clave de tamaño fijo)."""
+    
+    def test_fixed_key_size(self):
+        """La clave no crece con el texto."""
+        service = ServicioEncriptacion(tamaño_bloque=4)
+        texto = "Texto largo en modo por bloques. " * 50
+        resultado = service.encriptar(texto, Encriptador)
+        self.assertEqual(resultado['clave'].shape, (4, 4))
+        self.assertEqual(resultado['cifrado'].shape, (-(-len(texto) // 4), 4))
+        self.assertEqual(service.desencriptar(), texto)
+    
+    def test_trailing_nul_preserved(self):
+        """Con la longitud se conserva un '\x00' final real."""
+        texto = "Hola\x00"
+        cifrado = Encriptador().encriptar(texto)
+        self.assertEqual(Encriptador().desencriptar(cifrado, longitud=len(texto)), texto)
+    
+    def test_invalid_block_size(self):
+        """Rechazar tamaños de bloque inválidos."""
+        with self.assertRaises(ValueError):
+            ServicioEncriptacion(tamaño_bloque=1)
+
+
+class TestLotes(unittest.TestCase):
+    """Pruebas de encriptación por lotes con una sola clave."""
+    
+    def setUp(self):
+        self.enc = Encriptador([[2, 1], [1, 1]], (1, 0))
+        self.textos = ["Hola", "Mundo", "¡Hola! 😀", "a"]
+    
+    def test_batch_matches_single(self):
+        """Cada cifrado del lote coincide con el individual."""
+        cifrados, desplazamientos = self.enc.encriptar_lote(self.textos)
+        self.assertEqual(desplazamientos.tolist(), [0, 2, 5, 9, 10])
+        for cifrado, texto in zip(cifrados, self.textos):
+            self.assertTrue(np.array_equal(cifrado, self.enc.encriptar(texto)))
+    
+    def test_batch_views_and_roundtrip(self):
+        """Los cifrados son vistas y el lote se recupera completo."""
+        cifrados, _ = self.enc.encriptar_lote(self.textos)
+        self.assertIsNotNone(cifrados[0].base)
+        self.assertTrue(all(c.base is cifrados[0].base for c in cifrados))
+        self.assertEqual(self.enc.desencriptar_lote(cifrados), self.textos)
+        copias = [c.copy() for c in reversed(cifrados)]
+        self.assertEqual(self.enc.desencriptar_lote(copias), self.textos[::-1])
+    
+    def test_batch_lengths(self):
+        """Con longitudes se conservan los '\x00' finales."""
+        textos = ["ab\x00", "c"]
+        cifrados, _ = self.enc.encriptar_lote(textos)
+        self.assertEqual(self.enc.desencriptar_lote(cifrados, [3, 1]), textos)
+
+
+class TestParalelo(unittest.TestCase):
+    """Pruebas del modo paralelo por bloques de filas."""
+    
+    def setUp(self):
+        self.enc = Encriptador([[2, 1, 0], [1, 1, 0], [0, 0, 1]], (2, 0, 1))
+        self.texto = "Registro de log número 42 ✓ 😀\n" * 200
+    
+    def test_threads_match_serial(self):
+        """Hilos: mismo cifrado y mismo orden que encriptar()."""
+        cifrado = self.enc.encriptar_paralelo(self.texto, trabajadores=3, filas_por_bloque=17)
+        self.assertTrue(np.array_equal(cifrado, self.enc.encriptar(self.texto)))
+        texto = self.enc.desencriptar_paralelo(cifrado, trabajadores=3, filas_por_bloque=17)
+        self.assertEqual(texto, self.texto)
+    
+    def test_processes_match_serial(self):
+        """Procesos: mismo cifrado que encriptar()."""
+        cifrado = self.enc.encriptar_paralelo(
+            self.texto, trabajadores=2, filas_por_bloque=500, procesos=True
+        )
+        self.assertTrue(np.array_equal(cifrado, self.enc.encriptar(self.texto)))
+    
+    def test_blas_limit_threads(self):
+        """Hilos: BLAS limitado mientras dura el pool, o una advertencia."""
+        limites = mock.MagicMock()
+        with mock.patch("encriptador.threadpool_limits", limites):
+            self.enc.encriptar_paralelo(self.texto, trabajadores=2, filas_por_bloque=17)
+        limites.assert_called_once_with(limits=max(1, (os.cpu_count() or 1) // 2),
+                                        user_api="blas")
+        limites.return_value.restore_original_limits.assert_called_once()
+        
+        with mock.patch("encriptador.threadpool_limits", None), \
+                mock.patch("encriptador._aviso_blas_emitido", False), \
+                self.assertLogs("encriptador", "WARNING"):
+            self.enc.encriptar_paralelo(self.texto, trabajadores=2, filas_por_bloque=17)
+    
+    def test_blas_limit_processes(self):
+        """Procesos: los hijos nacen con el límite; el entorno del padre no cambia."""
+        antes = os.environ.get("OPENBLAS_NUM_THREADS")
+        with PoolTrabajadores(self.enc, trabajadores=2, procesos=True) as pool:
+            valores = pool._pool.map(os.getenv, ["OPENBLAS_NUM_THREADS"] * 2)
+            cifrado = self.enc.procesar_en_paralelo(
+                self.enc.texto_a_matriz(self.texto), cifrar=True, filas_por_bloque=500, pool=pool
+            )
+        self.assertEqual(valores, [str(pool.hilos_blas)] * 2)
+        self.assertEqual(os.environ.get("OPENBLAS_NUM_THREADS"), antes)
+        self.assertTrue(np.array_equal(cifrado, self.enc.encriptar(self.texto)))
+    
+    def test_invalid_workers(self):
+        """trabajadores=0 es un error, no "automático"."""
+        for trabajadores in (0, -2):
+            with self.assertRaises(ValueError):
+                self.enc.encriptar_paralelo(self.texto, trabajadores=trabajadores)
+
+
+class TestArchivos(unittest.TestCase):
+    """Pruebas de encriptación de archivos mapeados en memoria."""
+    
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = lambda nombre: os.path.join(directorio.name, nombre)
+        self.enc = Encriptador()
+        self.texto = "línea 😀 con\r\n acentos é " * 300 + "fin"
+        with open(self.ruta("entrada.txt"), "w", encoding="utf-8", newline="") as f:
+            f.write(self.texto)
+    
+    def leer(self, nombre):
+        with open(self.ruta(nombre), encoding="utf-8", newline="") as f:
+            return f.read()
+    
+    def test_file_roundtrip(self):
+        """Bloques pequeños que cortan caracteres multibyte."""
+        info = self.enc.encriptar_archivo(
+            self.ruta("entrada.txt"), self.ruta("cifrado.npy"), filas_por_bloque=7
+        )
+        self.assertEqual(info['caracteres'], len(self.texto))
+        cifrado = np.load(self.ruta("cifrado.npy"))
+        self.assertTrue(np.array_equal(cifrado, self.enc.encriptar(self.texto)))
+        
+        escritos = self.enc.desencriptar_archivo(
+            self.ruta("cifrado.npy"), self.ruta("salida.txt"), filas_por_bloque=5
+        )
+        self.assertEqual(escritos, len(self.texto))
+        self.assertEqual(self.leer("salida.txt"), self.texto)
+    
+    def test_empty_file(self):
+        """Rechazar archivos vacíos."""
+        open(self.ruta("vacio.txt"), "w").close()
+        with self.assertRaises(ValueError):
+            self.enc.encriptar_archivo(self.ruta("vacio.txt"), self.ruta("c.npy"))
+    
+    def test_invalid_utf8_leaves_no_output(self):
+        """Un error a mitad del archivo no deja un .npy parcial."""
+        with open(self.ruta("malo.txt"), "wb") as f:
+            f.write("válido ".encode("utf-8") * 100 + b"\xff\xfe")
+        with self.assertRaises(ValueError):
+            self.enc.encriptar_archivo(self.ruta("malo.txt"), self.ruta("c.npy"), filas_por_bloque=4)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.ruta("c.npy")))),
+                         ["entrada.txt", "malo.txt"])
+    
+    def test_decrypt_stops_at_length(self):
+        """Con longitud no se descifran las filas posteriores."""
+        self.enc.encriptar_archivo(self.ruta("entrada.txt"), self.ruta("cifrado.npy"))
+        bloques = []
+        original = self.enc._descifrar_matriz
+        
+        def contar(matriz):
+            bloques.append(len(matriz))
+            return original(matriz)
+        
+        with mock.patch.object(self.enc, "_descifrar_matriz", side_effect=contar):
+            escritos = self.enc.desencriptar_archivo(
+                self.ruta("cifrado.npy"), self.ruta("salida.txt"), longitud=10, filas_por_bloque=2
+            )
+        self.assertEqual(escritos, 10)
+        self.assertEqual(self.leer("salida.txt"), self.texto[:10])
+        self.assertEqual(sum(bloques), -(-10 // self.enc.n))
+
+
+class TestContenedor(unittest.TestCase):
+    """Pruebas del contenedor binario."""
+    
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "cifrado.encm")
+    
+    def test_save_and_reload(self):
+        """Guardar, recargar como vistas y desencriptar."""
+        service = ServicioEncriptacion()
+        texto = "Persistente 😀\x00"
+        service.encriptar(texto, Encriptador)
+        service.guardar(self.ruta)
+        
+        datos = cargar_contenedor(self.ruta)
+        self.assertFalse(datos['cifrado'].flags.writeable)
+        self.assertEqual(datos['clave'].dtype, np.int8)
+        self.assertTrue(np.issubdtype(datos['cifrado'].dtype, np.integer))
+        
+        otro = ServicioEncriptacion()
+        otro.cargar(self.ruta, Encriptador)
+        self.assertEqual(otro.desencriptar(), texto)
+    
+    def test_invalid_container(self):
+        """Rechazar buffers que no son contenedores."""
+        with self.assertRaises(ContenedorInvalidoError):
+            leer_contenedor(b"XXXX" + bytes(60))
+    
+    def test_corrupted_header_fields(self):
+        """Campos de cabecera incoherentes dan ContenedorInvalidoError, no errores crudos."""
+        import struct
+        from contenedor import _CABECERA, escribir_contenedor
+        
+        buffer = io.BytesIO()
+        enc = Encriptador([[2, 1, 0], [1, 1, 0], [0, 0, 1]], (2, 0, 1))
+        escribir_contenedor(buffer, enc.clave, enc.permutacion, enc.encriptar("Hola"), 4)
+        original = buffer.getvalue()
+        self.assertEqual(leer_contenedor(original)['longitud'], 4)
+        
+        # Índices de _CABECERA: 2 tipo_clave, 5 n, 7 filas, 9-11 desplazamientos
+        for indice, valor in ((2, 9), (5, 0), (5, 40), (7, 10 ** 6), (9, 0),
+                              (10, 64), (10, 3), (11, 2 ** 40)):
+            campos = list(_CABECERA.unpack_from(original))
+            campos[indice] = valor
+            with self.subTest(campo=indice, valor=valor), \
+                    self.assertRaises(ContenedorInvalidoError):
+                leer_contenedor(_CABECERA.pack(*campos) + original[_CABECERA.size:])
+        
+        # Versión 1: sin inversa ni codigo_max (ceros al final de la cabecera)
+        campos = list(_CABECERA.unpack_from(original))
+        campos[1], campos[13] = 1, 0
+        datos = leer_contenedor(_CABECERA.pack(*campos) + original[_CABECERA.size:])
+        self.assertIsNone(datos['clave_inv'])
+        self.assertEqual(datos['codigo_max'], 0x10FFFF)
+        
+        # Permutación con índices repetidos
+        campos = _CABECERA.unpack_from(original)
+        corrupto = bytearray(original)
+        struct.pack_into("<3i", corrupto, campos[10], 0, 0, 1)
+        with self.assertRaisesRegex(ContenedorInvalidoError, "permutación"):
+            leer_contenedor(bytes(corrupto))
+
+
+class TestHistorial(unittest.TestCase):
+    """Pruebas del historial acotado."""
+    
+    def test_ring_buffer(self):
+        """Retener sólo las últimas `maximo` entradas."""
+        historial = HistorialEncriptaciones(maximo=3)
+        for i in range(10):
+            historial.agregar(f"t{i}", (0,))
+        self.assertEqual(len(historial), 3)
+        self.assertEqual([h['texto'] for h in historial.obtener()], ["t7", "t8", "t9"])
+        self.assertEqual(historial.estadisticas()['descartadas'], 7)
+        self.assertRegex(historial.obtener()[0]['timestamp'],
+                         r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}$")
+    
+    def test_sqlite_spill_and_pages(self):
+        """Desbordar a SQLite y paginar sobre disco y memoria."""
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ruta = os.path.join(directorio.name, "historial.db")
+        
+        historial = HistorialEncriptaciones(maximo=4, ruta_sqlite=ruta, lote_volcado=2)
+        historial.agregar_lote((f"t{i}", (1, 0)) for i in range(11))
+        self.assertEqual(len(historial), 11)
+        
+        pagina = historial.obtener(offset=5, limit=4)
+        self.assertEqual([h['texto'] for h in pagina], ["t5", "t6", "t7", "t8"])
+        self.assertEqual(pagina[0]['permutacion'], (1, 0))
+        self.assertEqual([h['id'] for h in historial.obtener(9)], [10, 11])
+        
+        # Truncado para listados: igual desde disco y desde memoria
+        historial.agregar("largo " * 50, (1, 0))
+        pagina = historial.obtener(offset=0, limit=1, truncar=2) + historial.obtener(11, truncar=5)
+        self.assertEqual([h['texto'] for h in pagina], ["t0", "largo"])
+        self.assertEqual([h['longitud'] for h in pagina], [2, 300])
+        historial.cerrar()
+        
+        # Las entradas volcadas sobreviven a un nuevo proceso
+        reabierto = HistorialEncriptaciones(maximo=4, ruta_sqlite=ruta)
+        self.assertEqual(len(reabierto), 12)
+        self.assertEqual(reabierto.agregar("nuevo", (0,)), 13)
+        reabierto.cerrar()
+    
+    def test_service_pagination(self):
+        """El servicio pagina el historial y lo acota."""
+        service = ServicioEncriptacion(historial_max=5)
+        for i in range(8):
+            service.encriptar(f"Texto {i}", Encriptador)
+        self.assertEqual(len(service.historial), 5)
+        self.assertEqual([h['texto'] for h in service.obtener_historial(1, 2)],
+                         ["Texto 4", "Texto 5"])
+
+
+class TestBoveda(unittest.TestCase):
+    """Pruebas de la bóveda de cifrados."""
+    
+    def test_decrypt_any_past_encryption(self):
+        """Desencriptar por id, también entradas expulsadas a disco."""
+        service = ServicioEncriptacion(boveda_memoria=4096)
+        self.addCleanup(service.cerrar)
+        textos = [f"Documento {i} " * 40 for i in range(12)]
+        ids = [service.encriptar(t, Encriptador)['id'] for t in textos]
+        ids += [r['id'] for r in service.encriptar_lote(["Lote α", "Lote 😀"], EncriptadorEntero)]
+        textos += ["Lote α", "Lote 😀"]
+        
+        self.assertGreater(service.boveda.estadisticas()['expulsiones'], 0)
+        for id_, texto in reversed(list(zip(ids, textos))):
+            self.assertEqual(service.desencriptar(id_), texto)
+        self.assertGreater(service.boveda.estadisticas()['recargas'], 0)
+        self.assertEqual(service.desencriptar(), "Lote 😀")
+        with self.assertRaises(EncriptacionError):
+            service.desencriptar(999)
+    
+    def test_persistent_directory(self):
+        """Con directorio y espacio, las entradas sobreviven a la bóveda."""
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        enc = EncriptadorEntero()
+        boveda = BovedaCifrados(directorio=directorio.name, espacio="sesion")
+        boveda.guardar(7, enc, enc.encriptar("Hola"), 4)
+        boveda.cerrar()
+        
+        boveda = BovedaCifrados(directorio=directorio.name, espacio="sesion")
+        enc2, cifrado, longitud = boveda.obtener(7)
+        self.assertIsInstance(enc2, EncriptadorEntero)
+        self.assertEqual(enc2.desencriptar(cifrado, longitud), "Hola")
+        
+        # Sin espacio, una bóveda nueva no ve los contenedores de otra
+        otra = BovedaCifrados(memoria_max=0, directorio=directorio.name)
+        self.assertNotIn(7, otra)
+        otra.guardar(1, enc, enc.encriptar("Otra"), 4)
+        otra.cerrar()
+        self.assertEqual(os.listdir(directorio.name), ["sesion"])
+    
+    def test_reused_directory_without_history(self):
+        """Sin historial persistente, un id nuevo nunca sirve un cifrado viejo."""
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        service = ServicioEncriptacion(boveda_memoria=0, boveda_directorio=directorio.name)
+        service.encriptar("Uno", Encriptador)
+        service.encriptar("Dos", Encriptador)
+        service.cerrar()
+        
+        service = ServicioEncriptacion(boveda_memoria=0, boveda_directorio=directorio.name)
+        self.addCleanup(service.cerrar)
+        resultado = service.encriptar("Nueva", Encriptador)
+        self.assertEqual(service.desencriptar(resultado['id']), "Nueva")
+        with self.assertRaises(EncriptacionError):
+            service.desencriptar(resultado['id'] + 1)
+        
+        # Con historial SQLite los ids continúan y los contenedores persisten
+        sqlite = os.path.join(directorio.name, "historial.db")
+        service = ServicioEncriptacion(historial_sqlite=sqlite, boveda_directorio=directorio.name)
+        id_ = service.encriptar("Persistente", Encriptador)['id']
+        service.cerrar()
+        service = ServicioEncriptacion(historial_sqlite=sqlite, boveda_directorio=directorio.name)
+        self.addCleanup(service.cerrar)
+        self.assertEqual(service.desencriptar(id_), "Persistente")
+    
+    def test_disk_io_outside_lock(self):
+        """Escribir y recargar contenedores no bloquea la bóveda."""
+        import contenedor
+        boveda = BovedaCifrados(memoria_max=0)
+        self.addCleanup(boveda.cerrar)
+        enc = Encriptador()
+        
+        def sin_lock(funcion):
+            def envoltura(*args, **kwargs):
+                self.assertFalse(boveda._lock.locked())
+                return funcion(*args, **kwargs)
+            return envoltura
+        
+        with mock.patch("contenedor.guardar_contenedor", sin_lock(contenedor.guardar_contenedor)), \
+                mock.patch("contenedor.cargar_contenedor", sin_lock(contenedor.cargar_contenedor)):
+            boveda.guardar(1, enc, enc.encriptar("Hola"), 4)
+            enc2, cifrado, longitud = boveda.obtener(1)
+        self.assertEqual(enc2.desencriptar(cifrado, longitud), "Hola")
+        self.assertEqual(boveda._escribiendo, {})
+    
+    def test_shared_base_counted_once(self):
+        """Las vistas de una misma matriz cuentan su base una sola vez."""
+        enc = Encriptador()
+        base = np.zeros((1000, 3))
+        boveda = BovedaCifrados(memoria_max=base.nbytes + 4 * 1024)
+        self.addCleanup(boveda.cerrar)
+        boveda.guardar(1, enc, base[:1], 3)
+        boveda.guardar(2, enc, base[1:2], 3)
+        matrices = BovedaCifrados._bytes_encriptador(enc)
+        self.assertEqual(boveda.estadisticas()['bytes_memoria'], base.nbytes + 2 * matrices)
+        
+        # Otra base que no cabe junto a la primera: se expulsan sus vistas
+        boveda.guardar(3, enc, np.zeros((1000, 3)), 3)
+        self.assertEqual(boveda.estadisticas()['entradas_memoria'], 1)
+        self.assertEqual(boveda.estadisticas()['bytes_memoria'], base.nbytes + matrices)
+    
+    def test_reload_keeps_inverse_and_dtype(self):
+        """Recargar del disco usa la inversa y el dtype guardados, sin np.linalg.inv."""
+        service = ServicioEncriptacion(dtype="float32", codigo_max=0x7F, boveda_memoria=0)
+        self.addCleanup(service.cerrar)
+        id_ = service.encriptar("Texto ASCII", Encriptador)['id']
+        with mock.patch("numpy.linalg.inv", side_effect=AssertionError):
+            enc, _, _ = service.boveda.obtener(id_)
+            self.assertEqual(service.desencriptar(id_), "Texto ASCII")
+        self.assertIs(enc.dtype, np.float32)
+        self.assertEqual(enc.codigo_max, 0x7F)
+    
+    def test_closed_vault_rejects_calls(self):
+        """Después de cerrar(), guardar y obtener dan un error claro."""
+        enc = Encriptador()
+        boveda = BovedaCifrados(memoria_max=0)
+        boveda.guardar(1, enc, enc.encriptar("Hola"), 4)
+        boveda.cerrar()
+        boveda.cerrar()
+        with self.assertRaisesRegex(ValueError, "cerrada"):
+            boveda.guardar(2, enc, enc.encriptar("Chau"), 4)
+        with self.assertRaisesRegex(ValueError, "cerrada"):
+            boveda.obtener(1)
+
+
+class TestInstrumentacion(unittest.TestCase):
+    """Pruebas de la instrumentación por eventos."""
+    
+    def setUp(self):
+        self.eventos = []
+        self.service = ServicioEncriptacion()
+    
+    def tearDown(self):
+        instrumentacion.quitar_sumidero(self.eventos.append)
+        instrumentacion.activar_diagnosticos(False)
+    
+    def test_disabled_costs_nothing(self):
+        """Sin sumideros no se emite ni se calcula nada."""
+        with mock.patch.object(instrumentacion, "emitir", side_effect=AssertionError), \
+                mock.patch("numpy.linalg.det", side_effect=AssertionError):
+            self.service.encriptar("Hola", Encriptador)
+            self.service.desencriptar()
+    
+    def test_structured_events(self):
+        """Eventos estructurados; diagnósticos sólo si se piden."""
+        instrumentacion.agregar_sumidero(self.eventos.append)
+        with mock.patch("numpy.linalg.det", side_effect=AssertionError):
+            id_ = self.service.encriptar("Hola", Encriptador)['id']
+        self.service.desencriptar()
+        
+        nombres = [e['evento'] for e in self.eventos]
+        self.assertEqual(nombres, ["encriptar.inicio", "encriptar.fin",
+                                   "desencriptar.inicio", "desencriptar.fin"])
+        self.assertEqual(self.eventos[1]['id'], id_)
+        self.assertEqual(self.eventos[3]['caracteres'], 4)
+        
+        instrumentacion.activar_diagnosticos()
+        self.service.encriptar("Hola", Encriptador)
+        diagnostico = [e for e in self.eventos if e['evento'] == "clave.diagnostico"]
+        self.assertEqual(abs(round(diagnostico[0]['det'])), 1)
+
+
+class TestMetricas(unittest.TestCase):
+    """Pruebas de las métricas por etapa."""
+    
+    def setUp(self):
+        metricas.reiniciar()
+        self.addCleanup(setattr, metricas, "activas", True)
+    
+    def test_histogram_percentiles(self):
+        """Percentiles con error relativo <= 12.5%."""
+        histograma = HistogramaLatencia()
+        for valor in range(1, 10001):
+            histograma.registrar(valor * 1000, nbytes=10)
+        for p in (50, 95, 99):
+            esperado = p * 100 * 1000
+            self.assertLessEqual(abs(histograma.percentil(p) - esperado) / esperado, 0.125)
+        self.assertEqual(histograma.resumen()['bytes'], 100000)
+        self.assertEqual(histograma.resumen()['max_ms'], 10.0)
+    
+    def test_stage_snapshot_and_reset(self):
+        """Cada etapa del cifrado aparece en la instantánea."""
+        service = ServicioEncriptacion()
+        service.encriptar("Hola Mundo", Encriptador)
+        service.desencriptar()
+        instantanea = service.metricas()
+        for etapa in ("generar_clave", "texto_a_matriz", "cifrar_matriz", "encriptar",
+                      "descifrar_matriz", "matriz_a_texto", "desencriptar"):
+            self.assertEqual(instantanea[etapa]['conteo'], 1, etapa)
+        # n = 4 → 3 filas × 4 columnas float64
+        self.assertEqual(instantanea['texto_a_matriz']['bytes'], 3 * 4 * 8)
+        
+        service.reiniciar_metricas()
+        self.assertEqual(Encriptador.metricas(), {})
+        metricas.activas = False
+        service.encriptar("Hola", Encriptador)
+        self.assertEqual(service.metricas(), {})
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Pruebas del arnés de benchmarks."""
+    
+    def test_sweep_and_regression(self):
+        """Barrido mínimo y detección de regresiones contra la base."""
+        resultados = benchmarks.ejecutar_barrido([200], [4], repeticiones=1)
+        casos = {r['caso'] for r in resultados}
+        self.assertIn("encriptar/astral/L=200/n=4", casos)
+        self.assertIn("generar_clave/n=4", casos)
+        self.assertTrue(all(r['memoria_pico'] > 0 for r in resultados))
+        
+        base = {r['caso']: dict(r) for r in resultados}
+        self.assertEqual(benchmarks.comparar_con_base(resultados, base), [])
+        base["generar_clave/n=4"]['por_segundo'] *= 2
+        regresiones = benchmarks.comparar_con_base(resultados, base, umbral=0.25)
+        self.assertEqual([r['caso'] for r in regresiones], ["generar_clave/n=4"])
+        self.assertAlmostEqual(regresiones[0]['cambio'], -0.5)
+    
+    def test_cold_start_without_numpy(self):
+        """`import core` en frío no carga numpy (se importa al encriptar)."""
+        resultado = benchmarks.medir_arranque("core", repeticiones=1)
+        self.assertEqual(resultado['caso'], "arranque/core")
+        self.assertFalse(resultado['numpy'])
+        self.assertGreater(resultado['segundos'], 0)
+
+
+class TestCLI(unittest.TestCase):
+    """Pruebas de la línea de comandos en streaming."""
+    
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = lambda nombre: os.path.join(directorio.name, nombre)
+        self.texto = "línea 😀 con\r\n acentos é " * 200 + "fin\x00"
+        with open(self.ruta("entrada.txt"), "w", encoding="utf-8", newline="") as f:
+            f.write(self.texto)
+    
+    def test_roundtrip_all_dtypes(self):
+        """Archivo → contenedor → texto, en tramos que cortan caracteres multibyte."""
+        for dtype in cli.DTYPES:
+            with self.subTest(dtype=dtype):
+                codigo = cli.main(["encriptar", self.ruta("entrada.txt"), "-o", self.ruta("c.encm"),
+                                   "--bloque", "6", "--dtype", dtype, "--codigo-max", "0x1FFFF",
+                                   "--trabajadores", "2", "--filas-por-bloque", "5", "--silencioso"])
+                self.assertEqual(codigo, 0)
+                datos = cargar_contenedor(self.ruta("c.encm"))
+                self.assertEqual(datos['longitud'], len(self.texto))
+                self.assertEqual(datos['motor'], {"float64": MOTOR_FLOAT64, "int": MOTOR_ENTERO,
+                                                  "float32": MOTOR_FLOAT32}[dtype])
+                self.assertEqual(datos['codigo_max'], 0x1FFFF)
+                self.assertEqual(datos['clave_inv'] is None, dtype == "int")
+                
+                # Se descifra con la inversa y el tipo guardados
+                with mock.patch("numpy.linalg.inv", side_effect=AssertionError):
+                    with open(self.ruta("s.txt"), "wb") as salida:
+                        estadisticas = cli.desencriptar_contenedor(datos, salida,
+                                                                   filas_por_bloque=3)
+                self.assertEqual(estadisticas['dtype'], dtype)
+                with open(self.ruta("s.txt"), encoding="utf-8", newline="") as f:
+                    self.assertEqual(f.read(), self.texto)
+                
+                codigo = cli.main(["desencriptar", self.ruta("c.encm"), "-o", self.ruta("s.txt"),
+                                   "--filas-por-bloque", "3", "--silencioso"])
+                self.assertEqual(codigo, 0)
+                with open(self.ruta("s.txt"), encoding="utf-8", newline="") as f:
+                    self.assertEqual(f.read(), self.texto)
+    
+    def test_one_pool_per_stream(self):
+        """Un solo pool para todos los tramos, también al descifrar."""
+        salida = io.BytesIO()
+        with mock.patch("cli.PoolTrabajadores", wraps=PoolTrabajadores) as pool, \
+                mock.patch("encriptador.PoolTrabajadores", side_effect=AssertionError):
+            with open(self.ruta("entrada.txt"), "rb") as entrada:
+                cli.encriptar_flujo(entrada, salida, n=4, trabajadores=2, filas_por_bloque=8)
+            texto = io.BytesIO()
+            cli.desencriptar_contenedor(leer_contenedor(salida.getvalue()), texto,
+                                        trabajadores=2, filas_por_bloque=8)
+        self.assertEqual(pool.call_count, 2)
+        self.assertEqual(texto.getvalue().decode("utf-8"), self.texto)
+    
+    def test_unseekable_output_and_stats(self):
+        """Salida sin seek() (stdout): el contenedor se arma en memoria."""
+        salida = io.BytesIO()
+        salida.seekable = lambda: False
+        with open(self.ruta("entrada.txt"), "rb") as entrada:
+            estadisticas = cli.encriptar_flujo(entrada, salida, n=4, trabajadores=1)
+        self.assertEqual(estadisticas['caracteres'], len(self.texto))
+        self.assertIn("car/s", cli.formatear_estadisticas(estadisticas))
+        
+        texto = io.BytesIO()
+        cli.desencriptar_contenedor(leer_contenedor(salida.getvalue()), texto)
+        self.assertEqual(texto.getvalue().decode("utf-8"), self.texto)
+    
+    def test_errors(self):
+        """Entrada vacía o fuera de codigo_max: código de salida 1."""
+        open(self.ruta("vacio.txt"), "w").close()
+        with mock.patch("sys.stderr", io.StringIO()):
+            self.assertEqual(cli.main(["encriptar", self.ruta("vacio.txt"),
+                                       "-o", self.ruta("c.encm")]), 1)
+            self.assertEqual(cli.main(["encriptar", self.ruta("entrada.txt"), "-o",
+                                       self.ruta("c.encm"), "--codigo-max", "127"]), 1)
+            self.assertEqual(cli.main(["encriptar", self.ruta("entrada.txt"), "-o",
+                                       self.ruta("c.encm"), "--trabajadores", "0"]), 1)
+    
+    def test_failed_run_leaves_no_file(self):
+        """Un error no deja un .encm truncado ni el temporal en disco."""
+        open(self.ruta("vacio.txt"), "w").close()
+        with mock.patch("sys.stderr", io.StringIO()):
+            cli.main(["encriptar", self.ruta("vacio.txt"), "-o", self.ruta("c.encm")])
+            cli.main(["encriptar", self.ruta("entrada.txt"), "-o",
+                      self.ruta("c.encm"), "--codigo-max", "127"])
+        self.assertEqual(sorted(os.listdir(self.ruta(""))),
+                         ["entrada.txt", "vacio.txt"])
+        
+        salida = io.BytesIO()
+        with self.assertRaises(ValueError):
+            cli.encriptar_flujo(io.BytesIO(b""), salida, n=4, trabajadores=1)
+        self.assertEqual(salida.getvalue(), b"")
+    
+    def test_no_tkinter(self):
+        """La línea de comandos (y main.py con argumentos) no importa tkinter."""
+        codigo = ("import sys, main; main.main(['encriptar', sys.argv[1], '-o', sys.argv[2], "
+                  "'--silencioso']); sys.exit('tkinter' in sys.modules)")
+        resultado = subprocess.run(
+            [sys.executable, "-c", codigo, self.ruta("entrada.txt"), self.ruta("c.encm")],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True
+        )
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+
+
+class TestVisores(unittest.TestCase):
+    """Pruebas del formateo por filas de los visores virtualizados."""
+    
+    def test_format_rows(self):
+        """Sólo el rango pedido, con formato según el tipo."""
+        matriz = np.arange(12).reshape(4, 3)
+        self.assertEqual(formatear_filas(matriz, 1, 3),
+                         "[        3        4        5 ]\n[        6        7        8 ]")
+        self.assertEqual(formatear_filas(matriz / 2, 0, 1),
+                         "[     0.00     0.50     1.00 ]")
+        self.assertEqual(formatear_filas(matriz, 4, 10), "")
+        self.assertEqual(formatear_filas(matriz.astype(object), 0, 1),
+                         "[        0        1        2 ]")
+    
+    def test_unicode_panel_text(self):
+        """Resumen y líneas del panel Unicode a partir del arreglo del motor."""
+        codigos = ServicioEncriptacion().encriptar("Hola\n😀", Encriptador)['unicode']
+        self.assertEqual(resumir_codigos(codigos),
+                         "6 caracteres | U+000A–U+1F600 | 5 ASCII | 1 fuera del BMP")
+        self.assertEqual(formatear_codigos(codigos, 3, 10), "'a':97 | '\\n':10 | '😀':128512")
+        self.assertEqual(resumir_codigos(codigos[:0]), "0 caracteres")
+    
+    def test_history_summary(self):
+        """Líneas del listado de historial a partir de páginas truncadas."""
+        service = ServicioEncriptacion()
+        service.encriptar("corto", Encriptador)
+        service.encriptar("línea 1\nlínea 2 " * 20, Encriptador)
+        cortas = [resumir_entrada(e) for e in service.obtener_historial(0, 2, truncar=10)]
+        self.assertTrue(cortas[0].startswith("#1 ") and cortas[0].endswith("corto  (5 car.)"))
+        self.assertIn("línea 1⏎lí…  (320 car.)", cortas[1])
+
+
+class TestServicioLotes(unittest.TestCase):
+    """Pruebas de encriptación por lotes con una clave por mensaje."""
+    
+    def test_batch_service_roundtrip(self):
+        """Cada mensaje del lote se recupera con su propio encriptador."""
+        service = ServicioEncriptacion()
+        textos = ["Hola", "Mundo grande", "x" * 50, "Ω😀" * 30]
+        resultados = service.encriptar_lote(textos, Encriptador)
+        
+        self.assertEqual([r['texto'] for r in resultados], textos)
+        for resultado, texto in zip(resultados, textos):
+            enc, _, _ = service.boveda.obtener(resultado['id'])
+            self.assertTrue(np.array_equal(resultado['cifrado'], enc.encriptar(texto)))
+            self.assertEqual(service.desencriptar(resultado['id']), texto)
+            self.assertEqual(resultado['unicode'].tolist(), [ord(c) for c in texto])
+        
+        self.assertEqual(service.desencriptar(), textos[-1])
+        self.assertEqual(len(service.obtener_historial()), len(textos))
+    
+    def test_batch_memory_is_not_padded_to_longest(self):
+        """Un texto largo no rellena a los cortos: memoria O(Σ filas)."""
+        service = ServicioEncriptacion(tamaño_bloque=4)
+        textos = ["a" * 40000] + ["b"] * 500 + ["cde" * 7]
+        resultados = service.encriptar_lote(textos, Encriptador)
+        base = resultados[1]['cifrado'].base
+        self.assertEqual(base.shape, (10000 + 500 + 6, 4))
+        for resultado, texto in zip(resultados[-3:], textos[-3:]):
+            self.assertEqual(service.desencriptar(resultado['id']), texto)
+        self.assertEqual(service.desencriptar(resultados[0]['id']), textos[0])
+    
+    def test_batch_service_integer_engine(self):
+        """El lote respeta el tipo entero del motor exacto."""
+        service = ServicioEncriptacion(tamaño_bloque=4)
+        resultados = service.encriptar_lote(["abc", "defgh"], EncriptadorEntero)
+        self.assertTrue(all(np.issubdtype(r['cifrado'].dtype, np.integer)
+                            for r in resultados))
+        self.assertEqual(service.desencriptar(), "defgh")
+
+
+class TestServicioAsync(unittest.TestCase):
+    """Pruebas de la fachada asyncio."""
+    
+    def test_async_matches_sync(self):
+        """Encriptar y desencriptar sin bloquear el event loop."""
+        async def escenario():
+            async with ServicioEncriptacionAsync(max_trabajadores=2, max_en_vuelo=2) as svc:
+                resultados = await asyncio.gather(
+                    *(svc.encriptar(f"Mensaje {i}", Encriptador) for i in range(6))
+                )
+                texto = await svc.desencriptar()
+                return svc, resultados, texto
+        
+        svc, resultados, texto = asyncio.run(escenario())
+        self.assertEqual([r['texto'] for r in resultados], [f"Mensaje {i}" for i in range(6)])
+        self.assertIn(texto, {f"Mensaje {i}" for i in range(6)})
+        self.assertEqual(len(svc.servicio.obtener_historial()), 6)
+        self.assertEqual(svc.en_vuelo, 0)
+    
+    def test_cancel_waiting_operation(self):
+        """Una operación cancelada no llega al historial."""
+        async def escenario():
+            async with ServicioEncriptacionAsync(max_en_vuelo=1) as svc:
+                primera = asyncio.create_task(svc.encriptar("Primera", Encriptador))
+                segunda = asyncio.create_task(svc.encriptar("Segunda", Encriptador))
+                await asyncio.sleep(0)
+                segunda.cancel()
+                await primera
+                with self.assertRaises(asyncio.CancelledError):
+                    await segunda
+                return svc
+        
+        svc = asyncio.run(escenario())
+        self.assertEqual([h['texto'] for h in svc.servicio.obtener_historial()], ["Primera"])
+    
+    def test_cancelled_running_operation_keeps_its_slot(self):
+        """El lugar en vuelo se libera cuando termina el hilo, no la tarea."""
+        liberar_hilo = threading.Event()
+        
+        async def escenario():
+            async with ServicioEncriptacionAsync(max_en_vuelo=1) as svc:
+                svc.servicio.desencriptar = lambda id_, cancelacion: liberar_hilo.wait(5) and "Lento"
+                lenta = asyncio.create_task(svc.desencriptar())
+                await asyncio.sleep(0.05)
+                lenta.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await lenta
+                
+                siguiente = asyncio.create_task(svc.encriptar("Después", Encriptador))
+                await asyncio.sleep(0.05)
+                en_vuelo, esperando = svc.en_vuelo, not siguiente.done()
+                liberar_hilo.set()
+                await siguiente
+                return en_vuelo, esperando, svc.en_vuelo
+        
+        self.assertEqual(asyncio.run(escenario()), (1, True, 0))
+    
+    def test_reuse_across_event_loops(self):
+        """La misma fachada sirve en varias llamadas a asyncio.run()."""
+        svc = ServicioEncriptacionAsync(max_trabajadores=2, max_en_vuelo=2)
+        self.addCleanup(svc.cerrar)
+        for texto in ("Primer loop", "Segundo loop"):
+            resultado = asyncio.run(svc.encriptar(texto, Encriptador))
+            self.assertEqual(asyncio.run(svc.desencriptar(resultado['id'])), texto)
+    
+    def test_cancellation_event(self):
+        """El evento de cancelación detiene el servicio sin cambiar el estado."""
+        service = ServicioEncriptacion()
+        cancelacion = threading.Event()
+        cancelacion.set()
+        with self.assertRaises(OperacionCanceladaError):
+            service.encriptar("Hola", Encriptador, cancelacion=cancelacion)
+        self.assertFalse(service.tiene_encriptacion_activa())
+    
+    def test_cancellable_path_matches(self):
+        """Con evento (sin activar) el resultado es el mismo que sin él."""
+        service = ServicioEncriptacion()
+        texto = "Bloques cancelables " * 20
+        with mock.patch("encriptador.FILAS_POR_BLOQUE", 8):
+            resultado = service.encriptar(texto, Encriptador, cancelacion=threading.Event())
+            self.assertEqual(resultado['texto'], texto)
+            self.assertEqual(service.desencriptar(cancelacion=threading.Event()), texto)
+        self.assertEqual(service.desencriptar(), texto)
+    
+    def test_cancel_decryption_between_blocks(self):
+        """Desencriptar revisa la cancelación entre bloques de filas."""
+        service = ServicioEncriptacion()
+        service.encriptar("Texto largo " * 50, Encriptador)
+        
+        class EventoDiferido(threading.Event):
+            """Se activa solo tras varias consultas (a mitad del proceso)."""
+            consultas = 0
+            
+            def is_set(self):
+                self.consultas += 1
+                return self.consultas > 3
+        
+        cancelacion = EventoDiferido()
+        with mock.patch("encriptador.FILAS_POR_BLOQUE", 8), \
+                mock.patch.object(Encriptador, "matriz_a_texto", side_effect=AssertionError):
+            with self.assertRaises(OperacionCanceladaError):
+                service.desencriptar(cancelacion=cancelacion)
+        self.assertEqual(cancelacion.consultas, 4)
+
+
+class TestEncriptadorEntero(unittest.TestCase):
+    """Pruebas del motor entero exacto."""
+    
+    def test_exact_roundtrip(self):
+        """Ida y vuelta exacta con caracteres astrales."""
+        np.random.seed(1)
+        clave = np.random.randint(1, 9, size=(12, 12))
+        while round(np.linalg.det(clave)) == 0:
+            clave = np.random.randint(1, 9, size=(12, 12))
+        enc = EncriptadorEntero(clave.tolist(), tuple(np.random.permutation(12)))
+        texto = "Ω😀\U0010FFFF" * 40
+        cifrado = enc.encriptar(texto)
+        self.assertTrue(np.issubdtype(cifrado.dtype, np.integer))
+        self.assertEqual(enc.desencriptar(cifrado), texto)
+    
+    def test_smallest_safe_dtype(self):
+        """Elegir int32 cuando no hay riesgo de desborde."""
+        enc = EncriptadorEntero()
+        self.assertEqual(enc.encriptar("Hola").dtype, np.int32)
+    
+    def test_non_integer_key(self):
+        """Rechazar claves no enteras."""
+        with self.assertRaises(MatrizInvalidaError):
+            EncriptadorEntero([[1.5, 0], [0, 1]])
+
+    def test_same_options_as_float_engine(self):
+        """Aceptar clave_inv y codigo_max como Encriptador."""
+        service = ServicioEncriptacion()
+        resultado = service.encriptar("Hola", EncriptadorEntero)
+        enc = service.encriptador_actual
+        self.assertIsInstance(enc, EncriptadorEntero)
+        np.testing.assert_array_equal(enc.clave @ enc.clave_inv, np.eye(enc.n))
+        self.assertEqual(service.desencriptar(resultado['id']), "Hola")
+        enc = EncriptadorEntero(enc.clave, enc.permutacion, enc.clave_inv, codigo_max=0x7F)
+        self.assertEqual(enc.desencriptar(enc.encriptar("Hola")), "Hola")
+    
+    def test_float_dtype_rejected(self):
+        """Un tipo flotante no se ignora en silencio: es un error."""
+        for dtype in (np.float32, "float64"):
+            with self.assertRaises(ValueError):
+                EncriptadorEntero(dtype=dtype)
+        service = ServicioEncriptacion(dtype="float32")
+        with self.assertRaises(EncriptacionError):
+            service.encriptar("Hola", EncriptadorEntero)
+
+    def test_overflow_is_explicit(self):
+        """Rechazar (o avisar) en vez de pasar en silencio a dtype=object."""
+        clave = [[2 ** 40, 1], [1, 0]]
+        with self.assertRaises(ClaveInvalidaError):
+            EncriptadorEntero(clave)
+        with self.assertWarns(RuntimeWarning):
+            enc = EncriptadorEntero(clave, permitir_objeto=True)
+        self.assertEqual(enc.desencriptar(enc.encriptar("Hola")), "Hola")
+
+
+class TestConstruccionClaves(unittest.TestCase):
+    """Pruebas de claves invertibles por construcción."""
+    
+    def test_exact_inverse(self):
+        """La inversa construida es exacta."""
+        for n in (1, 2, 7, 64):
+            clave, clave_inv = construir_clave_invertible(n)
+            self.assertTrue(np.array_equal(clave @ clave_inv, np.eye(n)))
+    
+    def test_bounded_entries(self):
+        """Valores de clave e inversa acotados."""
+        clave, clave_inv = construir_clave_invertible(200)
+        cota = 1 + CLAVE_DENSIDAD
+        self.assertLessEqual(np.abs(clave).max(), cota)
+        self.assertLessEqual(np.abs(clave_inv).max(), cota)
+    
+    def test_batch_construction(self):
+        """Construcción por lotes con inversas exactas."""
+        claves, claves_inv = construir_claves_invertibles(50, 6)
+        self.assertEqual(claves.shape, (50, 6, 6))
+        identidades = np.broadcast_to(np.eye(6), (50, 6, 6))
+        self.assertTrue(np.array_equal(np.matmul(claves, claves_inv), identidades))
+    
+    def test_no_unit_columns(self):
+        """Ninguna columna de la clave copia un código del texto."""
+        for n in (2, 3, 4, 16):
+            claves, _ = construir_claves_invertibles(500, n)
+            self.assertTrue(np.all(np.count_nonzero(claves, axis=-2) >= 2))
+            claves, claves_inv = construir_claves_acotadas(100, n, COTA_CONDICION_MIN)
+            self.assertTrue(np.all(np.count_nonzero(claves, axis=-2) >= 2))
+            self.assertTrue(np.all(numero_condicion(claves, claves_inv) <= COTA_CONDICION_MIN))
+        with self.assertRaises(ValueError):
+            construir_claves_acotadas(1, 4, COTA_CONDICION_MIN - 1)
+    
+    def test_cipher_is_not_permuted_plaintext(self):
+        """El cifrado nunca es el texto con los códigos reordenados."""
+        service = ServicioEncriptacion()
+        for _ in range(300):
+            resultado = service.encriptar("Hola", Encriptador)
+            self.assertNotEqual(sorted(resultado['cifrado'].ravel().tolist()),
+                                [72, 97, 108, 111])
+    
+    def test_no_determinant(self):
+        """Generar claves sin calcular determinantes."""
+        service = ServicioEncriptacion()
+        with mock.patch("numpy.linalg.det", side_effect=AssertionError):
+            clave, clave_inv = service._generar_clave(16)
+        self.assertEqual(clave.shape, (16, 16))
+
+
+class TestModoFloat32(unittest.TestCase):
+    """Pruebas del modo float32 con claves de condición acotada."""
+    
+    def test_round_trip(self):
+        """Cifrado float32 exacto para textos del BMP."""
+        service = ServicioEncriptacion(tamaño_bloque=16, dtype=np.float32,
+                                       codigo_max=0xFFFF)
+        texto = "Precisión simple: ñ € 字 " * 500
+        service.encriptar(texto, Encriptador)
+        self.assertEqual(service.cifrado_actual.dtype, np.float32)
+        self.assertEqual(service.desencriptar(), texto)
+    
+    def test_bounded_condition(self):
+        """Las claves generadas respetan la cota de κ₁."""
+        for cota in (16, 256, 132104):
+            claves, claves_inv = construir_claves_acotadas(10, 32, cota)
+            self.assertEqual(claves.shape, (10, 32, 32))
+            self.assertTrue(np.all(numero_condicion(claves, claves_inv) <= cota))
+    
+    def test_reject_unsafe_keys(self):
+        """Rechazar claves sin garantía de descifrado exacto."""
+        # det = 3: inversa no entera
+        with self.assertRaises(ClaveInvalidaError):
+            Encriptador(dtype=np.float32, codigo_max=127)
+        
+        clave, clave_inv = construir_clave_invertible(64)
+        condicion = numero_condicion(clave, clave_inv)
+        with self.assertRaises(ClaveInvalidaError):
+            Encriptador(clave, clave_inv=clave_inv, dtype=np.float32,
+                        codigo_max=int(2 ** 24 // condicion) + 1)
+        enc = Encriptador(clave, clave_inv=clave_inv, dtype=np.float32,
+                          codigo_max=int(2 ** 24 // condicion))
+        self.assertEqual(enc.clave.dtype, np.float32)
+    
+    def test_code_point_limit(self):
+        """Rechazar códigos por encima de codigo_max."""
+        enc = Encriptador([[1, 1], [0, 1]], dtype=np.float32, codigo_max=127)
+        self.assertEqual(enc.desencriptar(enc.encriptar("ASCII")), "ASCII")
+        with self.assertRaises(ValueError):
+            enc.encriptar("ñ")
+
+
+class TestPoolClaves(unittest.TestCase):
+    """Pruebas del pool de claves en segundo plano."""
+    
+    def esperar(self, condicion, limite=5.0):
+        """Esperar a que el hilo trabajador cumpla una condición."""
+        fin = time.monotonic() + limite
+        while not condicion() and time.monotonic() < fin:
+            time.sleep(0.01)
+        self.assertTrue(condicion())
+    
+    def test_pool_hits(self):
+        """Servir claves precargadas sin generarlas en línea."""
+        service = ServicioEncriptacion(tamaño_bloque=4)
+        pool = service.activar_pool(nivel_bajo=1, nivel_alto=3)
+        self.addCleanup(service.desactivar_pool)
+        self.esperar(lambda: pool.estadisticas()['colas'].get(4) == 3)
+        
+        service.encriptar("Texto del pool", Encriptador)
+        self.assertEqual(service.desencriptar(), "Texto del pool")
+        self.assertEqual(pool.estadisticas()['aciertos'], 1)
+    
+    def test_memory_cap_evicts_rare_sizes(self):
+        """Descartar los tamaños menos usados al superar la memoria."""
+        service = ServicioEncriptacion()
+        bytes_4 = PoolClaves._tamaño_material(service._generar_material(4))
+        pool = PoolClaves(service._generar_material, 1, 2, memoria_max=2 * bytes_4)
+        self.addCleanup(pool.detener)
+        
+        pool.obtener(4)
+        pool.obtener(4)
+        pool.obtener(3)
+        self.esperar(lambda: not pool._pendientes)
+        stats = pool.estadisticas()
+        self.assertLessEqual(stats['bytes'], 2 * bytes_4)
+        self.assertGreater(stats['descartes'], 0)
+
+        # Un tamaño descartado sale de los pendientes hasta un nuevo obtener(n)
+        with pool._condicion:
+            pool._colas[5] = deque([service._generar_material(5)])
+            pool._bytes += PoolClaves._tamaño_material(pool._colas[5][0])
+            pool._pendientes.append(5)
+            pool._aplicar_limite_memoria(4)
+            self.assertNotIn(5, pool._colas)
+            self.assertNotIn(5, pool._pendientes)
+
+    def test_stop_during_generation(self):
+        """No guardar material generado después de detener()."""
+        service = ServicioEncriptacion()
+        en_curso, continuar = threading.Event(), threading.Event()
+
+        def generador(n):
+            en_curso.set()
+            continuar.wait(5)
+            return service._generar_material(n)
+
+        pool = PoolClaves(generador, 1, 2)
+        pool.precargar(4)
+        self.assertTrue(en_curso.wait(5))
+        deteniendo = threading.Thread(target=pool.detener)
+        deteniendo.start()
+        self.esperar(lambda: not pool._activo)
+        continuar.set()
+        deteniendo.join(5)
+        self.assertEqual(pool.estadisticas()['colas'], {})
+        self.assertEqual(pool.estadisticas()['bytes'], 0)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,390 @@
+"""
+Visores Virtualizados para la Interfaz
+
+Widgets tkinter que muestran resultados grandes sin construir todo el
+texto de una vez: sólo se formatean e insertan las filas visibles, y el
+resto se genera al desplazarse.
+
+  ┌──────────────────────────────────────────┐
+  │ (12500 × 16) float64                     │  ← resumen
+  │ [    72.00   -111.00  ...   97.00 ]  ▲   │
+  │ [  ...  ventana de `alto` filas   ]  █   │  ← sólo estas filas existen
+  │ [  ...                            ]  ▼   │     en el tk.Text
+  └──────────────────────────────────────────┘
+
+La barra de desplazamiento se maneja a mano: representa la matriz
+completa (primera fila visible / total), no el contenido del tk.Text.
+
+PanelUnicode reutiliza el visor para los códigos Unicode del texto: un
+resumen calculado con numpy y líneas de CODIGOS_POR_LINEA códigos
+generadas al desplazarse, a partir del arreglo que ya calculó el motor.
+
+VentanaHistorial sigue la misma idea con el historial: pide al servicio
+una página a la vez, con los textos recortados, y sólo lee el texto
+completo de una entrada al abrirla.
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Filas visibles por defecto de un visor
+FILAS_VISIBLES = 4
+
+# Filas desplazadas por un paso de la rueda del mouse
+FILAS_POR_PASO_RUEDA = 3
+
+# Códigos por línea del panel Unicode
+CODIGOS_POR_LINEA = 8
+
+# Entradas por página de la ventana de historial
+HISTORIAL_POR_PAGINA = 100
+
+# Caracteres de cada texto mostrados en el listado del historial
+TEXTO_MAX_LISTADO = 60
+
+
+def formatear_filas(matriz: NDArray, inicio: int, fin: int) -> str:
+    """
+    FORMATEAR UN RANGO DE FILAS
+    ===========================
+
+    Cada fila se formatea con una sola operación % sobre la fila completa
+    (sin indexar elemento por elemento ni concatenar strings).
+
+    Args:
+        matriz: Matriz (filas, columnas)
+        inicio: Primera fila (incluida)
+        fin: Última fila (excluida)
+
+    Returns:
+        str: Una línea '[ v1 v2 ... ]' por fila, separadas por '\\n'.
+             Enteros con '%8d', flotantes con '%8.2f', el resto con '%8s'.
+
+    Ejemplo:
+        >>> formatear_filas(np.array([[1, 2], [3, 4]]), 0, 2)
+        '[        1        2 ]\\n[        3        4 ]'
+    """
+    import numpy as np
+
+    bloque = matriz[inicio:fin]
+    if np.issubdtype(bloque.dtype, np.integer):
+        celda = "%8d "
+    elif np.issubdtype(bloque.dtype, np.floating):
+        celda = "%8.2f "
+    else:
+        celda = "%8s "
+    formato = "[ " + celda * bloque.shape[1] + "]"
+    return "\n".join(formato % tuple(fila) for fila in bloque.tolist())
+
+
+class VisorMatriz(ttk.Frame):
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║      VISOR DE MATRIZ VIRTUALIZADO                     ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Muestra una matriz de cualquier tamaño renderizando sólo `alto` filas.
+    mostrar() guarda una referencia a la matriz (sin copiarla ni
+    formatearla entera); cada desplazamiento reemplaza la ventana visible.
+
+    EJEMPLO DE USO:
+    ===============
+    >>> visor = VisorMatriz(frame, alto=4)
+    >>> visor.pack(fill="x")
+    >>> visor.mostrar(resultado['cifrado'])   # 1 millón de filas: instantáneo
+    """
+
+    def __init__(self, parent: Any, alto: int = FILAS_VISIBLES, ancho: int = 90,
+                 fuente: Any = ("Courier", 8)) -> None:
+        super().__init__(parent)
+        self.alto = alto
+        self.datos: Optional[NDArray] = None
+        self.inicio = 0
+
+        self.resumen = ttk.Label(self, text="")
+        self.resumen.grid(row=0, column=0, columnspan=2, sticky="w")
+
+        self.texto = tk.Text(self, height=alto, width=ancho, font=fuente, wrap="none",
+                             bg="#f9fafb", relief="solid", bd=1, state="disabled")
+        self.texto.grid(row=1, column=0, sticky="ew")
+
+        # Vertical: manual (matriz completa); horizontal: la del propio tk.Text
+        self.barra = ttk.Scrollbar(self, orient="vertical", command=self._desplazar)
+        self.barra.grid(row=1, column=1, sticky="ns")
+        barra_x = ttk.Scrollbar(self, orient="horizontal", command=self.texto.xview)
+        barra_x.grid(row=2, column=0, sticky="ew")
+        self.texto.configure(xscrollcommand=barra_x.set)
+        self.columnconfigure(0, weight=1)
+
+        self.texto.bind("<MouseWheel>", self._rueda)
+        self.texto.bind("<Button-4>", lambda e: self._mover(-FILAS_POR_PASO_RUEDA))
+        self.texto.bind("<Button-5>", lambda e: self._mover(FILAS_POR_PASO_RUEDA))
+
+    @property
+    def filas(self) -> int:
+        """Filas totales de la matriz mostrada."""
+        return 0 if self.datos is None else self.datos.shape[0]
+
+    def mostrar(self, matriz: NDArray) -> None:
+        """Mostrar `matriz` desde la primera fila."""
+        import numpy as np
+
+        self.datos = np.atleast_2d(np.asarray(matriz))
+        filas, columnas = self.datos.shape
+        self._reiniciar(f"({filas} × {columnas}) {self.datos.dtype}")
+
+    def limpiar(self) -> None:
+        """Vaciar el visor y soltar la referencia a los datos."""
+        self.datos = None
+        self._reiniciar("")
+
+    def _reiniciar(self, resumen: str) -> None:
+        """Poner el resumen y renderizar desde la primera fila."""
+        self.resumen.config(text=resumen)
+        self.inicio = 0
+        self._renderizar()
+
+    def _formatear(self, inicio: int, fin: int) -> str:
+        """Texto de las filas [inicio, fin) (las subclases cambian el formato)."""
+        return formatear_filas(self.datos, inicio, fin)
+
+    # ==================== DESPLAZAMIENTO ====================
+
+    def _desplazar(self, accion: str, cantidad: str, unidad: Optional[str] = None) -> None:
+        """Comando de la barra: ('moveto', fracción) o ('scroll', n, 'units'|'pages')."""
+        if accion == "moveto":
+            self._ir_a(round(float(cantidad) * self.filas))
+        elif accion == "scroll":
+            paso = self.alto if unidad == "pages" else 1
+            self._mover(int(cantidad) * paso)
+
+    def _rueda(self, evento: Any) -> str:
+        """Rueda del mouse (Windows/macOS); evita desplazar el contenedor."""
+        self._mover(-FILAS_POR_PASO_RUEDA if evento.delta > 0 else FILAS_POR_PASO_RUEDA)
+        return "break"
+
+    def _mover(self, filas: int) -> str:
+        self._ir_a(self.inicio + filas)
+        return "break"
+
+    def _ir_a(self, fila: int) -> None:
+        inicio = max(0, min(fila, self.filas - self.alto))
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self._renderizar()
+
+    def _renderizar(self) -> None:
+        """Reemplazar el contenido por la ventana visible y ajustar la barra."""
+        contenido = ""
+        if self.filas:
+            contenido = self._formatear(self.inicio, self.inicio + self.alto)
+        self.texto.config(state="normal")
+        self.texto.delete("1.0", tk.END)
+        self.texto.insert(tk.END, contenido)
+        self.texto.config(state="disabled")
+
+        if self.filas:
+            self.barra.set(self.inicio / self.filas,
+                           min(1.0, (self.inicio + self.alto) / self.filas))
+        else:
+            self.barra.set(0.0, 1.0)
+
+
+def formatear_codigos(codigos: NDArray, inicio: int, fin: int) -> str:
+    """
+    Códigos [inicio, fin) como "'c':código | ...". Los caracteres no
+    imprimibles (controles, sustitutos sueltos) se muestran escapados.
+    """
+    partes = []
+    for codigo in codigos[inicio:fin].tolist():
+        caracter = chr(codigo)
+        if not caracter.isprintable():
+            caracter = repr(caracter)[1:-1]
+        partes.append(f"'{caracter}':{codigo}")
+    return " | ".join(partes)
+
+
+def resumir_codigos(codigos: NDArray) -> str:
+    """
+    Resumen vectorizado de un arreglo de códigos: cantidad, rango,
+    ASCII y fuera del BMP (4 bytes en UTF-8).
+
+    Ejemplo:
+        >>> resumir_codigos(texto_a_codigos("Hola 😀"))
+        '6 caracteres | U+0020–U+1F600 | 5 ASCII | 1 fuera del BMP'
+    """
+    import numpy as np
+
+    if not len(codigos):
+        return "0 caracteres"
+    return (
+        f"{len(codigos):,} caracteres | "
+        f"U+{int(codigos.min()):04X}–U+{int(codigos.max()):04X} | "
+        f"{int(np.count_nonzero(codigos < 0x80)):,} ASCII | "
+        f"{int(np.count_nonzero(codigos > 0xFFFF)):,} fuera del BMP"
+    )
+
+
+class PanelUnicode(VisorMatriz):
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║      PANEL DE CÓDIGOS UNICODE                         ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Muestra el arreglo de códigos que retorna el motor (resultado
+    'unicode' de ServicioEncriptacion.encriptar) sin reconstruirlo desde
+    el texto: resumen + líneas de `por_linea` códigos, formateadas sólo
+    cuando se vuelven visibles.
+
+    EJEMPLO DE USO:
+    ===============
+    >>> panel = PanelUnicode(frame)
+    >>> panel.mostrar(resultado['unicode'])
+    """
+
+    def __init__(self, parent: Any, alto: int = 3, por_linea: int = CODIGOS_POR_LINEA,
+                 ancho: int = 90, fuente: Any = ("Courier", 9)) -> None:
+        super().__init__(parent, alto, ancho, fuente)
+        self.por_linea = por_linea
+
+    @property
+    def filas(self) -> int:
+        """Líneas totales del panel."""
+        return 0 if self.datos is None else -(-len(self.datos) // self.por_linea)
+
+    def mostrar(self, codigos: NDArray) -> None:
+        """Mostrar el arreglo de códigos (uint32) desde el principio."""
+        import numpy as np
+
+        self.datos = np.asarray(codigos).ravel()
+        self._reiniciar(resumir_codigos(self.datos))
+
+    def _formatear(self, inicio: int, fin: int) -> str:
+        k = self.por_linea
+        return "\n".join(
+            formatear_codigos(self.datos, linea * k, (linea + 1) * k)
+            for linea in range(inicio, min(fin, self.filas))
+        )
+
+
+def resumir_entrada(entrada: Dict[str, Any]) -> str:
+    """
+    Línea del listado de historial: id, fecha y texto recortado en una
+    sola línea (saltos como '⏎'), con '…' si el texto es más largo.
+    """
+    texto = entrada["texto"].replace("\r", "").replace("\n", "⏎")
+    if entrada["longitud"] > len(entrada["texto"]):
+        texto += "…"
+    return f"#{entrada['id']:<6} {entrada['timestamp']}  {texto}  ({entrada['longitud']} car.)"
+
+
+class VentanaHistorial(tk.Toplevel):
+    """
+    ╔═══════════════════════════════════════════════════════╗
+    ║      HISTORIAL PAGINADO                               ║
+    ╚═══════════════════════════════════════════════════════╝
+
+    Lista las operaciones por páginas de HISTORIAL_POR_PAGINA entradas,
+    pedidas al servicio con obtener_historial(offset, limit, truncar).
+    Doble clic (o Enter) abre una entrada y recién entonces se lee su
+    texto completo.
+
+    EJEMPLO DE USO:
+    ===============
+    >>> VentanaHistorial(root, servicio_encriptacion)
+    """
+
+    def __init__(self, parent: Any, servicio: Any, por_pagina: int = HISTORIAL_POR_PAGINA) -> None:
+        super().__init__(parent)
+        self.title("📋 Historial de Operaciones")
+        self.geometry("760x460")
+        self.servicio = servicio
+        self.por_pagina = por_pagina
+        self.pagina = 0
+        self.entradas: List[Dict[str, Any]] = []
+
+        marco = ttk.Frame(self, padding=10)
+        marco.pack(fill="both", expand=True)
+
+        self.lista = tk.Listbox(marco, font=("Courier", 9), activestyle="dotbox")
+        barra = ttk.Scrollbar(marco, orient="vertical", command=self.lista.yview)
+        self.lista.configure(yscrollcommand=barra.set)
+        self.lista.grid(row=0, column=0, sticky="nsew")
+        barra.grid(row=0, column=1, sticky="ns")
+        marco.rowconfigure(0, weight=1)
+        marco.columnconfigure(0, weight=1)
+        self.lista.bind("<Double-Button-1>", lambda e: self.abrir_seleccion())
+        self.lista.bind("<Return>", lambda e: self.abrir_seleccion())
+
+        controles = ttk.Frame(marco)
+        controles.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        self.boton_anterior = ttk.Button(controles, text="◀ Anterior", command=lambda: self.ir_a(self.pagina - 1))
+        self.boton_anterior.pack(side="left")
+        self.boton_siguiente = ttk.Button(controles, text="Siguiente ▶", command=lambda: self.ir_a(self.pagina + 1))
+        self.boton_siguiente.pack(side="left", padx=5)
+        self.estado = ttk.Label(controles, text="")
+        self.estado.pack(side="left", padx=10)
+        ttk.Button(controles, text="🔄 Actualizar", command=lambda: self.ir_a(self.pagina)).pack(side="right")
+        ttk.Button(controles, text="📄 Abrir", command=self.abrir_seleccion).pack(side="right", padx=5)
+
+        self.ir_a(0)
+
+    @property
+    def paginas(self) -> int:
+        """Páginas totales (al menos 1)."""
+        return max(1, -(-len(self.servicio.historial) // self.por_pagina))
+
+    def ir_a(self, pagina: int) -> None:
+        """Cargar la página `pagina` (acotada al rango válido)."""
+        self.pagina = max(0, min(pagina, self.paginas - 1))
+        self.entradas = self.servicio.obtener_historial(
+            self.pagina * self.por_pagina, self.por_pagina, truncar=TEXTO_MAX_LISTADO
+        )
+
+        self.lista.delete(0, tk.END)
+        self.lista.insert(tk.END, *[resumir_entrada(e) for e in self.entradas])
+        self.boton_anterior.config(state="normal" if self.pagina > 0 else "disabled")
+        self.boton_siguiente.config(state="normal" if self.pagina < self.paginas - 1 else "disabled")
+        self.estado.config(text=f"Página {self.pagina + 1} de {self.paginas} "
+                                f"({len(self.servicio.historial):,} entradas)")
+
+    def abrir_seleccion(self) -> None:
+        """Abrir la entrada seleccionada con su texto completo."""
+        seleccion = self.lista.curselection()
+        if not seleccion:
+            return
+        resumen = self.entradas[seleccion[0]]
+
+        # Leer la entrada completa; el historial pudo desplazarse desde que se listó
+        offset = self.pagina * self.por_pagina + seleccion[0]
+        completa = self.servicio.obtener_historial(offset, 1)
+        if not completa or completa[0]["id"] != resumen["id"]:
+            messagebox.showwarning("📋 Historial", "El historial cambió; se actualiza la lista",
+                                   parent=self)
+            self.ir_a(self.pagina)
+            return
+        entrada = completa[0]
+
+        ventana = tk.Toplevel(self)
+        ventana.title(f"📄 Entrada #{entrada['id']}")
+        ventana.geometry("640x400")
+        ttk.Label(ventana, padding=10, text=(
+            f"Fecha: {entrada['timestamp']}\n"
+            f"Caracteres: {entrada['longitud']:,}\n"
+            f"Permutación: {entrada['permutacion']}"
+        )).pack(anchor="w")
+        marco = ttk.Frame(ventana, padding=(10, 0, 10, 10))
+        marco.pack(fill="both", expand=True)
+        texto = tk.Text(marco, wrap="word", font=("Courier", 9), bg="#f9fafb", relief="solid", bd=1)
+        barra = ttk.Scrollbar(marco, orient="vertical", command=texto.yview)
+        texto.configure(yscrollcommand=barra.set)
+        texto.pack(side="left", fill="both", expand=True)
+        barra.pack(side="right", fill="y")
+        texto.insert(tk.END, entrada["texto"])
+        texto.config(state="disabled")